@@ -15,23 +15,63 @@
 
 from io import open
 import collections
+import importlib
 import os
 import logging
+import sys
+import traceback
 
-from glyphsLib.classes import GSFont, __all__ as __all_classes__
-from glyphsLib.classes import *  # noqa
-from glyphsLib.builder import to_ufos, to_designspace, to_glyphs  # noqa
-from glyphsLib.parser import load, loads  # noqa
-from glyphsLib.writer import dump, dumps  # noqa
-from glyphsLib.util import clean_ufo, ufo_create_background_layer_for_all_glyphs
+from glyphsLib.tracing import span
 
 try:
     from ._version import version as __version__
 except ImportError:
     __version__ = "0.0.0+unknown"
 
-__all__ = [
+# The public names that are imported from a submodule the first time they are
+# accessed (see __getattr__ below), so that `import glyphsLib` stays cheap: the
+# builder pulls in fontTools.designspaceLib and fontTools.feaLib, which scripts
+# that only read or write .glyphs files don't need. The names listed in
+# glyphsLib.classes.__all__ are resolved in the same way.
+_LAZY_ATTRIBUTES = {
+    "to_ufos": "glyphsLib.builder",
+    "to_designspace": "glyphsLib.builder",
+    "to_glyphs": "glyphsLib.builder",
+    "load": "glyphsLib.parser",
+    "loads": "glyphsLib.parser",
+    "dump": "glyphsLib.writer",
+    "dumps": "glyphsLib.writer",
+    "clean_ufo": "glyphsLib.util",
+    "ufo_create_background_layer_for_all_glyphs": "glyphsLib.util",
+}
+
+_SUBMODULES = frozenset(
+    [
+        "affine",
+        "builder",
+        "cache",
+        "classes",
+        "cli",
+        "compatibility",
+        "filters",
+        "fingerprint",
+        "glyphdata",
+        "glyphspackage",
+        "interpolation",
+        "normalize",
+        "parser",
+        "tracing",
+        "types",
+        "util",
+        "watch",
+        "writer",
+    ]
+)
+
+_PUBLIC_NAMES = [
     "build_masters",
+    "build_masters_batch",
+    "BatchBuildError",
     "load_to_ufos",
     "to_ufos",
     "to_designspace",
@@ -40,7 +80,43 @@ __all__ = [
     "loads",
     "dump",
     "dumps",
-] + __all_classes__
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    elif name in _SUBMODULES:
+        # Code that only does `import glyphsLib` used to find the submodules
+        # already imported by this module.
+        value = importlib.import_module("glyphsLib." + name)
+    elif name == "__all__":
+        from glyphsLib.classes import __all__ as __all_classes__
+
+        value = _PUBLIC_NAMES + __all_classes__
+    elif not name.startswith("__"):
+        classes = importlib.import_module("glyphsLib.classes")
+        if name not in classes.__all__:
+            raise AttributeError(
+                "module {!r} has no attribute {!r}".format(__name__, name)
+            )
+        value = getattr(classes, name)
+    else:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__getattr__("__all__")) | _SUBMODULES)
+
+
+if sys.version_info < (3, 7):
+    # Module level __getattr__ (PEP 562) is only supported from Python 3.7:
+    # import everything upfront.
+    for _name in __getattr__("__all__") + list(_LAZY_ATTRIBUTES):
+        __getattr__(_name)
+    del _name
 
 logger = logging.getLogger(__name__)
 
@@ -55,12 +131,15 @@ def load_to_ufos(
     ufo_module=None,
 ):
     """Load an unpacked .glyphs object to UFO objects."""
+    from glyphsLib.builder import to_ufos
+    from glyphsLib.parser import load
 
+    # The values that the builder doesn't use are never parsed.
     if hasattr(file_or_path, "read"):
-        font = load(file_or_path)
+        font = load(file_or_path, lazy=True)
     else:
         with open(file_or_path, "r", encoding="utf-8") as ifile:
-            font = load(ifile)
+            font = load(ifile, lazy=True)
     logger.info("Loading to UFOs")
     return to_ufos(
         font,
@@ -85,6 +164,12 @@ def build_masters(
     store_editor_state=True,
     write_skipexportglyphs=False,
     ufo_module=None,
+    cache_dir=None,
+    glyph_names=None,
+    include_components=True,
+    master_names=None,
+    check_compatibility=False,
+    pipeline=False,
 ):
     """Write and return UFOs from the masters and the designspace defined in a
     .glyphs file.
@@ -95,13 +180,36 @@ def build_masters(
             written alongside the master UFOs though no instances will be built.
         family_name: If provided, the master UFOs will be given this name and
             only instances with this name will be included in the designspace.
+        cache_dir: If provided, the parsed .glyphs file is cached in this
+            directory (see glyphsLib.cache).
+        glyph_names: If provided, only the glyphs with these names (shell-style
+            wildcards are accepted) are written, along with the glyphs they use
+            as components unless include_components is False.
+        master_names: If provided, only the masters with these names (or ids)
+            are written.
+        check_compatibility: If True, check that the masters of the glyphs are
+            compatible before converting them (see glyphsLib.compatibility).
+        pipeline: If True, each master UFO is written by a background thread
+            as soon as it is finished, while the next ones are being finished.
+            The files are the same as without it.
 
     Returns:
         A named tuple of master UFOs (`ufos`) and the path to the designspace
         file (`designspace_path`).
+
+    Raises:
+        IncompatibleMastersError: if check_compatibility is True and the
+            masters are not compatible.
     """
 
-    font = GSFont(filename)
+    from glyphsLib.builder import to_designspace
+    from glyphsLib.classes import GSFont
+
+    # The cache stores fully parsed fonts.
+    font = GSFont(filename, cache_dir=cache_dir, lazy=cache_dir is None)
+
+    if check_compatibility:
+        _check_compatibility(font, glyph_names, include_components, master_names)
 
     if not os.path.isdir(master_dir):
         os.mkdir(master_dir)
@@ -111,8 +219,7 @@ def build_masters(
     else:
         instance_dir = os.path.relpath(designspace_instance_dir, master_dir)
 
-    designspace = to_designspace(
-        font,
+    options = dict(
         family_name=family_name,
         propagate_anchors=propagate_anchors,
         instance_dir=instance_dir,
@@ -121,8 +228,55 @@ def build_masters(
         store_editor_state=store_editor_state,
         write_skipexportglyphs=write_skipexportglyphs,
         ufo_module=ufo_module,
+        glyph_names=glyph_names,
+        include_components=include_components,
+        master_names=master_names,
+    )
+    if pipeline:
+        return _build_masters_pipelined(
+            font,
+            options,
+            master_dir,
+            designspace_path,
+            create_background_layers=create_background_layers,
+            normalize_ufos=normalize_ufos,
+        )
+
+    designspace = to_designspace(font, **options)
+
+    return _write_masters(
+        designspace,
+        master_dir,
+        designspace_path,
+        create_background_layers=create_background_layers,
+        normalize_ufos=normalize_ufos,
     )
 
+
+def _check_compatibility(font, glyph_names, include_components, master_names):
+    from glyphsLib.compatibility import IncompatibleMastersError, check_compatibility
+
+    with span("check_compatibility"):
+        incompatibilities = check_compatibility(
+            font,
+            glyph_names=glyph_names,
+            include_components=include_components,
+            master_names=master_names,
+        )
+    if incompatibilities:
+        raise IncompatibleMastersError(incompatibilities)
+
+
+def _write_masters(
+    designspace,
+    master_dir,
+    designspace_path=None,
+    create_background_layers=False,
+    normalize_ufos=False,
+):
+    """Write the master UFOs and the designspace built by `build_masters`."""
+    from glyphsLib.util import ufo_create_background_layer_for_all_glyphs
+
     # Only write full masters to disk. This assumes that layer sources are always part
     # of another full master source, which must always be the case in a .glyphs file.
     ufos = {}
@@ -134,19 +288,229 @@ def build_masters(
         if create_background_layers:
             ufo_create_background_layer_for_all_glyphs(source.font)
 
-        ufo_path = os.path.join(master_dir, source.filename)
-        clean_ufo(ufo_path)
-        source.font.save(ufo_path)
+        _save_ufo(
+            source.font, os.path.join(master_dir, source.filename), normalize_ufos
+        )
+        ufos[source.filename] = source.font
 
-        if normalize_ufos:
-            import ufonormalizer
+    if not designspace_path:
+        designspace_path = os.path.join(master_dir, designspace.filename)
+    with span("write_designspace", path=designspace_path):
+        designspace.write(designspace_path)
 
-            ufonormalizer.normalizeUFO(ufo_path, writeModTimes=False)
+    return Masters(ufos, designspace_path)
 
-        ufos[source.filename] = source.font
+
+# How many finished master UFOs may wait for the writer of a pipelined
+# `build_masters`, which bounds the memory that they hold.
+_PIPELINE_DEPTH = 2
+
+
+def _build_masters_pipelined(
+    font,
+    options,
+    master_dir,
+    designspace_path=None,
+    create_background_layers=False,
+    normalize_ufos=False,
+):
+    """Build the masters of `font` like `build_masters`, writing each UFO in a
+    background thread as soon as the builder has finished it.
+
+    The file names of the UFOs are only known once the designspace is built, so
+    the UFOs are written to a staging directory in `master_dir` and moved to
+    their place at the end. The bracket layers change the UFOs when the
+    designspace is built: fonts that have some are written after it.
+    """
+    import shutil
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+
+    from glyphsLib.builder.builders import UFOBuilder
+    from glyphsLib.util import clean_ufo, ufo_create_background_layer_for_all_glyphs
+
+    builder = UFOBuilder(font, use_designspace=True, **options)
+    staging_dir = tempfile.mkdtemp(prefix=".staging-", dir=master_dir)
+    try:
+        staged = {}
+        held = []
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pending = collections.deque()
+            for ufo in builder.masters:
+                if builder.bracket_layers:
+                    held.append(ufo)
+                    continue
+                if create_background_layers:
+                    ufo_create_background_layer_for_all_glyphs(ufo)
+                staged[id(ufo)] = os.path.join(staging_dir, "%d.ufo" % len(staged))
+                while len(pending) >= _PIPELINE_DEPTH:
+                    pending.popleft().result()
+                pending.append(
+                    executor.submit(_save_ufo, ufo, staged[id(ufo)], normalize_ufos)
+                )
+            for future in pending:
+                future.result()
+
+        designspace = builder.designspace
+        for ufo in held:
+            if create_background_layers:
+                ufo_create_background_layer_for_all_glyphs(ufo)
+            staged[id(ufo)] = os.path.join(staging_dir, "%d.ufo" % len(staged))
+            _save_ufo(ufo, staged[id(ufo)], normalize_ufos)
+
+        ufos = {}
+        for source in designspace.sources:
+            if source.filename in ufos:
+                assert source.font is ufos[source.filename]
+                continue
+            ufo_path = os.path.join(master_dir, source.filename)
+            clean_ufo(ufo_path)
+            os.makedirs(os.path.dirname(ufo_path), exist_ok=True)
+            os.replace(staged[id(source.font)], ufo_path)
+            ufos[source.filename] = source.font
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
 
     if not designspace_path:
         designspace_path = os.path.join(master_dir, designspace.filename)
-    designspace.write(designspace_path)
+    with span("write_designspace", path=designspace_path):
+        designspace.write(designspace_path)
 
     return Masters(ufos, designspace_path)
+
+
+def _save_ufo(ufo, ufo_path, normalize_ufos=False):
+    from glyphsLib.util import clean_ufo
+
+    with span("save_ufo", path=ufo_path):
+        clean_ufo(ufo_path)
+        if normalize_ufos:
+            # Same output as running ufonormalizer after saving.
+            from glyphsLib.normalize import save_ufo
+
+            save_ufo(ufo, ufo_path)
+        else:
+            ufo.save(ufo_path)
+
+
+class BatchBuildError(Exception):
+    """Raised by `build_masters_batch` when some files could not be converted.
+
+    Attributes:
+        errors: dict mapping the filenames that failed to the formatted
+            traceback of their exception.
+        designspace_paths: dict mapping the filenames that were converted to
+            the path of their designspace file.
+    """
+
+    def __init__(self, errors, designspace_paths):
+        super().__init__(
+            "Failed to convert {} file(s): {}".format(len(errors), ", ".join(errors))
+        )
+        self.errors = errors
+        self.designspace_paths = designspace_paths
+
+
+def build_masters_batch(
+    filenames, master_dir=None, designspace_instance_dir=None, jobs=None, **kwargs
+):
+    """Write the UFO masters and designspace of several .glyphs files.
+
+    The files are converted with `build_masters` on a pool of worker
+    processes. The GlyphData used to fill in glyph information is read once in
+    this process, before starting the workers, so that they can share it
+    (where processes are forked).
+
+    Args:
+        filenames: Paths of the .glyphs files to convert.
+        master_dir: If provided, the masters and the designspace of each file
+            are written to a subdirectory of master_dir named after the file.
+            Otherwise they are written next to the file.
+        designspace_instance_dir: Passed on to `build_masters`.
+        jobs: Number of worker processes (default: the number of CPUs). With
+            jobs=1, the files are converted one after the other in the current
+            process.
+        **kwargs: Other arguments of `build_masters`, used for all the files.
+            The designspace of each file is named after the file.
+
+    Returns:
+        A dict mapping each filename, in the order of `filenames`, to the path
+        of the designspace file written for it.
+
+    Raises:
+        BatchBuildError: if converting any of the files failed. The other
+            files are still converted.
+    """
+    if "designspace_path" in kwargs:
+        raise TypeError("designspace_path can't be set for several files")
+    ufo_module = kwargs.pop("ufo_module", None)
+    if ufo_module is not None:
+        # Modules can't be sent to the worker processes, their names can.
+        kwargs["ufo_module"] = ufo_module.__name__
+
+    jobs_args = []
+    designspace_paths = set()
+    for filename in filenames:
+        stem = os.path.splitext(os.path.basename(filename))[0]
+        if master_dir is None:
+            output_dir = os.path.dirname(filename) or "."
+        else:
+            output_dir = os.path.join(master_dir, stem)
+        designspace_path = os.path.join(output_dir, stem + ".designspace")
+        if designspace_path in designspace_paths:
+            raise ValueError(
+                "Several files would be written to {}".format(designspace_path)
+            )
+        designspace_paths.add(designspace_path)
+        jobs_args.append(
+            (filename, output_dir, designspace_instance_dir, designspace_path, kwargs)
+        )
+
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(jobs_args))
+
+    if jobs <= 1:
+        results = [_build_masters_job(*args) for args in jobs_args]
+    else:
+        import concurrent.futures
+        from glyphsLib.glyphdata import default_glyph_data
+
+        default_glyph_data()
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(_build_masters_job, *args) for args in jobs_args]
+            results = [future.result() for future in futures]
+
+    written = collections.OrderedDict()
+    errors = collections.OrderedDict()
+    for (filename, _, _, designspace_path, _), error in zip(jobs_args, results):
+        if error is None:
+            written[filename] = designspace_path
+        else:
+            errors[filename] = error
+    if errors:
+        raise BatchBuildError(errors, written)
+    return written
+
+
+def _build_masters_job(
+    filename, master_dir, designspace_instance_dir, designspace_path, kwargs
+):
+    """Run build_masters for one file of a batch, return the formatted
+    exception if it failed or None.
+    """
+    if "ufo_module" in kwargs:
+        kwargs = dict(kwargs, ufo_module=importlib.import_module(kwargs["ufo_module"]))
+    try:
+        os.makedirs(master_dir, exist_ok=True)
+        build_masters(
+            filename,
+            master_dir,
+            designspace_instance_dir,
+            designspace_path=designspace_path,
+            **kwargs,
+        )
+    except Exception:
+        logger.error("Failed to convert %s", filename)
+        return traceback.format_exc()
+    return None
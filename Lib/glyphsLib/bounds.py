@@ -0,0 +1,146 @@
+# Copyright 2020 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""The bounds of many layers at once, for metrics tools:
+
+    bounds = font_bounds(font)
+    bounds["A"][master.id]  # the Rect of the layer, or None if it is empty
+
+The bounds are the same as the `bounds` of the layers, which these functions
+fill the caches of. With NumPy, the extrema of the curves of all the paths are
+computed together, instead of curve by curve.
+
+The bounds of the paths, and of the paths of each layer, are cached on them
+until nodes or paths are added, removed or replaced through the proxies of the
+GS* classes, or the `position` (or its `x` and `y`), `type` or `smooth` of
+nodes are set. After other changes, call `glyphsLib.fingerprint.invalidate` on
+the changed objects. The
+bounds of the layers used by components are cached on the font, so that each
+is computed once, until their glyph or the glyphs that it uses as components
+change (see `GSFont.componentGraph`).
+"""
+
+from collections import OrderedDict
+
+from glyphsLib.util import want_numpy
+
+__all__ = ["font_bounds", "layer_bounds"]
+
+
+def font_bounds(font, use_numpy=None):
+    """Return the bounds of all the layers of `font`, by layer id, by glyph
+    name, in the order of the font. See `layer_bounds`.
+    """
+    layers = [layer for glyph in font.glyphs for layer in glyph.layers]
+    bounds = iter(layer_bounds(layers, use_numpy=use_numpy))
+    return OrderedDict(
+        (
+            glyph.name,
+            OrderedDict((layer.layerId, next(bounds)) for layer in glyph.layers),
+        )
+        for glyph in font.glyphs
+    )
+
+
+def layer_bounds(layers, use_numpy=None):
+    """Return the list of the `bounds` of `layers` (a Rect, or None for the
+    layers without paths or components).
+
+    use_numpy -- use NumPy to compute the bounds of the paths. By default NumPy
+        is used if it is installed.
+    """
+    layers = list(layers)
+    if want_numpy(use_numpy):
+        paths = [
+            path
+            for layer in layers
+            for path in layer._paths
+            if "_bounds" not in path.__dict__
+        ]
+        if paths:
+            for path, box in zip(paths, _numpy_boxes(paths)):
+                path._bounds = box
+    return [layer.bounds for layer in layers]
+
+
+def _numpy_boxes(paths):
+    """Return the (left, bottom, right, top) box of each path, or None for
+    the paths without segments, like `GSPath._bounds_box`.
+    """
+    import numpy
+
+    lines, line_paths = [], []
+    curves, curve_paths = [], []
+    for index, path in enumerate(paths):
+        for segment in path.segments:
+            points = [(point.x, point.y) for point in segment]
+            if len(points) == 2:
+                lines.append(points)
+                line_paths.append(index)
+            elif len(points) == 4:
+                curves.append(points)
+                curve_paths.append(index)
+            else:
+                raise ValueError
+
+    low = numpy.full((len(paths), 2), numpy.inf)
+    high = numpy.full((len(paths), 2), -numpy.inf)
+    if lines:
+        points = numpy.array(lines, dtype=float)
+        numpy.minimum.at(low, line_paths, points.min(axis=1))
+        numpy.maximum.at(high, line_paths, points.max(axis=1))
+    if curves:
+        values = _curve_extrema(numpy.array(curves, dtype=float))
+        numpy.minimum.at(low, curve_paths, values.min(axis=1))
+        numpy.maximum.at(high, curve_paths, values.max(axis=1))
+
+    return [
+        (left, bottom, right, top) if left <= right else None
+        for (left, bottom), (right, top) in zip(low.tolist(), high.tolist())
+    ]
+
+
+def _curve_extrema(curves):
+    """Return the points of the curves (an array of shape (n, 4, 2)) where
+    they may reach their bounds, as an array of shape (n, 6, 2): the end
+    points and the curve at the roots of its derivative in x and in y, with the
+    same arithmetic as `segment.bezierMinMax`.
+    """
+    import numpy
+
+    p0, p1, p2, p3 = curves[:, 0], curves[:, 1], curves[:, 2], curves[:, 3]
+    b = 6 * p0 - 12 * p1 + 6 * p2
+    a = -3 * p0 + 9 * p1 - 9 * p2 + 3 * p3
+    c = 3 * p1 - 3 * p0
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        quadratic = numpy.abs(a) >= 1e-12
+        linear_t = numpy.where(numpy.abs(b) < 1e-12, numpy.nan, -c / b)
+        sqrtb2ac = numpy.sqrt(b * b - 4 * c * a)
+        t1 = numpy.where(quadratic, (-b + sqrtb2ac) / (2 * a), linear_t)
+        t2 = numpy.where(quadratic, (-b - sqrtb2ac) / (2 * a), numpy.nan)
+    # The roots in x and y, for both coordinates: shape (n, 4, 1).
+    t = numpy.concatenate([t1, t2], axis=1)[:, :, numpy.newaxis]
+    inside = (0 < t) & (t < 1)
+    t = numpy.where(inside, t, 0)
+    mt = 1 - t
+    p0, p1, p2, p3 = (p[:, numpy.newaxis, :] for p in (p0, p1, p2, p3))
+    points = (
+        (mt * mt * mt * p0)
+        + (3 * mt * mt * t * p1)
+        + (3 * mt * t * t * p2)
+        + (t * t * t * p3)
+    )
+    # The roots outside of the curve are replaced by its start point.
+    points = numpy.where(inside, points, p0)
+    return numpy.concatenate([curves[:, [0, 3]], points], axis=1)
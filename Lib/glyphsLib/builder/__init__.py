@@ -31,6 +31,9 @@ def to_ufos(
     generate_GDEF=True,
     store_editor_state=True,
     write_skipexportglyphs=False,
+    glyph_names=None,
+    include_components=True,
+    master_names=None,
 ):
     """Take a GSFont object and convert it into one UFO per master.
 
@@ -44,6 +47,11 @@ def to_ufos(
 
     If generate_GDEF is True, write a `table GDEF {...}` statement in the
     UFO's features.fea, containing GlyphClassDef and LigatureCaretByPos.
+
+    If glyph_names is provided, only the glyphs with these names (shell-style
+    wildcards are accepted) are converted, along with the glyphs they use as
+    components unless include_components is False. If master_names is
+    provided, only the masters with these names (or ids) are converted.
     """
     builder = UFOBuilder(
         font,
@@ -54,6 +62,9 @@ def to_ufos(
         generate_GDEF=generate_GDEF,
         store_editor_state=store_editor_state,
         write_skipexportglyphs=write_skipexportglyphs,
+        glyph_names=glyph_names,
+        include_components=include_components,
+        master_names=master_names,
     )
 
     result = list(builder.masters)
@@ -73,6 +84,9 @@ def to_designspace(
     generate_GDEF=True,
     store_editor_state=True,
     write_skipexportglyphs=False,
+    glyph_names=None,
+    include_components=True,
+    master_names=None,
 ):
     """Take a GSFont object and convert it into a Designspace Document + UFOS.
     The UFOs are available as the attribute `font` of each SourceDescriptor of
@@ -95,6 +109,11 @@ def to_designspace(
 
     If generate_GDEF is True, write a `table GDEF {...}` statement in the
     UFO's features.fea, containing GlyphClassDef and LigatureCaretByPos.
+
+    If glyph_names is provided, only the glyphs with these names (shell-style
+    wildcards are accepted) are converted, along with the glyphs they use as
+    components unless include_components is False. If master_names is
+    provided, only the masters with these names (or ids) are converted.
     """
     builder = UFOBuilder(
         font,
@@ -107,6 +126,9 @@ def to_designspace(
         generate_GDEF=generate_GDEF,
         store_editor_state=store_editor_state,
         write_skipexportglyphs=write_skipexportglyphs,
+        glyph_names=glyph_names,
+        include_components=include_components,
+        master_names=master_names,
     )
     return builder.designspace
 
@@ -116,10 +138,12 @@ def to_glyphs(
     glyphs_module=classes,
     ufo_module=None,
     minimize_ufo_diffs=False,
+    jobs=1,
+    streaming=False,
 ):
     """
-    Take a list of UFOs or a single DesignspaceDocument with attached UFOs
-    and converts it into a GSFont object.
+    Take a list of UFOs (or of paths of UFOs) or a single DesignspaceDocument
+    with attached UFOs and converts it into a GSFont object.
 
     The GSFont object is in-memory, it's up to the user to write it to the disk
     if needed.
@@ -127,6 +151,15 @@ def to_glyphs(
     This should be the inverse function of `to_ufos` and `to_designspace`,
     so we should have to_glyphs(to_ufos(font)) == font
     and also to_glyphs(to_designspace(font)) == font
+
+    If jobs is more than 1, the UFOs of the designspace are loaded
+    concurrently, and the layers of the masters are built in that many
+    processes (see GlyphsBuilder). The GSFont is the same.
+
+    If streaming is True, the glyphs of the UFOs that are given as paths or
+    loaded from the designspace are read from their files one at a time and
+    released once converted, to use less memory (see GlyphsBuilder). The
+    GSFont is the same.
     """
     if hasattr(ufos_or_designspace, "sources"):
         builder = GlyphsBuilder(
@@ -134,6 +167,8 @@ def to_glyphs(
             glyphs_module=glyphs_module,
             ufo_module=ufo_module,
             minimize_ufo_diffs=minimize_ufo_diffs,
+            jobs=jobs,
+            streaming=streaming,
         )
     else:
         builder = GlyphsBuilder(
@@ -141,5 +176,7 @@ def to_glyphs(
             glyphs_module=glyphs_module,
             ufo_module=ufo_module,
             minimize_ufo_diffs=minimize_ufo_diffs,
+            jobs=jobs,
+            streaming=streaming,
         )
     return builder.font
@@ -26,11 +26,20 @@ __all__ = [
 ]
 
 
-def to_ufo_propagate_font_anchors(self, ufo):
-    """Copy anchors from parent glyphs' components to the parent."""
+def to_ufo_propagate_font_anchors(self, ufo, glyph_names=None):
+    """Copy anchors from parent glyphs' components to the parent.
 
-    processed = set()
-    for glyph in ufo:
+    If glyph_names is given, only the anchors of these glyphs are propagated,
+    the anchors of the other glyphs are assumed to be propagated already.
+    """
+
+    if glyph_names is None:
+        processed = set()
+        glyphs = ufo
+    else:
+        processed = set(ufo.keys()).difference(glyph_names)
+        glyphs = [ufo[name] for name in glyph_names if name in ufo]
+    for glyph in glyphs:
         _propagate_glyph_anchors(self, ufo, glyph, processed)
 
 
@@ -158,7 +167,7 @@ def to_glyphs_glyph_anchors(self, ufo_glyph, layer):
     """Add UFO glif anchors to a GSLayer."""
     for ufo_anchor in ufo_glyph.anchors:
         anchor = self.glyphs_module.GSAnchor()
-        anchor.name = ufo_anchor.name
+        anchor.name = self._intern(ufo_anchor.name)
         anchor.position = Point(ufo_anchor.x, ufo_anchor.y)
         layer.anchors.append(anchor)
 
@@ -17,19 +17,26 @@ from collections import OrderedDict, defaultdict
 from functools import partial
 import logging
 import os
+import pickle
 import re
 from textwrap import dedent
 from typing import Dict
 
 from fontTools import designspaceLib
 
-from glyphsLib import classes, util
+from glyphsLib import classes, glyphdata, util
+from glyphsLib.tracing import span
+from glyphsLib.util import (
+    BRACKET_LAYER_RE,
+    gc_disabled,
+    select_glyph_names,
+    select_master_ids,
+)
 from .constants import PUBLIC_PREFIX, FONT_CUSTOM_PARAM_PREFIX, GLYPHLIB_PREFIX
 from .axes import WEIGHT_AXIS_DEF, WIDTH_AXIS_DEF, find_base_style, class_to_value
 
 GLYPH_ORDER_KEY = PUBLIC_PREFIX + "glyphOrder"
 
-BRACKET_LAYER_RE = re.compile(r".*(?P<first_bracket>[\[\]])\s*(?P<value>\d+)\s*\].*")
 BRACKET_GLYPH_TEMPLATE = "{glyph_name}.{rev}BRACKET.{location}"
 REVERSE_BRACKET_LABEL = "REV_"
 BRACKET_GLYPH_RE = re.compile(
@@ -69,6 +76,9 @@ class UFOBuilder(_LoggerMixin):
         generate_GDEF=True,
         store_editor_state=True,
         write_skipexportglyphs=False,
+        glyph_names=None,
+        include_components=True,
+        master_names=None,
     ):
         """Create a builder that goes from Glyphs to UFO + designspace.
 
@@ -97,6 +107,14 @@ class UFOBuilder(_LoggerMixin):
                                          into the UFOs' and Designspace's lib instead
                                          of the glyph level lib key
                                          "com.schriftgestaltung.Glyphs.Export".
+        glyph_names -- if provided, only convert the glyphs with these names.
+                       Shell-style wildcards like "a*" or "uni0[45]??" are
+                       accepted.
+        include_components -- if True (the default), the glyphs used as
+                              components by the selected glyphs are converted
+                              too, so that all component references resolve.
+        master_names -- if provided, only build the UFOs of the masters with
+                        these names (or ids).
         """
         self.font = font
 
@@ -115,9 +133,25 @@ class UFOBuilder(_LoggerMixin):
         self.bracket_layers = []
         self.write_skipexportglyphs = write_skipexportglyphs
 
+        # The ids of the masters and the names of the glyphs to convert. None
+        # in _glyph_names means all glyphs.
+        self._master_ids = select_master_ids(font, master_names)
+        self._glyph_names = None
+        if glyph_names is not None:
+            self._glyph_names = select_glyph_names(
+                font, glyph_names, include_components
+            )
+
         # The set of (SourceDescriptor + UFO)s that will be built,
         # indexed by master ID, the same order as masters in the source GSFont.
         self._sources = OrderedDict()
+        # The UFOs returned by `masters` so far, and the generator that builds
+        # the others.
+        self._built_masters = []
+        self._masters_iterator = None
+        # The groups of the master UFOs, computed for the first master that is
+        # built and applied to the others, see `to_ufo_groups`.
+        self._ufo_groups = None
 
         # A cache for mappings of layer IDs to mappings of glyph names to Glyphs layers,
         # for passing into pens as glyph sets.
@@ -178,15 +212,74 @@ class UFOBuilder(_LoggerMixin):
                     return True
         return False
 
+    def _selected_glyphs(self):
+        """Return the glyphs of the font that are converted, in order."""
+        if self._glyph_names is None:
+            return list(self.font.glyphs)
+        return [glyph for glyph in self.font.glyphs if glyph.name in self._glyph_names]
+
     @property
     def masters(self):
         """Get an iterator over master UFOs that match the given family_name.
+
+        The glyphs of all the masters are built before the first UFO is
+        returned, then each UFO is finished (anchors, features, groups,
+        kerning) just before it is returned.
         """
-        if self._sources:
-            for source in self._sources.values():
-                yield source.font
-            return
+        if self._masters_iterator is None:
+            self._masters_iterator = self._build_masters()
+        index = 0
+        while True:
+            if index == len(self._built_masters):
+                ufo = next(self._masters_iterator, None)
+                if ufo is None:
+                    return
+                self._built_masters.append(ufo)
+            yield self._built_masters[index]
+            index += 1
+
+    def _build_masters(self):
+        # TODO: (jany) in the future, build the glyphs of one master at a time
+        #     to reduce memory usage.
+        with span("to_ufo_font_attributes"):
+            self.to_ufo_font_attributes(self.family_name)
+
+        with span("glyphs"):
+            self.to_ufo_glyph_layers(self._selected_glyphs())
+
+        if self.write_skipexportglyphs:
+            # Sanitize skip list and write it to both Designspace- and UFO-level lib
+            # keys. The latter is unnecessary when using e.g. the ufo2ft.compile*FromDS`
+            # functions, but the data may take a different path. Writing it everywhere
+            # can save on surprises/logic in other software.
+            skip_export_glyphs = self._designspace.lib.get("public.skipExportGlyphs")
+            if skip_export_glyphs is not None:
+                skip_export_glyphs = sorted(set(skip_export_glyphs))
+                self._designspace.lib["public.skipExportGlyphs"] = skip_export_glyphs
+                for source in self._sources.values():
+                    source.font.lib["public.skipExportGlyphs"] = skip_export_glyphs
 
+        for master_id, source in self._sources.items():
+            ufo = source.font
+            if self.propagate_anchors:
+                with span("propagate_anchors", master=ufo.info.styleName):
+                    self.to_ufo_propagate_font_anchors(ufo)
+            for layer in ufo.layers:
+                self.to_ufo_layer_lib(layer)
+            with span("features", master=ufo.info.styleName):
+                # This depends on the glyphOrder key
+                self.to_ufo_features(master_ids=[master_id])
+            with span("groups", master=ufo.info.styleName):
+                self.to_ufo_groups(master_ids=[master_id])
+            with span("kerning", master=ufo.info.styleName):
+                self.to_ufo_kerning(master_ids=[master_id])
+            yield ufo
+
+    def to_ufo_glyph_layers(self, glyphs):
+        """Build the UFO glyphs of all the layers of the given GSGlyphs in the
+        master UFOs. Bracket layers are only collected in `bracket_layers`, to
+        be processed by `designspace`.
+        """
         # Store set of actually existing master (layer) ids. This helps with
         # catching dangling layer data that Glyphs may ignore, e.g. when
         # copying glyphs from other fonts with, naturally, different master
@@ -197,13 +290,8 @@ class UFOBuilder(_LoggerMixin):
         # stores background data from "associated layers"
         supplementary_layer_data = []
 
-        # TODO(jamesgk) maybe create one font at a time to reduce memory usage
-        # TODO: (jany) in the future, return a lazy iterator that builds UFOs
-        #     on demand.
-        self.to_ufo_font_attributes(self.family_name)
-
         # Generate the main (master) layers first.
-        for glyph in self.font.glyphs:
+        for glyph in glyphs:
             for layer in glyph.layers.values():
                 if layer.associatedMasterId != layer.layerId:
                     # The layer is not the main layer of a master
@@ -211,6 +299,8 @@ class UFOBuilder(_LoggerMixin):
                     # them and print a warning below.
                     supplementary_layer_data.append((glyph, layer))
                     continue
+                if layer.layerId not in self._master_ids:
+                    continue
 
                 ufo_layer = self.to_ufo_layer(glyph, layer)
                 ufo_glyph = ufo_layer.newGlyph(glyph.name)
@@ -232,6 +322,12 @@ class UFOBuilder(_LoggerMixin):
                         )
                     )
                 continue
+            if (
+                layer.layerId not in self._master_ids
+                and layer.associatedMasterId not in self._master_ids
+            ):
+                # The layer belongs to a master that is not converted.
+                continue
 
             if not layer.name:
                 # Empty layer names are invalid according to the UFO spec.
@@ -257,32 +353,6 @@ class UFOBuilder(_LoggerMixin):
                 ufo_glyph = ufo_layer.newGlyph(glyph.name)
                 self.to_ufo_glyph(ufo_glyph, layer, layer.parent)
 
-        for source in self._sources.values():
-            ufo = source.font
-            if self.propagate_anchors:
-                self.to_ufo_propagate_font_anchors(ufo)
-            for layer in ufo.layers:
-                self.to_ufo_layer_lib(layer)
-
-        if self.write_skipexportglyphs:
-            # Sanitize skip list and write it to both Designspace- and UFO-level lib
-            # keys. The latter is unnecessary when using e.g. the ufo2ft.compile*FromDS`
-            # functions, but the data may take a different path. Writing it everywhere
-            # can save on surprises/logic in other software.
-            skip_export_glyphs = self._designspace.lib.get("public.skipExportGlyphs")
-            if skip_export_glyphs is not None:
-                skip_export_glyphs = sorted(set(skip_export_glyphs))
-                self._designspace.lib["public.skipExportGlyphs"] = skip_export_glyphs
-                for source in self._sources.values():
-                    source.font.lib["public.skipExportGlyphs"] = skip_export_glyphs
-
-        self.to_ufo_features()  # This depends on the glyphOrder key
-        self.to_ufo_groups()
-        self.to_ufo_kerning()
-
-        for source in self._sources.values():
-            yield source.font
-
     @property
     def designspace(self):
         """Get a designspace Document instance that links the masters together
@@ -293,13 +363,18 @@ class UFOBuilder(_LoggerMixin):
 
         self._designspace_is_complete = True
         list(self.masters)  # Make sure that the UFOs are built
-        self.to_designspace_axes()
-        self.to_designspace_sources()
-        self.to_designspace_instances()
-        self.to_designspace_family_user_data()
+        with span("to_designspace_axes"):
+            self.to_designspace_axes()
+        with span("to_designspace_sources"):
+            self.to_designspace_sources()
+        with span("to_designspace_instances"):
+            self.to_designspace_instances()
+        with span("to_designspace_family_user_data"):
+            self.to_designspace_family_user_data()
 
         if self.bracket_layers:
-            self._apply_bracket_layers()
+            with span("bracket_layers"):
+                self._apply_bracket_layers()
 
         # append base style shared by all masters to designspace file name
         base_family = self.family_name or "Unnamed"
@@ -460,7 +535,7 @@ class UFOBuilder(_LoggerMixin):
 
     def _copy_bracket_layers_to_ufo_glyphs(self, bracket_layer_map):
         font = self.font
-        master_ids = {m.id for m in font.masters}
+        master_ids = self._master_ids
         # when a glyph master layer doesn't have an explicitly associated bracket layer
         # for any crosspoint locations, we assume the master layer itself will be
         # used implicitly as bracket layer for that location. See "Switching Only One
@@ -583,6 +658,8 @@ class GlyphsBuilder(_LoggerMixin):
         glyphs_module=classes,
         ufo_module=None,
         minimize_ufo_diffs=False,
+        jobs=1,
+        streaming=False,
     ):
         """Create a builder that goes from UFOs + designspace to Glyphs.
 
@@ -597,7 +674,8 @@ class GlyphsBuilder(_LoggerMixin):
                 TODO: (jany) find out whether there is a use-case here?
 
         Keyword arguments:
-        ufos -- The list of UFOs to combine into a GSFont
+        ufos -- The list of UFOs to combine into a GSFont, or of paths of
+                UFOs that the builder loads with ufo_module
         designspace -- A MutatorMath Designspace to use for the GSFont
         glyphs_module -- The glyphsLib.classes module to use to build glyphsLib
                          classes (you can pass a custom module with the same
@@ -611,9 +689,31 @@ class GlyphsBuilder(_LoggerMixin):
         minimize_ufo_diffs -- set to True to store extra info in .glyphs files
                               in order to get smaller diffs between UFOs
                               when going UFOs->glyphs->UFOs
+        jobs -- If more than 1, the UFOs of the designspace are loaded by that
+                many threads, and the layers of the masters are built by that
+                many processes. The GSFont is the same as with 1 (the default).
+                The layers are only built in processes with the default
+                glyphs_module and UFOs that can be pickled (like those of
+                ufoLib2, but not defcon).
+        streaming -- If True, the UFOs of the designspace are loaded lazily,
+                     and the glyphs of the UFOs that the builder loaded are
+                     read again from their files one at a time: each glyph is
+                     converted for all the masters and then released, so that
+                     the UFO glyphs are never all in memory. The UFOs that
+                     were given already loaded are read as they are. The
+                     GSFont is the same. The layers are then always built in
+                     this process.
         """
         self.glyphs_module = glyphs_module
         self.minimize_ufo_diffs = minimize_ufo_diffs
+        self.jobs = jobs
+        self.streaming = streaming
+        # The paths of the UFOs loaded by the builder, by id of the UFO, and
+        # the class they were loaded with.
+        self._ufo_paths = {}
+        self._ufo_class = None
+        # The glyph and anchor names, shared by the layers of all the masters.
+        self._strings = {}
 
         if designspace is not None:
             if ufos:
@@ -621,8 +721,16 @@ class GlyphsBuilder(_LoggerMixin):
             if ufo_module is None:
                 import ufoLib2 as ufo_module
 
-            self.designspace = self._valid_designspace(designspace, ufo_module)
+            self.designspace = self._valid_designspace(
+                designspace, ufo_module, jobs, lazy=streaming
+            )
         elif ufos:
+            if any(isinstance(ufo, (str, os.PathLike)) for ufo in ufos):
+                if ufo_module is None:
+                    import ufoLib2 as ufo_module
+
+                self._ufo_class = ufo_module.Font
+                ufos = [self._open_ufo(ufo, streaming) for ufo in ufos]
             self.designspace = self._fake_designspace(ufos)
         else:
             raise RuntimeError("Please provide a designspace or at least one UFO.")
@@ -637,6 +745,12 @@ class GlyphsBuilder(_LoggerMixin):
         self._font = None
         """The GSFont that will be built."""
 
+    def _intern(self, name):
+        """Return the first string equal to `name` that the builder saw, so
+        that the masters don't each keep a copy of the same names.
+        """
+        return self._strings.setdefault(name, name)
+
     @property
     def font(self):
         """Get the GSFont built from the UFOs + designspace."""
@@ -651,6 +765,7 @@ class GlyphsBuilder(_LoggerMixin):
         # considers them to be special layers and will handle them itself.
         self._font = self.glyphs_module.GSFont()
         self._sources = OrderedDict()  # Same as in UFOBuilder
+        masters = []
         for index, source in enumerate(s for s in sorted_sources if not s.layerName):
             master = self.glyphs_module.GSFontMaster()
 
@@ -666,44 +781,35 @@ class GlyphsBuilder(_LoggerMixin):
             self.to_glyphs_master_attributes(source, master)
             self._font.masters.insert(len(self._font.masters), master)
             self._sources[master.id] = source
-
-            # First, move free-standing bracket glyphs back to layers to avoid dealing
-            # with GSLayer transplantation.
-            for glyph_name in list(source.font.keys()):
-                m = BRACKET_GLYPH_RE.match(glyph_name)
-                if not m:
-                    continue
-                bracket_glyph = source.font[glyph_name]
-                base_glyph, reverse, threshold = m.groups()
-                layer_name = bracket_glyph.lib.get(
-                    GLYPHLIB_PREFIX + "_originalLayerName",
-                    "{}{}]".format("]" if reverse else "[", threshold),
-                )
-                # _originalLayerName is an empty string for 'implicit' bracket layers;
-                # we don't import these since they were copies of master layers.
-                if layer_name:
-                    if layer_name not in source.font.layers:
-                        ufo_layer = source.font.newLayer(layer_name)
-                    else:
-                        ufo_layer = source.font.layers[layer_name]
-                    bracket_glyph_new = ufo_layer.newGlyph(base_glyph)
-                    bracket_glyph_new.copyDataFromGlyph(bracket_glyph)
-
-                    # strip '*.BRACKET.123' suffix from the components' glyph names
-                    for comp in bracket_glyph_new.components:
-                        m = BRACKET_GLYPH_RE.match(comp.baseGlyph)
-                        if m:
-                            comp.baseGlyph = m.group("glyph_name")
-
-                # Remove all freestanding bracket layer glyphs from all layers.
-                for layer in source.font.layers:
-                    if glyph_name in layer:
-                        del layer[glyph_name]
-
-            for layer in _sorted_backgrounds_last(source.font.layers):
-                self.to_glyphs_layer_lib(layer)
-                for glyph in layer:
-                    self.to_glyphs_glyph(glyph, layer, master)
+            self._to_glyphs_bracket_layers(source.font)
+            masters.append(master)
+
+        pickled_masters = None
+        if self.jobs > 1 and not self.streaming:
+            pickled_masters = self._pickled_masters(masters)
+        if self.streaming:
+            self._to_glyphs_streamed_glyphs(masters)
+        elif pickled_masters is None:
+            for master in masters:
+                self._to_glyphs_master_glyphs(master)
+        else:
+            import concurrent.futures
+
+            # Read the glyph data here once, for the processes that are forked.
+            glyphdata.default_glyph_data()
+            jobs = min(self.jobs, len(masters))
+            with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+                futures = [
+                    executor.submit(
+                        _to_glyphs_master_layers, data, self.minimize_ufo_diffs
+                    )
+                    for data in pickled_masters
+                ]
+                # Set the attributes of the glyphs while the processes build
+                # the layers, then add the layers master by master, in the
+                # same order as when building them here.
+                for master, future in zip(masters, futures):
+                    self._to_glyphs_master_glyphs(master, layers=future)
 
         self.to_glyphs_features()
         self.to_glyphs_groups()
@@ -732,7 +838,142 @@ class GlyphsBuilder(_LoggerMixin):
 
         return self._font
 
-    def _valid_designspace(self, designspace, ufo_module):
+    def _to_glyphs_bracket_layers(self, ufo):
+        """Move the free-standing bracket glyphs of `ufo` back to layers, to
+        avoid dealing with GSLayer transplantation.
+        """
+        for glyph_name in list(ufo.keys()):
+            m = BRACKET_GLYPH_RE.match(glyph_name)
+            if not m:
+                continue
+            bracket_glyph = ufo[glyph_name]
+            base_glyph, reverse, threshold = m.groups()
+            layer_name = bracket_glyph.lib.get(
+                GLYPHLIB_PREFIX + "_originalLayerName",
+                "{}{}]".format("]" if reverse else "[", threshold),
+            )
+            # _originalLayerName is an empty string for 'implicit' bracket layers;
+            # we don't import these since they were copies of master layers.
+            if layer_name:
+                if layer_name not in ufo.layers:
+                    ufo_layer = ufo.newLayer(layer_name)
+                else:
+                    ufo_layer = ufo.layers[layer_name]
+                bracket_glyph_new = ufo_layer.newGlyph(base_glyph)
+                bracket_glyph_new.copyDataFromGlyph(bracket_glyph)
+
+                # strip '*.BRACKET.123' suffix from the components' glyph names
+                for comp in bracket_glyph_new.components:
+                    m = BRACKET_GLYPH_RE.match(comp.baseGlyph)
+                    if m:
+                        comp.baseGlyph = m.group("glyph_name")
+
+            # Remove all freestanding bracket layer glyphs from all layers.
+            for layer in ufo.layers:
+                if glyph_name in layer:
+                    del layer[glyph_name]
+
+    def _to_glyphs_master_glyphs(self, master, layers=None):
+        """Add the glyphs of the UFO of `master` to the font.
+
+        If `layers` is given, it is the future result of
+        `_to_glyphs_master_layers` for the master: only the attributes of the
+        glyphs are set here, and the layers built by the process are added to
+        them.
+        """
+        ufo = self._sources[master.id].font
+        for layer in _sorted_backgrounds_last(ufo.layers):
+            self.to_glyphs_layer_lib(layer)
+            for glyph in layer:
+                if layers is None:
+                    self.to_glyphs_glyph(glyph, layer, master)
+                else:
+                    self.to_glyphs_glyph_attributes(glyph, master)
+        if layers is None:
+            return
+
+        with gc_disabled():
+            glyph_layers = pickle.loads(layers.result())
+        glyphs = {glyph.name: glyph for glyph in self._font._glyphs}
+        for glyph_name, master_layers in glyph_layers:
+            glyph = glyphs[glyph_name]
+            for layer in master_layers:
+                glyph.layers.append(layer)
+                if layer._background is not None:
+                    layer._background.parent = glyph
+
+    def _to_glyphs_streamed_glyphs(self, masters):
+        """Add the glyphs of the UFOs of `masters` to the font glyph by glyph,
+        with the same result as `_to_glyphs_master_glyphs` master by master.
+
+        The glyphs of the UFOs that the builder loaded itself are read from a
+        copy of the UFO opened lazily, and deleted from it once converted. The
+        UFOs given by the caller are read as they are, with their changes.
+        """
+        readers = []
+        copies = []
+        try:
+            for master in masters:
+                ufo = self._sources[master.id].font
+                # The user data of the layers are set first, in the same order.
+                for layer in _sorted_backgrounds_last(ufo.layers):
+                    self.to_glyphs_layer_lib(layer)
+                release = id(ufo) in self._ufo_paths
+                if release:
+                    ufo = util.open_ufo(
+                        self._ufo_paths[id(ufo)], self._ufo_class, lazy=True
+                    )
+                    copies.append(ufo)
+                    self._to_glyphs_bracket_layers(ufo)
+                readers.append((master, _sorted_backgrounds_last(ufo.layers), release))
+
+            # The glyphs are created in the order in which the masters would add
+            # them one after the other.
+            glyph_names = OrderedDict()
+            for _, layers, _ in readers:
+                for layer in layers:
+                    glyph_names.update((name, None) for name in layer.keys())
+            with span("to_glyphs_streamed_glyphs", count=len(glyph_names)):
+                for glyph_name in glyph_names:
+                    for master, layers, release in readers:
+                        for layer in layers:
+                            if glyph_name not in layer:
+                                continue
+                            self.to_glyphs_glyph(layer[glyph_name], layer, master)
+                            if release:
+                                del layer[glyph_name]
+        finally:
+            for ufo in copies:
+                # The readers of the lazily loaded UFOs of ufoLib2.
+                close = getattr(ufo, "close", None)
+                if close is not None:
+                    close()
+
+    def _pickled_masters(self, masters):
+        """Return the data for `_to_glyphs_master_layers` of each master, or
+        None if it can't be pickled.
+
+        The UFOs that the builder loaded are loaded again by the processes,
+        which is faster than pickling them. The others are pickled.
+        """
+        if self.glyphs_module is not classes or len(masters) < 2:
+            return None
+        result = []
+        for master in masters:
+            ufo = self._sources[master.id].font
+            if id(ufo) in self._ufo_paths:
+                ufo = (self._ufo_paths[id(ufo)], self._ufo_class)
+            master = master.clone()
+            master.font = None
+            try:
+                data = pickle.dumps((ufo, master), pickle.HIGHEST_PROTOCOL)
+            except (AttributeError, TypeError, pickle.PicklingError) as e:
+                self.logger.info("Building the layers in this process: %s", e)
+                return None
+            result.append(data)
+        return result
+
+    def _valid_designspace(self, designspace, ufo_module, jobs=1, lazy=False):
         """Make sure that the user-provided designspace has loaded fonts and
         that names are the same as those from the UFOs.
         """
@@ -740,15 +981,29 @@ class GlyphsBuilder(_LoggerMixin):
         copy = designspace
         # Load only full UFO masters, sparse or "brace" layer sources are assumed
         # to point to existing layers within one of the full masters.
-        for source in (s for s in copy.sources if not s.layerName):
+        sources = [s for s in copy.sources if not s.layerName]
+        ufo_paths = {}
+        for source in sources:
             if not hasattr(source, "font") or source.font is None:
                 if source.path:
-                    # FIXME: (jany) consider not changing the caller's objects
-                    source.font = util.open_ufo(source.path, ufo_module.Font)
+                    ufo_paths[source] = source.path
                 else:
                     dirname = os.path.dirname(designspace.path)
-                    ufo_path = os.path.join(dirname, source.filename)
-                    source.font = util.open_ufo(ufo_path, ufo_module.Font)
+                    ufo_paths[source] = os.path.join(dirname, source.filename)
+        self._ufo_class = ufo_module.Font
+        open_ufo = partial(util.open_ufo, font_class=ufo_module.Font, lazy=lazy)
+        if jobs > 1 and len(ufo_paths) > 1:
+            import concurrent.futures
+
+            with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+                ufos = list(executor.map(open_ufo, ufo_paths.values()))
+        else:
+            ufos = [open_ufo(path) for path in ufo_paths.values()]
+        for (source, path), ufo in zip(ufo_paths.items(), ufos):
+            # FIXME: (jany) consider not changing the caller's objects
+            source.font = ufo
+            self._ufo_paths[id(ufo)] = path
+        for source in sources:
             if source.location is None:
                 source.location = {}
             for name in ("familyName", "styleName"):
@@ -786,6 +1041,15 @@ class GlyphsBuilder(_LoggerMixin):
                 ]
         return copy
 
+    def _open_ufo(self, ufo, lazy=False):
+        """Return the UFO `ufo`, loaded by the builder if it is a path."""
+        if not isinstance(ufo, (str, os.PathLike)):
+            return ufo
+        path = os.fspath(ufo)
+        ufo = util.open_ufo(path, self._ufo_class, lazy=lazy)
+        self._ufo_paths[id(ufo)] = path
+        return ufo
+
     def _fake_designspace(self, ufos):
         """Build a fake designspace with the given UFOs as sources, so that all
         builder functions can rely on the presence of a designspace.
@@ -860,7 +1124,12 @@ class GlyphsBuilder(_LoggerMixin):
     from .custom_params import to_glyphs_custom_params
     from .features import to_glyphs_features
     from .font import to_glyphs_font_attributes, to_glyphs_ordered_masters
-    from .glyph import to_glyphs_glyph, to_glyphs_glyph_height_and_vertical_origin
+    from .glyph import (
+        to_glyphs_glyph,
+        to_glyphs_glyph_attributes,
+        to_glyphs_glyph_height_and_vertical_origin,
+        to_glyphs_glyph_layer,
+    )
     from .groups import to_glyphs_groups
     from .guidelines import to_glyphs_guidelines
     from .hints import to_glyphs_hints
@@ -882,6 +1151,52 @@ class GlyphsBuilder(_LoggerMixin):
     )
 
 
+def _to_glyphs_master_layers(data, minimize_ufo_diffs):
+    """Build the layers of one master in a worker process of
+    `GlyphsBuilder.font`.
+
+    `data` is the pickled UFO (or path of the UFO and class to load it with)
+    and GSFontMaster of the master. Return the pickled list of the names of the
+    glyphs of the UFO, with the layers of the master of each glyph, in the
+    order in which they were built.
+    """
+    with gc_disabled():
+        ufo, master = pickle.loads(data)
+    loaded = isinstance(ufo, tuple)
+    if loaded:
+        ufo = util.open_ufo(*ufo)
+    builder = GlyphsBuilder(ufos=[ufo], minimize_ufo_diffs=minimize_ufo_diffs)
+    if loaded:
+        # Like the main process did with its copy.
+        builder._to_glyphs_bracket_layers(ufo)
+    # The layer proxies need glyphs that belong to a font with the master.
+    builder._font = classes.GSFont()
+    builder._font.masters.append(master)
+    glyphs = OrderedDict()
+    for layer in _sorted_backgrounds_last(ufo.layers):
+        for ufo_glyph in layer:
+            glyph = glyphs.get(ufo_glyph.name)
+            if glyph is None:
+                glyph = glyphs[ufo_glyph.name] = classes.GSGlyph(
+                    name=builder._intern(ufo_glyph.name)
+                )
+                builder._font.glyphs.append(glyph)
+            builder.to_glyphs_glyph_layer(ufo_glyph, layer, glyph, master)
+
+    result = []
+    for glyph_name, glyph in glyphs.items():
+        layers = list(glyph._layers.values())
+        # Don't send the glyphs with the layers: they are added to the glyphs of
+        # the font in the main process.
+        for layer in layers:
+            layer.parent = None
+            if layer._background is not None:
+                layer._background.parent = None
+        result.append((glyph_name, layers))
+    with gc_disabled():
+        return pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+
+
 def _sorted_backgrounds_last(ufo_layers):
     # Stable sort that groups all foregrounds first and all backgrounds last
     return sorted(
@@ -115,7 +115,7 @@ def to_ufo_components_background_decompose(self, ufo_glyph, layer):
 
 def to_glyphs_components(self, ufo_glyph, layer):
     for comp in ufo_glyph.components:
-        component = self.glyphs_module.GSComponent(comp.baseGlyph)
+        component = self.glyphs_module.GSComponent(self._intern(comp.baseGlyph))
         component.transform = Transform(*comp.transformation)
         layer.components.append(component)
 
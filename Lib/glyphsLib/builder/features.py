@@ -30,8 +30,13 @@ def autostr(automatic):
     return "# automatic\n" if automatic else ""
 
 
-def to_ufo_features(self):
+def to_ufo_features(self, master_ids=None):
+    """Write the features of the master UFOs, or only of the masters with the
+    given ids.
+    """
     for master_id, source in self._sources.items():
+        if master_ids is not None and master_id not in master_ids:
+            continue
         master = self.font.masters[master_id]
         ufo = source.font
 
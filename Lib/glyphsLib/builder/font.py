@@ -48,9 +48,11 @@ def to_ufo_font_attributes(self, family_name):
     manufacturer_url = font.manufacturerURL
     # XXX note is unused?
     # note = font.note
-    glyph_order = list(glyph.name for glyph in font.glyphs)
+    glyph_order = list(glyph.name for glyph in self._selected_glyphs())
 
     for index, master in enumerate(font.masters):
+        if master.id not in self._master_ids:
+            continue
         source = self._designspace.newSourceDescriptor()
         ufo = self.ufo_module.Font()
         source.font = ufo
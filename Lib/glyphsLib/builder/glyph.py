@@ -151,12 +151,20 @@ def to_ufo_glyph(self, ufo_glyph, layer, glyph):  # noqa: C901
         self.to_ufo_glyph_height_and_vertical_origin(ufo_glyph, layer)
 
 
-def to_glyphs_glyph(self, ufo_glyph, ufo_layer, master):  # noqa: C901
+def to_glyphs_glyph(self, ufo_glyph, ufo_layer, master):
     """Add UFO glif metadata, paths, components, and anchors to a GSGlyph.
     If the matching GSGlyph does not exist, then it is created,
     else it is updated with the new data.
     In all cases, a matching GSLayer is created in the GSGlyph to hold paths.
     """
+    glyph = self.to_glyphs_glyph_attributes(ufo_glyph, master)
+    self.to_glyphs_glyph_layer(ufo_glyph, ufo_layer, glyph, master)
+
+
+def to_glyphs_glyph_attributes(self, ufo_glyph, master):  # noqa: C901
+    """Add the UFO glif metadata that belongs to the GSGlyph (not to its
+    layers), creating the GSGlyph if it does not exist. Return the GSGlyph.
+    """
 
     # FIXME: (jany) split between glyph and layer attributes
     #        have a write the first time, compare the next times for glyph
@@ -173,7 +181,7 @@ def to_glyphs_glyph(self, ufo_glyph, ufo_layer, master):  # noqa: C901
             glyph = glyph_object
             break
     if glyph is None:
-        glyph = self.glyphs_module.GSGlyph(name=ufo_glyph_name)
+        glyph = self.glyphs_module.GSGlyph(name=self._intern(ufo_glyph_name))
         # FIXME: (jany) ordering?
         self.font.glyphs.append(glyph)
 
@@ -206,6 +214,32 @@ def to_glyphs_glyph(self, ufo_glyph, ufo_layer, master):  # noqa: C901
         # glyphinfo = glyphsLib.glyphdata.get_glyph(ufo_glyph.name)
         # production_name = glyph.production or glyphinfo.production_name
 
+    for key in ["leftMetricsKey", "rightMetricsKey", "widthMetricsKey"]:
+        full_key = GLYPHLIB_PREFIX + "glyph." + key
+        if full_key in ufo_glyph.lib:
+            setattr(glyph, key, ufo_glyph.lib[full_key])
+
+    if SCRIPT_LIB_KEY in ufo_glyph.lib:
+        glyph.script = ufo_glyph.lib[SCRIPT_LIB_KEY]
+
+    if GLYPHLIB_PREFIX + "category" in ufo_glyph.lib:
+        # TODO: (jany) store category only if different from glyphinfo?
+        glyph.category = ufo_glyph.lib[GLYPHLIB_PREFIX + "category"]
+    if GLYPHLIB_PREFIX + "subCategory" in ufo_glyph.lib:
+        glyph.subCategory = ufo_glyph.lib[GLYPHLIB_PREFIX + "subCategory"]
+
+    self.to_glyphs_glyph_user_data(ufo_font, glyph)
+    self.to_glyphs_smart_component_axes(ufo_glyph, glyph)
+    return glyph
+
+
+def to_glyphs_glyph_layer(self, ufo_glyph, ufo_layer, glyph, master):
+    """Add the GSLayer of `glyph` that matches the UFO layer `ufo_layer` of
+    `master`, with the paths, components, anchors... of the UFO glyph.
+
+    Only the layers of `master` are looked at, so the layers of each master can
+    be built apart from the others (see `GlyphsBuilder.font`).
+    """
     glyphinfo = glyphsLib.glyphdata.get_glyph(ufo_glyph.name)
 
     layer = self.to_glyphs_layer(ufo_layer, glyph, master)
@@ -216,30 +250,16 @@ def to_glyphs_glyph(self, ufo_glyph, ufo_layer, master):  # noqa: C901
         # didn't know whether it originally came from the layer of the glyph,
         # so it's easier to put it back on the most specific level, i.e. the
         # layer)
-        for prefix, glyphs_object in (
-            ("glyph.", glyph),
-            ("", layer),
-            ("layer.", layer),
-        ):
+        for prefix in ("", "layer."):
             full_key = GLYPHLIB_PREFIX + prefix + key
             if full_key in ufo_glyph.lib:
                 value = ufo_glyph.lib[full_key]
-                setattr(glyphs_object, key, value)
+                setattr(layer, key, value)
 
-    if SCRIPT_LIB_KEY in ufo_glyph.lib:
-        glyph.script = ufo_glyph.lib[SCRIPT_LIB_KEY]
-
-    if GLYPHLIB_PREFIX + "category" in ufo_glyph.lib:
-        # TODO: (jany) store category only if different from glyphinfo?
-        category = ufo_glyph.lib[GLYPHLIB_PREFIX + "category"]
-        glyph.category = category
-    else:
-        category = glyphinfo.category
-    if GLYPHLIB_PREFIX + "subCategory" in ufo_glyph.lib:
-        sub_category = ufo_glyph.lib[GLYPHLIB_PREFIX + "subCategory"]
-        glyph.subCategory = sub_category
-    else:
-        sub_category = glyphinfo.subCategory
+    category = ufo_glyph.lib.get(GLYPHLIB_PREFIX + "category", glyphinfo.category)
+    sub_category = ufo_glyph.lib.get(
+        GLYPHLIB_PREFIX + "subCategory", glyphinfo.subCategory
+    )
 
     # load width before background, which is loaded with lib data
     if hasattr(layer, "foreground"):
@@ -260,9 +280,7 @@ def to_glyphs_glyph(self, ufo_glyph, ufo_layer, master):  # noqa: C901
     self.to_glyphs_guidelines(ufo_glyph, layer)
     self.to_glyphs_annotations(ufo_glyph, layer)
     self.to_glyphs_hints(ufo_glyph, layer)
-    self.to_glyphs_glyph_user_data(ufo_font, glyph)
     self.to_glyphs_layer_user_data(ufo_glyph, layer)
-    self.to_glyphs_smart_component_axes(ufo_glyph, glyph)
 
     self.to_glyphs_paths(ufo_glyph, layer)
     self.to_glyphs_components(ufo_glyph, layer)
@@ -25,8 +25,28 @@ UFO_GROUPS_NOT_IN_FEATURE_KEY = GLYPHLIB_PREFIX + "groupsNotInFeature"
 UFO_KERN_GROUP_PATTERN = re.compile("^public\\.kern([12])\\.(.*)$")
 
 
-def to_ufo_groups(self):
-    # Build groups once and then apply to all UFOs.
+def to_ufo_groups(self, master_ids=None):
+    """Write the groups of the master UFOs, or only of the masters with the
+    given ids.
+
+    The groups are the same in all the masters, so they are computed once:
+    the calls with `master_ids` reuse the groups computed by the previous
+    call, and the calls without recompute them from the font.
+    """
+    if master_ids is None or self._ufo_groups is None:
+        self._ufo_groups = _ufo_groups(self)
+
+    # Update all UFOs with the same info
+    for master_id, source in self._sources.items():
+        if master_ids is not None and master_id not in master_ids:
+            continue
+        for name, glyphs in self._ufo_groups.items():
+            # Shallow copy to prevent unexpected object sharing
+            source.font.groups[name] = glyphs[:]
+
+
+def _ufo_groups(self):
+    """Return the groups of the master UFOs, by group name."""
     groups = defaultdict(list)
 
     # Classes usually go to the feature file, unless we have our custom flag
@@ -55,6 +75,11 @@ def to_ufo_groups(self):
                 # Restore empty group
                 groups[group] = []
             for glyph_name in glyphs:
+                if (
+                    self._glyph_names is not None
+                    and glyph_name not in self._glyph_names
+                ):
+                    continue
                 # Check that the original value is still valid
                 match = UFO_KERN_GROUP_PATTERN.match(group)
                 side = match.group(1)
@@ -71,7 +96,7 @@ def to_ufo_groups(self):
                     recovered.add((glyph_name, int(side)))
 
     # Read modified grouping values
-    for glyph in self.font.glyphs.values():
+    for glyph in self._selected_glyphs():
         for side in 1, 2:
             if (glyph.name, side) not in recovered:
                 attr = _glyph_kerning_attr(glyph, side)
@@ -79,12 +104,7 @@ def to_ufo_groups(self):
                 if group:
                     group = f"public.kern{side}.{group}"
                     groups[group].append(glyph.name)
-
-    # Update all UFOs with the same info
-    for source in self._sources.values():
-        for name, glyphs in groups.items():
-            # Shallow copy to prevent unexpected object sharing
-            source.font.groups[name] = glyphs[:]
+    return groups
 
 
 def to_glyphs_groups(self):
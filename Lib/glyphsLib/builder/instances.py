@@ -327,7 +327,7 @@ def set_width_class(ufo, designspace, instance):
     _set_class_from_instance(ufo, designspace, instance, "wdth")
 
 
-def apply_instance_data(designspace, include_filenames=None, Font=None):
+def apply_instance_data(designspace, include_filenames=None, Font=None, jobs=1):
     """Open UFO instances referenced by designspace, apply Glyphs instance
     data if present, re-save UFOs and return updated UFO Font objects.
 
@@ -339,8 +339,13 @@ def apply_instance_data(designspace, include_filenames=None, Font=None):
             processed.
         Font: a callable(path: str) -> Font, used to load a UFO, such as
             defcon.Font class (default: ufoLib2.Font.open).
+        jobs: number of instances processed concurrently, in threads. Loading
+            and saving UFOs is mostly I/O, which threads can overlap. None
+            picks a number based on the number of CPUs. Default: 1, one
+            instance after the other, as are 0 and negative numbers.
     Returns:
-        List of opened and updated instance UFOs.
+        List of opened and updated instance UFOs, in the order of the
+        instances in the designspace.
     """
     from fontTools.designspaceLib import DesignSpaceDocument
     from os.path import normcase, normpath
@@ -356,10 +361,10 @@ def apply_instance_data(designspace, include_filenames=None, Font=None):
         designspace = DesignSpaceDocument.fromfile(designspace)
 
     basedir = os.path.dirname(designspace.path)
-    instance_ufos = []
     if include_filenames is not None:
         include_filenames = {normcase(normpath(p)) for p in include_filenames}
 
+    instances = []
     for designspace_instance in designspace.instances:
         fname = designspace_instance.filename
         assert fname is not None, "instance %r missing required filename" % getattr(
@@ -369,7 +374,10 @@ def apply_instance_data(designspace, include_filenames=None, Font=None):
             fname = normcase(normpath(fname))
             if fname not in include_filenames:
                 continue
+        instances.append((fname, designspace_instance))
 
+    def apply(args):
+        fname, designspace_instance = args
         logger.debug("Applying instance data to %s", fname)
         # fontmake <= 1.4.0 compares the ufo paths returned from this function
         # to the keys of a dict of designspace locations that have been passed
@@ -379,8 +387,16 @@ def apply_instance_data(designspace, include_filenames=None, Font=None):
         apply_instance_data_to_ufo(ufo, designspace_instance, designspace)
 
         ufo.save()
-        instance_ufos.append(ufo)
-    return instance_ufos
+        return ufo
+
+    if (jobs is not None and jobs <= 1) or len(instances) <= 1:
+        return [apply(args) for args in instances]
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        # map returns the results in order, and re-raises the first error.
+        return list(executor.map(apply, instances))
 
 
 def apply_instance_data_to_ufo(ufo, instance, designspace):
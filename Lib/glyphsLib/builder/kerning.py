@@ -18,9 +18,15 @@ import re
 UFO_KERN_GROUP_PATTERN = re.compile("^public\\.kern([12])\\.(.*)$")
 
 
-def to_ufo_kerning(self):
+def to_ufo_kerning(self, master_ids=None):
+    """Write the kerning of the master UFOs, or only of the masters with the
+    given ids.
+    """
     for master_id, kerning in self.font.kerning.items():
-        _to_ufo_kerning(self, self._sources[master_id].font, kerning)
+        if master_ids is not None and master_id not in master_ids:
+            continue
+        if master_id in self._master_ids:
+            _to_ufo_kerning(self, self._sources[master_id].font, kerning)
 
 
 def _to_ufo_kerning(self, ufo, kerning_data):
@@ -34,14 +40,23 @@ def _to_ufo_kerning(self, ufo, kerning_data):
         if left_is_class:
             left = "public.kern1.%s" % match.group(1)
             if left not in ufo.groups:
+                if self._glyph_names is not None:
+                    # None of the glyphs of the group are converted
+                    continue
                 self.logger.warning(warning_msg % left)
+        elif self._glyph_names is not None and left not in self._glyph_names:
+            continue
         for right, kerning_val in pairs.items():
             match = re.match(r"@MMK_R_(.+)", right)
             right_is_class = bool(match)
             if right_is_class:
                 right = "public.kern2.%s" % match.group(1)
                 if right not in ufo.groups:
+                    if self._glyph_names is not None:
+                        continue
                     self.logger.warning(warning_msg % right)
+            elif self._glyph_names is not None and right not in self._glyph_names:
+                continue
             ufo.kerning[left, right] = kerning_val
 
 
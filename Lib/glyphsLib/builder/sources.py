@@ -34,8 +34,12 @@ logger = logging.getLogger(__name__)
 
 
 def to_designspace_sources(self):
+    masters = [m for m in self.font.masters if m.id in self._master_ids]
     regular_master = get_regular_master(self.font)
-    for master in self.font.masters:
+    if masters and regular_master not in masters:
+        # Only some of the masters are converted
+        regular_master = masters[0]
+    for master in masters:
         _to_designspace_source(self, master, (master is regular_master))
     _to_designspace_source_layer(self)
     _warn_duplicate_master_locations(self)
@@ -150,12 +154,13 @@ def _to_designspace_source_layer(self):
     # they belong to.
     layer_name_to_master_ids = collections.defaultdict(set)
     layer_name_to_glyph_names = collections.defaultdict(list)
-    for glyph in self.font.glyphs:
+    for glyph in self._selected_glyphs():
         for layer in glyph.layers:
             if (
                 "{" in layer.name
                 and "}" in layer.name
                 and ".background" not in layer.name
+                and layer.associatedMasterId in self._master_ids
             ):
                 layer_name_to_master_ids[layer.name].add(layer.associatedMasterId)
                 layer_name_to_glyph_names[layer.name].append(glyph.name)
@@ -0,0 +1,227 @@
+# Copyright 2020 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""On-disk cache of parsed .glyphs files.
+
+Parsing a big .glyphs file takes a while, and pipelines often load the same
+unchanged file several times. When given a cache directory, `GSFont(path)`,
+`glyphsLib.load` and `glyphsLib.loads` store the parsed object graph there,
+pickled, and load it back instead of parsing the file the next time:
+
+    font = glyphsLib.GSFont("MyFont.glyphs", cache_dir=".glyphs-cache")
+
+Entries are keyed by a hash of the file contents, `CACHE_FORMAT`, the
+glyphsLib version and the Python version, so a changed file or a different
+glyphsLib version never gets a stale font. Fonts are always fully parsed
+before they are cached, so the `lazy` option of `GSFont`, `load` and `loads`
+can't be used with a cache directory. Entries that can't be loaded are treated as missing and
+removed. When the total size of the entries goes beyond `DEFAULT_MAX_SIZE`,
+the least recently used ones are deleted.
+
+Only load cache directories that you trust: like any pickle, a cache entry
+can run arbitrary code when it is loaded.
+"""
+
+import hashlib
+import io
+import logging
+import os
+import pickle
+import sys
+import tempfile
+
+import glyphsLib
+from glyphsLib import parser
+from glyphsLib.tracing import span
+from glyphsLib.util import gc_disabled
+
+__all__ = [
+    "parse_into_object",
+    "cache_key",
+    "prune",
+    "CACHE_FORMAT",
+    "DEFAULT_MAX_SIZE",
+]
+
+logger = logging.getLogger(__name__)
+
+# The version of the format of the entries, part of their key. Bump it whenever
+# the pickled classes change (their slots, attributes or the types of their
+# values): the version of glyphsLib doesn't change in source checkouts.
+CACHE_FORMAT = 1
+
+# Maximum total size in bytes of the entries of a cache directory.
+DEFAULT_MAX_SIZE = 2 * 1024 ** 3
+
+_SUFFIX = ".glyphs-pickle"
+_FONT_ID = "font"
+
+
+def cache_key(data):
+    """Return the key of the cache entry for the .glyphs source `data` (str or
+    UTF-8 encoded bytes).
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    digest = hashlib.sha256()
+    digest.update(
+        "format {} glyphsLib {} python {}.{} pickle {}\0".format(
+            CACHE_FORMAT,
+            glyphsLib.__version__,
+            *sys.version_info[:2],
+            pickle.HIGHEST_PROTOCOL,
+        ).encode("ascii")
+    )
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def parse_into_object(font, data, cache_dir, max_size=DEFAULT_MAX_SIZE, jobs=1):
+    """Parse the .glyphs source `data` (str or UTF-8 encoded bytes) into the
+    new GSFont `font`, like `glyphsLib.parser.parse_into_object` with `jobs`
+    processes, going through the cache in `cache_dir`. The directory is
+    created if needed.
+    """
+    path = os.path.join(cache_dir, cache_key(data) + _SUFFIX)
+    with span("load_cache", path=path):
+        loaded = _load_entry(font, path)
+    if loaded:
+        logger.info("Loaded <GSFont> from cache entry %s", path)
+        return
+
+    parser.parse_into_object(font, data, jobs)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with span("write_cache", path=path):
+            _write_entry(font, path)
+            prune(cache_dir, max_size, keep=path)
+    except OSError as e:
+        # The cache is an optimization, failing to write it is not an error.
+        logger.warning("Could not write cache entry %s: %s", path, e)
+
+
+def prune(cache_dir, max_size=DEFAULT_MAX_SIZE, keep=None):
+    """Delete the least recently used entries of `cache_dir` until their total
+    size is at most `max_size` bytes. The entry at path `keep` is not deleted.
+    """
+    entries = []
+    total = 0
+    with os.scandir(cache_dir) as it:
+        for entry in it:
+            if not entry.name.endswith(_SUFFIX):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:  # deleted by another process
+                continue
+            entries.append((stat.st_mtime, entry.path, stat.st_size))
+            total += stat.st_size
+    entries.sort()
+    for _, path, size in entries:
+        if total <= max_size:
+            break
+        if keep is not None and os.path.abspath(path) == os.path.abspath(keep):
+            continue
+        _remove(path)
+        total -= size
+
+
+class _Pickler(pickle.Pickler):
+    # The back-references to the root font (parents of the glyphs, fonts of
+    # the masters...) are stored as a persistent id, so that they can point to
+    # the GSFont instance being loaded.
+
+    def __init__(self, file, font):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.font = font
+
+    def persistent_id(self, obj):
+        if obj is self.font:
+            return _FONT_ID
+        return None
+
+
+class _Unpickler(pickle.Unpickler):
+    def __init__(self, file, font):
+        super().__init__(file)
+        self.font = font
+
+    def persistent_load(self, pid):
+        if pid != _FONT_ID:
+            raise pickle.UnpicklingError("unknown persistent id {!r}".format(pid))
+        return self.font
+
+
+def _get_state(obj):
+    """Return a dict of the attributes of `obj`, slots included."""
+    state = dict(getattr(obj, "__dict__", {}))
+    for cls in type(obj).__mro__:
+        slots = cls.__dict__.get("__slots__", ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        for name in slots:
+            try:
+                state[name] = object.__getattribute__(obj, name)
+            except AttributeError:  # unset slot
+                pass
+    return state
+
+
+def _write_entry(font, path):
+    buffer = io.BytesIO()
+    with gc_disabled():
+        _Pickler(buffer, font).dump(_get_state(font))
+    # Write to a temporary file renamed at the end, so that other processes
+    # never see a partially written entry.
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(buffer.getvalue())
+        os.replace(tmp_path, path)
+    except BaseException:
+        _remove(tmp_path)
+        raise
+
+
+def _load_entry(font, path):
+    """Fill in `font` from the cache entry at `path`. Return False if there is
+    no usable entry.
+    """
+    try:
+        with open(path, "rb") as fp:
+            data = fp.read()
+    except OSError:
+        return False
+    try:
+        with gc_disabled():
+            state = _Unpickler(io.BytesIO(data), font).load()
+    except Exception as e:
+        logger.warning("Removing unreadable cache entry %s: %s", path, e)
+        _remove(path)
+        return False
+    for name, value in state.items():
+        object.__setattr__(font, name, value)
+    try:
+        # Mark the entry as recently used for `prune`.
+        os.utime(path)
+    except OSError:
+        pass
+    return True
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
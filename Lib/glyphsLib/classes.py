@@ -14,6 +14,7 @@
 
 
 import copy
+import datetime
 import logging
 import math
 import os
@@ -23,6 +24,7 @@ from collections import OrderedDict
 from io import StringIO
 from typing import Any, Dict, Optional, Tuple, Union
 
+from fontTools.misc.transform import Transform as FontToolsTransform
 from fontTools.pens.basePen import AbstractPen
 from fontTools.pens.pointPen import (
     AbstractPointPen,
@@ -32,7 +34,7 @@ from fontTools.pens.pointPen import (
 
 import glyphsLib
 from glyphsLib.affine import Affine
-from glyphsLib.parser import Parser
+from glyphsLib.parser import Parser, parse_into_object
 from glyphsLib.types import (
     Point,
     Rect,
@@ -70,6 +72,7 @@ __all__ = [
     "GSAnnotation",
     "GSHint",
     "GSBackgroundImage",
+    "ComponentGraph",
     # Constants
     "__all__",
     "MOVE",
@@ -142,6 +145,15 @@ CURVE = "curve"
 OFFCURVE = "offcurve"
 QCURVE = "qcurve"
 
+# The node types of the .glyphs files, shared by all the nodes.
+_NODE_TYPE_NAMES = {
+    "LINE": LINE,
+    "CURVE": CURVE,
+    "QCURVE": QCURVE,
+    "OFFCURVE": OFFCURVE,
+    "n/a": "n/a",
+}
+
 TAG = -2
 TOPGHOST = -1
 STEM = 0
@@ -312,6 +324,75 @@ class GSApplication:
 Glyphs = GSApplication()
 
 
+# The decoders of the keys of the .glyphs files, by class, see GSBase._decoders.
+_DECODERS = {}
+
+
+class _RawValue:
+    """The text of a value of a .glyphs file, stored by the parser in lazy
+    mode, until the value is used.
+    """
+
+    __slots__ = ("text",)
+
+    def __init__(self, text):
+        self.text = text
+
+    def __repr__(self):
+        return f"<_RawValue {self.text!r}>"
+
+
+class _LazySlot:
+    """Wrap the slot that holds the value of `key` for the GS* classes with
+    `_lazyKeys`: a `_RawValue` found there is parsed when it is first read.
+    """
+
+    __slots__ = ("slot", "key")
+
+    def __init__(self, slot, key):
+        self.slot = slot
+        self.key = key
+
+    def __get__(self, obj, cls=None):
+        if obj is None:
+            return self
+        value = self.slot.__get__(obj, cls)
+        if type(value) is _RawValue:
+            value = _decode_raw_value(obj, self.key, value)
+            self.slot.__set__(obj, value)
+        return value
+
+    def __set__(self, obj, value):
+        self.slot.__set__(obj, value)
+
+
+def _decode_raw_value(obj, key, raw):
+    value_type = type(obj)._decoders()[key][0]
+    value, _ = Parser(current_type=value_type)._parse(raw.text, 0)
+    if type(value) is list:
+        # Like the proxies of the lists of objects.
+        for item in value:
+            if isinstance(item, GSBase):
+                item._parent = obj
+    return value
+
+
+def _setup_lazy_slots(cls):
+    for key, name in cls._lazyKeys.items():
+        setattr(cls, name, _LazySlot(cls.__dict__[name], key))
+
+
+def _raw_value(obj, name):
+    """Return the `_RawValue` in the lazy slot `name` of `obj`, or None if it
+    holds a parsed value.
+    """
+    try:
+        value = getattr(type(obj), name).slot.__get__(obj)
+    except AttributeError:  # unset slot
+        return None
+    return value if type(value) is _RawValue else None
+
+
 class GSBase:
     """Represent the base class for all GS classes.
 
@@ -324,11 +405,21 @@ class GSBase:
             to imply by their absence.
         _wrapperKeysTranslate (dict): Used to map field names to GS* instance variables
             during (de)serialization.
+        _lazyKeys (dict): The rarely used keys that the parser doesn't parse in
+            lazy mode, mapped to the slots that keep their text until they are read.
+        _identifierKeys (frozenset): The keys whose string values (ids, names) are
+            repeated across a font, which the parser interns.
     """
 
     _classesForName = {}
     _defaultsForName = {}
     _wrapperKeysTranslate = {}
+    # The keys whose values the parser keeps as text in lazy mode, until they
+    # are used, with the slot that holds them.
+    _lazyKeys = {}
+    # The keys whose values are identifiers that the parser shares between
+    # the objects of a font.
+    _identifierKeys = frozenset()
 
     def __repr__(self):
         content = ""
@@ -365,6 +456,45 @@ class GSBase:
         key = self._wrapperKeysTranslate.get(key, key)
         setattr(self, key, value)
 
+    @classmethod
+    def _decoders(cls):
+        """Return the dict mapping the keys of the .glyphs files to their
+        `_decoder`, for the keys of `_classesForName`. The parser adds the
+        other keys that it finds to it.
+        """
+        decoders = _DECODERS.get(cls)
+        if decoders is None:
+            decoders = _DECODERS[cls] = {
+                key: cls._decoder(key) for key in cls._classesForName
+            }
+        return decoders
+
+    @classmethod
+    def _decoder(cls, key):
+        """Return a (type, setter) tuple for the values of `key` in the
+        .glyphs files: the type that the parser must read them as, like
+        `classForName`, and a function that sets them on an object like
+        `__setitem__` does, for the values that are not bytes.
+
+        Subclasses that override `__setitem__` must override this too.
+        """
+        value_type = cls._classesForName.get(key, str)
+        name = cls._wrapperKeysTranslate.get(key, key)
+        for klass in cls.__mro__:
+            if name in klass.__dict__:
+                descriptor = klass.__dict__[name]
+                if type(descriptor) is _LazySlot:
+                    descriptor = descriptor.slot
+                # Slots and properties are set without going through setattr.
+                if hasattr(type(descriptor), "__set__"):
+                    return value_type, descriptor.__set__
+                break
+
+        def setter(obj, value):
+            setattr(obj, name, value)
+
+        return value_type, setter
+
     def shouldWriteValueForKey(self, key):
         getKey = self._wrapperKeysTranslate.get(key, key)
         value = getattr(self, getKey)
@@ -380,6 +510,191 @@ class GSBase:
             return False
         return True
 
+    def clone(self):
+        """Return a copy of this object and of all the objects it contains.
+
+        The references between the copied objects (the parents of the layers,
+        paths and nodes, the font of the masters, the foreground of the
+        background layers, the nodes of the hints...) point to the copies.
+        The references to objects outside of the copied tree, like the parent
+        of a copied glyph, point to the same objects as the original's.
+        Strings, numbers and other immutable values are shared.
+
+        Unlike `copy.deepcopy`, which follows the parent references and so
+        copies the whole font, this only walks the tree of the object once.
+        """
+        return _Cloner().clone(self)
+
+
+# The attributes of the GS* classes that refer to objects that they don't own:
+# `GSBase.clone` doesn't copy them, but makes them point to the copies of
+# their targets (or keeps their targets if they were not copied).
+_CLONE_LINK_ATTRIBUTES = frozenset(
+    [
+        "_foreground",
+        "_originNode",
+        "_otherNode1",
+        "_otherNode2",
+        "_parent",
+        "_selection",
+        "_targetNode",
+        "font",
+        "parent",
+    ]
+)
+# Attributes that are computed on demand and not copied by `GSBase.clone`.
+_CLONE_SKIPPED_ATTRIBUTES = frozenset(
+    ["_segments", "_componentBounds", "_componentGraph"]
+)
+_CLONE_IMMUTABLE_TYPES = frozenset(
+    [str, int, float, bool, type(None), bytes, datetime.datetime, _RawValue]
+)
+# The slot descriptors of each GS* class, by class.
+_CLONE_SLOTS = {}
+
+
+def _clone_slots(cls):
+    slots = _CLONE_SLOTS.get(cls)
+    if slots is None:
+        slots = {}
+        for klass in reversed(cls.__mro__):
+            names = klass.__dict__.get("__slots__", ())
+            if isinstance(names, str):
+                names = (names,)
+            for name in names:
+                if name not in ("__dict__", "__weakref__"):
+                    # The raw values of the lazy slots are copied as they are.
+                    descriptor = klass.__dict__[name]
+                    slots[name] = getattr(descriptor, "slot", descriptor)
+        slots = _CLONE_SLOTS[cls] = tuple(slots.items())
+    return slots
+
+
+class _Cloner:
+    """Copy a tree of GS* objects for `GSBase.clone`, in two passes: the first
+    copies the objects, the second sets the references between them.
+    """
+
+    def __init__(self):
+        # Maps the ids of the copied objects to their copies, like the memo of
+        # copy.deepcopy, which is used for the other types of values.
+        self.memo = {}
+        self.slot_links = []
+        self.dict_links = []
+
+    def clone(self, obj):
+        result = self.copy(obj)
+        for copied, descriptor, target in self.slot_links:
+            descriptor.__set__(copied, self.link(target))
+        for attributes, name, target in self.dict_links:
+            attributes[name] = self.link(target)
+        return result
+
+    def link(self, target):
+        if type(target) is list:
+            return [self.memo.get(id(item), item) for item in target]
+        return self.memo.get(id(target), target)
+
+    def copy(self, value):
+        cls = type(value)
+        if cls in _CLONE_IMMUTABLE_TYPES:
+            return value
+        if cls is list:
+            return [self.copy(item) for item in value]
+        copied = self.memo.get(id(value))
+        if copied is not None:
+            return copied
+        if cls is GSNode:
+            return self.copy_node(value)
+        if isinstance(value, GSBase):
+            return self.copy_object(value)
+        if cls is Point and value.rect is None:
+            copied = Point.__new__(Point)
+            copied.value = list(value.value)
+            copied.rect = None
+            return copied
+        if cls is Transform:
+            copied = Transform.__new__(Transform)
+            copied.value = list(value.value)
+            return copied
+        if cls is dict or cls is OrderedDict:
+            copied = cls()
+            for key, item in value.items():
+                copied[key] = self.copy(item)
+            return copied
+        return copy.deepcopy(value, self.memo)
+
+    def copy_node(self, node):
+        # The nodes are by far the most numerous objects, copy them without
+        # going through their slots one by one.
+        copied = GSNode.__new__(GSNode)
+        self.memo[id(node)] = copied
+        position = node._position.value
+        copied._position = _NodePosition(position[0], position[1], copied)
+        copied._smooth = node._smooth
+        copied._type = node._type
+        user_data = node._userData
+        copied._userData = None if user_data is None else self.copy(user_data)
+        attributes = copied.__dict__
+        for name, value in node.__dict__.items():
+            if name in _CLONE_LINK_ATTRIBUTES:
+                self.dict_links.append((attributes, name, value))
+            else:
+                attributes[name] = self.copy(value)
+        return copied
+
+    def copy_object(self, obj):
+        cls = type(obj)
+        copied = cls.__new__(cls)
+        self.memo[id(obj)] = copied
+        for name, descriptor in _clone_slots(cls):
+            try:
+                value = descriptor.__get__(obj, cls)
+            except AttributeError:  # unset slot
+                continue
+            if name in _CLONE_LINK_ATTRIBUTES:
+                self.slot_links.append((copied, descriptor, value))
+            else:
+                descriptor.__set__(copied, self.copy(value))
+        attributes = copied.__dict__
+        for name, value in obj.__dict__.items():
+            if name in _CLONE_LINK_ATTRIBUTES:
+                self.dict_links.append((attributes, name, value))
+            elif name not in _CLONE_SKIPPED_ATTRIBUTES:
+                attributes[name] = self.copy(value)
+        return copied
+
+
+# The values computed from the objects and cached on them: the fingerprints of
+# `glyphsLib.fingerprint`, the segments and bounds of the paths, the bounds of
+# the paths of the layers and, on the font, the bounds of the layers used by
+# components and the component graph.
+_CACHED_ATTRIBUTES = (
+    "_fingerprint",
+    "_segments",
+    "_bounds",
+    "_componentBounds",
+    "_componentGraph",
+)
+
+
+def _invalidate_caches(obj, attributes=_CACHED_ATTRIBUTES):
+    """Forget the values cached on `obj` and on the objects that contain it."""
+    while obj is not None:
+        cached = obj.__dict__
+        for name in attributes:
+            cached.pop(name, None)
+        if isinstance(obj, GSLayer):
+            # The background layers are part of their foreground layer.
+            obj = obj._foreground or obj.parent
+        elif isinstance(obj, GSGlyph):
+            # The caches of the font only need to follow this glyph.
+            if obj.parent is not None:
+                _glyph_changed(obj.parent, obj)
+            return
+        else:
+            obj = getattr(obj, "_parent", None)
+
 
 class Proxy:
     __slots__ = "_owner"
@@ -420,7 +735,10 @@ class Proxy:
         return list(self)
 
     def __deepcopy__(self, memo):
-        return [x.copy() for x in self.values()]
+        return [
+            x.clone() if isinstance(x, GSBase) else copy.deepcopy(x, memo)
+            for x in self.values()
+        ]
 
     def setter(self, values):
         method = self.setterMethod()
@@ -608,14 +926,17 @@ class FontGlyphsProxy(Proxy):
 
     def __setitem__(self, key, glyph):
         if type(key) is int:
+            old_glyph = self._owner._glyphs[key]
             self._owner._setupGlyph(glyph)
             self._owner._glyphs[key] = glyph
+            _glyph_removed(self._owner, old_glyph)
+            _glyph_added(self._owner, glyph)
         else:
             raise KeyError  # TODO: add other access methods
 
     def __delitem__(self, key):
         if isinstance(key, int):
-            del self._owner._glyphs[key]
+            glyph = self._owner._glyphs.pop(key)
         elif isString(key):
             glyph = self._get_glyph_by_string(key)
             if not glyph:
@@ -623,6 +944,7 @@ class FontGlyphsProxy(Proxy):
             self._owner._glyphs.remove(glyph)
         else:
             raise KeyError
+        _glyph_removed(self._owner, glyph)
 
     def __contains__(self, item):
         if isString(item):
@@ -634,7 +956,7 @@ class FontGlyphsProxy(Proxy):
         if isinstance(key, str):
             # by glyph name
             for glyph in self._owner._glyphs:
-                if glyph.name == key:
+                if glyph._name == key:
                     return glyph
             # by string representation as u'ä'
             if len(key) == 1:
@@ -661,16 +983,21 @@ class FontGlyphsProxy(Proxy):
     def append(self, glyph):
         self._owner._setupGlyph(glyph)
         self._owner._glyphs.append(glyph)
+        _glyph_added(self._owner, glyph)
 
     def extend(self, objects):
+        objects = list(objects)
         for glyph in objects:
             self._owner._setupGlyph(glyph)
-        self._owner._glyphs.extend(list(objects))
+        self._owner._glyphs.extend(objects)
+        for glyph in objects:
+            _glyph_added(self._owner, glyph)
 
     def __len__(self):
         return len(self._owner._glyphs)
 
     def setter(self, values):
+        _invalidate_caches(self._owner)
         if isinstance(values, Proxy):
             values = list(values)
         self._owner._glyphs = values
@@ -788,6 +1115,7 @@ class GlyphLayerProxy(Proxy):
             self._owner._layers[key] = layer
         else:
             raise KeyError
+        _invalidate_caches(self._owner)
 
     def __delitem__(self, key):
         if isinstance(key, int) and self._owner.parent:
@@ -796,6 +1124,7 @@ class GlyphLayerProxy(Proxy):
             Layer = self.__getitem__(key)
             key = Layer.layerId
         del self._owner._layers[key]
+        _invalidate_caches(self._owner)
 
     def __iter__(self):
         return LayersIterator(self._owner)
@@ -821,6 +1150,7 @@ class GlyphLayerProxy(Proxy):
             layer.layerId = str(uuid.uuid4()).upper()
         self._owner._setupLayer(layer, layer.layerId)
         self._owner._layers[layer.layerId] = layer
+        _invalidate_caches(self._owner)
 
     def extend(self, layers):
         for layer in layers:
@@ -846,6 +1176,7 @@ class GlyphLayerProxy(Proxy):
         for (key, layer) in newLayers.items():
             self._owner._setupLayer(layer, key)
         self._owner._layers = newLayers
+        _invalidate_caches(self._owner)
 
     def _ensureMasterLayers(self):
         # Ensure existence of master-linked layers (even for iteration, len() etc.)
@@ -878,6 +1209,7 @@ class LayerAnchorsProxy(Proxy):
             raise KeyError
 
     def __setitem__(self, key, anchor):
+        _invalidate_caches(self._owner)
         if isinstance(key, str):
             anchor.name = key
             for i, a in enumerate(self._owner._anchors):
@@ -890,6 +1222,7 @@ class LayerAnchorsProxy(Proxy):
             raise TypeError
 
     def __delitem__(self, key):
+        _invalidate_caches(self._owner)
         if isinstance(key, int):
             del self._owner._anchors[key]
         elif isinstance(key, str):
@@ -903,6 +1236,7 @@ class LayerAnchorsProxy(Proxy):
         return self._owner._anchors
 
     def append(self, anchor):
+        _invalidate_caches(self._owner)
         for i, a in enumerate(self._owner._anchors):
             if a.name == anchor.name:
                 anchor._parent = self._owner
@@ -914,16 +1248,19 @@ class LayerAnchorsProxy(Proxy):
             raise ValueError("Anchor must have name")
 
     def extend(self, anchors):
+        _invalidate_caches(self._owner)
         for anchor in anchors:
             anchor._parent = self._owner
         self._owner._anchors.extend(anchors)
 
     def remove(self, anchor):
+        _invalidate_caches(self._owner)
         if isinstance(anchor, str):
             anchor = self.values()[anchor]
         return self._owner._anchors.remove(anchor)
 
     def insert(self, index, anchor):
+        _invalidate_caches(self._owner)
         anchor._parent = self._owner
         self._owner._anchors.insert(index, anchor)
 
@@ -931,6 +1268,7 @@ class LayerAnchorsProxy(Proxy):
         return len(self._owner._anchors)
 
     def setter(self, anchors):
+        _invalidate_caches(self._owner)
         if isinstance(anchors, Proxy):
             anchors = list(anchors)
         self._owner._anchors = anchors
@@ -946,6 +1284,7 @@ class IndexedObjectsProxy(Proxy):
             raise KeyError
 
     def __setitem__(self, key, value):
+        _invalidate_caches(self._owner)
         if isinstance(key, int):
             self.values()[key] = value
             value._parent = self._owner
@@ -953,6 +1292,7 @@ class IndexedObjectsProxy(Proxy):
             raise KeyError
 
     def __delitem__(self, key):
+        _invalidate_caches(self._owner)
         if isinstance(key, int):
             del self.values()[key]
         else:
@@ -962,18 +1302,22 @@ class IndexedObjectsProxy(Proxy):
         return getattr(self._owner, self._objects_name)
 
     def append(self, value):
+        _invalidate_caches(self._owner)
         self.values().append(value)
         value._parent = self._owner
 
     def extend(self, values):
+        _invalidate_caches(self._owner)
         self.values().extend(values)
         for value in values:
             value._parent = self._owner
 
     def remove(self, value):
+        _invalidate_caches(self._owner)
         self.values().remove(value)
 
     def insert(self, index, value):
+        _invalidate_caches(self._owner)
         self.values().insert(index, value)
         value._parent = self._owner
 
@@ -981,6 +1325,7 @@ class IndexedObjectsProxy(Proxy):
         return len(self.values())
 
     def setter(self, values):
+        _invalidate_caches(self._owner)
         setattr(self._owner, self._objects_name, list(values))
         for value in self.values():
             value._parent = self._owner
@@ -1114,12 +1459,14 @@ class UserDataProxy(Proxy):
         return self._owner._userData.get(key)
 
     def __setitem__(self, key, value):
+        _invalidate_caches(self._owner)
         if self._owner._userData is not None:
             self._owner._userData[key] = value
         else:
             self._owner._userData = {key: value}
 
     def __delitem__(self, key):
+        _invalidate_caches(self._owner)
         if self._owner._userData is not None and key in self._owner._userData:
             del self._owner._userData[key]
 
@@ -1156,6 +1503,7 @@ class UserDataProxy(Proxy):
         return self._owner._userData.get(key)
 
     def setter(self, values):
+        _invalidate_caches(self._owner)
         self._owner._userData = values
 
 
@@ -1461,6 +1809,7 @@ class GSFontMaster(GSBase):
         "custom": "customName",
         "name": "_name",
     }
+    _identifierKeys = frozenset(["id"])
     _keyOrder = (
         "alignmentZones",
         "ascender",
@@ -1618,8 +1967,49 @@ class GSFontMaster(GSBase):
     )
 
 
+class _NodePosition(Point):
+    """The position of a GSNode. Changing its `x` or `y` (or its items) in
+    place forgets the fingerprints and geometry cached on the path of the node
+    (and on its layer and glyph), like setting the `position` of the node does.
+    """
+
+    __slots__ = "_node"
+
+    def __init__(self, x, y, node):
+        self.value = [x, y]
+        self.rect = None
+        self._node = node
+
+    @property
+    def x(self):
+        return self.value[0]
+
+    @x.setter
+    def x(self, value):
+        self.value[0] = value
+        self._changed()
+
+    @property
+    def y(self):
+        return self.value[1]
+
+    @y.setter
+    def y(self, value):
+        self.value[1] = value
+        self._changed()
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._changed()
+
+    def _changed(self):
+        path = self._node._parent
+        if path is not None:
+            _invalidate_caches(path)
+
+
 class GSNode(GSBase):
-    __slots__ = ("_userData", "_position", "smooth", "type")
+    __slots__ = ("_userData", "_position", "_smooth", "_type")
 
     _PLIST_VALUE_RE = re.compile(
         r'"([-.e\d]+) ([-.e\d]+) (LINE|CURVE|QCURVE|OFFCURVE|n/a)'
@@ -1632,11 +2022,11 @@ class GSNode(GSBase):
         self, position=(0, 0), type=LINE, smooth=False, name=None, nodetype=None
     ):
         self._userData = None
-        self._position = Point(position[0], position[1])
-        self.smooth = smooth
-        self.type = type
+        self._position = _NodePosition(position[0], position[1], self)
+        self._smooth = smooth
+        self._type = type
         if nodetype is not None:  # for backward compatibility
-            self.type = nodetype
+            self._type = nodetype
         # Optimization: Points can number in the 10000s, don't access the userDataProxy
         # through `name` unless needed.
         if name is not None:
@@ -1661,9 +2051,31 @@ class GSNode(GSBase):
 
     @position.setter
     def position(self, value):
-        if not isinstance(value, Point):
-            value = Point(value[0], value[1])
-        self._position = value
+        # The cached fingerprints and bounds follow the nodes that are moved,
+        # including through a Point of the node changed in place.
+        self._position = _NodePosition(value[0], value[1], self)
+        if self._parent is not None:
+            _invalidate_caches(self._parent)
+
+    @property
+    def type(self):
+        return self._type
+
+    @type.setter
+    def type(self, value):
+        self._type = value
+        if self._parent is not None:
+            _invalidate_caches(self._parent)
+
+    @property
+    def smooth(self):
+        return self._smooth
+
+    @smooth.setter
+    def smooth(self, value):
+        self._smooth = value
+        if self._parent is not None:
+            _invalidate_caches(self._parent)
 
     @property
     def parent(self):
@@ -1699,9 +2111,11 @@ class GSNode(GSBase):
         account for a significant portion of the file parsing time.
         """
         m = self._PLIST_VALUE_RE.match(line).groups()
-        self.position = Point(parse_float_or_int(m[0]), parse_float_or_int(m[1]))
-        self.type = m[2].lower()
-        self.smooth = bool(m[3])
+        self._position = _NodePosition(
+            parse_float_or_int(m[0]), parse_float_or_int(m[1]), self
+        )
+        self._type = _NODE_TYPE_NAMES[m[2]]
+        self._smooth = bool(m[3])
 
         if m[4] is not None and len(m[4]) > 0:
             value = self._decode_dict_as_string(m[4])
@@ -1837,9 +2251,14 @@ class GSPath(GSBase):
 
     @property
     def segments(self):
-        self._segments = []
-        self._segmentLength = 0
-
+        # Cached until the nodes change, see _invalidate_caches.
+        segments = self.__dict__.get("_segments")
+        if segments is None:
+            segments = self._segments = self._build_segments()
+        return segments
+
+    def _build_segments(self):
+        segments = []
         nodeCount = 0
         segmentCount = 0
         nodes = list(self.nodes)
@@ -1851,7 +2270,7 @@ class GSPath(GSBase):
                 cycled = True
                 break
         if not cycled:
-            return []
+            return segments
 
         def wrap(i):
             if i >= len(nodes):
@@ -1877,11 +2296,10 @@ class GSPath(GSBase):
                 newSegment.appendNode(nodes[nodeCount])
                 nodeCount += 1
 
-            self._segments.append(newSegment)
-            self._segmentLength += 1
+            segments.append(newSegment)
             segmentCount += 1
 
-        return self._segments
+        return segments
 
     @segments.setter
     def segments(self, value):
@@ -1900,26 +2318,27 @@ class GSPath(GSBase):
 
     @property
     def bounds(self):
-        left, bottom, right, top = None, None, None, None
-        for segment in self.segments:
-            newLeft, newBottom, newRight, newTop = segment.bbox()
-            if left is None:
-                left = newLeft
-            else:
-                left = min(left, newLeft)
-            if bottom is None:
-                bottom = newBottom
-            else:
-                bottom = min(bottom, newBottom)
-            if right is None:
-                right = newRight
-            else:
-                right = max(right, newRight)
-            if top is None:
-                top = newTop
-            else:
-                top = max(top, newTop)
-        return Rect(Point(left, bottom), Point(right - left, top - bottom))
+        """The Rect of the path, or None if it has no segments.
+
+        The bounds and `segments` are cached until the nodes change: nodes
+        added, removed or replaced through `nodes`, or their `position`,
+        `type` or `smooth` set (`node.position.x = ...` included). Changes
+        that go around these, like editing `node.position.value` in place,
+        are NOT seen: call `glyphsLib.fingerprint.invalidate(path)` after
+        them.
+        """
+        return _bounds_rect(self._bounds_box())
+
+    def _bounds_box(self):
+        """Return the (left, bottom, right, top) bounds of the path, or None
+        if it has no segments.
+        """
+        box = self.__dict__.get("_bounds", _NOT_CACHED)
+        if box is _NOT_CACHED:
+            box = self._bounds = _union_boxes(
+                segment.bbox() for segment in self.segments
+            )
+        return box
 
     @property
     def direction(self):
@@ -1944,7 +2363,8 @@ class GSPath(GSBase):
         raise OnlyInGlyphsAppError
 
     def reverse(self):
-        segments = list(reversed(self.segments))
+        # New segments, since the cached ones are changed.
+        segments = list(reversed(self._build_segments()))
         for s, segment in enumerate(segments):
             segment.nodes = list(reversed(segment.nodes))
             if s == len(segments) - 1:
@@ -1978,6 +2398,7 @@ class GSPath(GSBase):
             x, y = (node.position.x, node.position.y) * transformation
             node.position.x = x
             node.position.y = y
+        _invalidate_caches(self)
 
     def draw(self, pen: AbstractPen) -> None:
         """Draws contour with the given pen."""
@@ -2020,6 +2441,160 @@ class GSPath(GSBase):
 # 'offcurve' GSNode.type is equivalent to 'None' in UFO PointPen API
 _UFO_NODE_TYPES = {"line", "curve", "qcurve"}
 
+# The value of the caches of the bounds that were not computed yet, since None
+# is the bounds of empty paths and layers.
+_NOT_CACHED = object()
+
+
+def _union_boxes(boxes):
+    """Return the (left, bottom, right, top) box that contains all the boxes
+    that are not None, or None if there are none.
+    """
+    left = bottom = right = top = None
+    for box in boxes:
+        if box is None:
+            continue
+        if left is None:
+            left, bottom, right, top = box
+            continue
+        left = min(left, box[0])
+        bottom = min(bottom, box[1])
+        right = max(right, box[2])
+        top = max(top, box[3])
+    if left is None:
+        return None
+    return left, bottom, right, top
+
+
+def _bounds_rect(box):
+    if box is None:
+        return None
+    left, bottom, right, top = box
+    return Rect(Point(left, bottom), Point(right - left, top - bottom))
+
+
+class _ComponentBounds:
+    """The bounds of the layers used as components in a font, computed once
+    for all the components that use them, and cached on the font until their
+    glyph or the glyphs that it uses as components change.
+    """
+
+    __slots__ = ("graph", "boxes")
+
+    def __init__(self, font):
+        self.graph = font.componentGraph
+        # The (left, bottom, right, top) bounds of the layers, with their
+        # components, by layer id, by glyph name. The bounds of the rotated or
+        # skewed layers are kept by (layer id, (xx, xy, yx, yy)), without the
+        # offset of the transform.
+        self.boxes = {}
+
+
+def _component_bounds(font):
+    cache = font.__dict__.get("_componentBounds")
+    if cache is None:
+        cache = font._componentBounds = _ComponentBounds(font)
+    return cache
+
+
+def _component_layer(cache, component, layer):
+    """Return the layer of the glyph of `component` that it uses in `layer`:
+    the layer with the same id, or else the layer of the associated master.
+    """
+    # The first glyph of a name wins, like with `font.glyphs[name]`.
+    glyph = cache.graph.glyph(component.name)
+    if glyph is None:
+        return None
+    base = glyph._layers.get(layer.layerId)
+    if base is None and layer.associatedMasterId:
+        base = glyph._layers.get(layer.associatedMasterId)
+    return base
+
+
+def _component_box(component, cache, transform=None, seen=()):
+    """Return the bounds of `component` in its layer, transformed by
+    `transform` if given, or None.
+
+    The components of the glyphs in `seen`, which use them, are ignored.
+    """
+    name = component.name
+    base = _component_layer(cache, component, component._parent)
+    if base is None or name in seen:
+        return None
+    seen += (name,)
+    matrix = FontToolsTransform(*component.transform.value)
+    if transform is not None:
+        matrix = transform.transform(matrix)
+    xx, xy, yx, yy, dx, dy = matrix
+    if xy or yx:
+        # The bounds of the rotated or skewed outlines.
+        return _transformed_layer_box(base, matrix, cache, seen)
+    box = _layer_box(base, cache, seen)
+    if box is None:
+        return None
+    left, bottom, right, top = box
+    left, right = sorted((xx * left + dx, xx * right + dx))
+    bottom, top = sorted((yy * bottom + dy, yy * top + dy))
+    return left, bottom, right, top
+
+
+def _layer_box(layer, cache, seen):
+    """Return the bounds of `layer` with its components, cached in `cache`."""
+    boxes = cache.boxes.setdefault(seen[-1], {})
+    box = boxes.get(layer.layerId, _NOT_CACHED)
+    if box is _NOT_CACHED:
+        box = layer.__dict__.get("_bounds", _NOT_CACHED)
+        if box is _NOT_CACHED:
+            box = layer._bounds = _union_boxes(
+                path._bounds_box() for path in layer._paths
+            )
+        if layer._components:
+            box = _union_boxes(
+                [box]
+                + [
+                    _component_box(component, cache, seen=seen)
+                    for component in layer._components
+                ]
+            )
+        boxes[layer.layerId] = box
+    return box
+
+
+def _transformed_layer_box(layer, transform, cache, seen):
+    """Return the bounds of `layer` with its components, after `transform`,
+    cached in `cache`.
+    """
+    xx, xy, yx, yy, dx, dy = transform
+    cached = cache.boxes.setdefault(seen[-1], {})
+    key = (layer.layerId, (xx, xy, yx, yy))
+    box = cached.get(key, _NOT_CACHED)
+    if box is _NOT_CACHED:
+        # The bounds without the offset, which is added below, so that the
+        # components that only differ by their offset share them.
+        linear = FontToolsTransform(xx, xy, yx, yy, 0, 0)
+        boxes = []
+        for path in layer._paths:
+            for segment in path.segments:
+                points = [
+                    linear.transformPoint((point.x, point.y)) for point in segment
+                ]
+                if len(points) == 4:
+                    boxes.append(
+                        segment.bezierMinMax(
+                            *(value for point in points for value in point)
+                        )
+                    )
+                else:
+                    (x0, y0), (x1, y1) = points
+                    boxes.append((min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)))
+        for component in layer._components:
+            boxes.append(_component_box(component, cache, linear, seen))
+        box = cached[key] = _union_boxes(boxes)
+    if box is None:
+        return None
+    left, bottom, right, top = box
+    return left + dx, bottom + dy, right + dx, top + dy
+
 
 class segment(list):
     __slots__ = ("nodes", "parent", "index")
@@ -2036,19 +2611,19 @@ class segment(list):
     def nextSegment(self):
         assert self.parent
         index = self.index
-        if index == (len(self.parent._segments) - 1):
-            return self.parent._segments[0]
-        elif index < len(self.parent._segments):
-            return self.parent._segments[index + 1]
+        if index == (len(self.parent.segments) - 1):
+            return self.parent.segments[0]
+        elif index < len(self.parent.segments):
+            return self.parent.segments[index + 1]
 
     @property
     def prevSegment(self):
         assert self.parent
         index = self.index
         if index == 0:
-            return self.parent._segments[-1]
-        elif index < len(self.parent._segments):
-            return self.parent._segments[index - 1]
+            return self.parent.segments[-1]
+        elif index < len(self.parent.segments):
+            return self.parent.segments[index - 1]
 
     def bbox(self):
         if len(self) == 2:
@@ -2106,29 +2681,20 @@ class segment(list):
             if 0 < t2 < 1:
                 tvalues.append(t2)
 
-        for j in range(len(tvalues) - 1, -1, -1):
-            t = tvalues[j]
+        for t in tvalues:
             mt = 1 - t
-            newxValue = (
+            xvalues.append(
                 (mt * mt * mt * x0)
                 + (3 * mt * mt * t * x1)
                 + (3 * mt * t * t * x2)
                 + (t * t * t * x3)
             )
-            if len(xvalues) > j:
-                xvalues[j] = newxValue
-            else:
-                xvalues.append(newxValue)
-            newyValue = (
+            yvalues.append(
                 (mt * mt * mt * y0)
                 + (3 * mt * mt * t * y1)
                 + (3 * mt * t * t * y2)
                 + (t * t * t * y3)
             )
-            if len(yvalues) > j:
-                yvalues[j] = newyValue
-            else:
-                yvalues.append(newyValue)
 
         xvalues.append(x0)
         xvalues.append(x3)
@@ -2143,9 +2709,9 @@ class GSComponent(GSBase):
         "alignment",
         "anchor",
         "locked",
-        "name",
+        "_name",
         "smartComponentValues",
-        "transform",
+        "_transform",
     )
 
     _classesForName = {
@@ -2157,6 +2723,7 @@ class GSComponent(GSBase):
         "transform": Transform,
     }
     _wrapperKeysTranslate = {"piece": "smartComponentValues"}
+    _identifierKeys = frozenset(["name"])
     _defaultsForName = {"transform": Transform(1, 0, 0, 1, 0, 0)}
     _parent = None
 
@@ -2198,6 +2765,30 @@ class GSComponent(GSBase):
     def parent(self):
         return self._parent
 
+    # The cached fingerprints and the bounds of the layers that use the
+    # component follow its name and its transform, when they are set. Call
+    # glyphsLib.fingerprint.invalidate on the component after changing its
+    # transform in place.
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        self._name = value
+        if self._parent is not None:
+            _invalidate_caches(self._parent)
+
+    @property
+    def transform(self):
+        return self._transform
+
+    @transform.setter
+    def transform(self, value):
+        self._transform = value
+        if self._parent is not None:
+            _invalidate_caches(self._parent)
+
     # .position
     @property
     def position(self):
@@ -2207,6 +2798,8 @@ class GSComponent(GSBase):
     def position(self, value):
         self.transform[4] = value[0]
         self.transform[5] = value[1]
+        if self._parent is not None:
+            _invalidate_caches(self._parent)
 
     # .scale
     @property
@@ -2273,32 +2866,19 @@ class GSComponent(GSBase):
         return self.parent.parent.parent.glyphs[self.name].layers[self.parent.layerId]
 
     def applyTransformation(self, x, y):
-        x *= self.scale[0]
-        y *= self.scale[1]
-        x += self.position.x
-        y += self.position.y
-        # TODO:
-        # Integrate rotation
-        return x, y
+        return FontToolsTransform(*self.transform.value).transformPoint((x, y))
 
     @property
     def bounds(self):
-        bounds = self.layer.bounds
-        if bounds is not None:
-            left, bottom, width, height = self.layer.bounds
-            right = left + width
-            top = bottom + height
-
-            left, bottom = self.applyTransformation(left, bottom)
-            right, top = self.applyTransformation(right, top)
+        return _bounds_rect(self._bounds_box())
 
-            if (
-                left is not None
-                and bottom is not None
-                and right is not None
-                and top is not None
-            ):
-                return Rect(Point(left, bottom), Point(right - left, top - bottom))
+    def _bounds_box(self):
+        layer = self._parent
+        glyph = layer.parent if layer is not None else None
+        font = glyph.parent if glyph is not None else None
+        if font is None:
+            return None
+        return _component_box(self, _component_bounds(font), seen=(glyph.name,))
 
     # smartComponentValues = property(
     #     lambda self: self.piece,
@@ -2349,6 +2929,7 @@ class GSAnchor(GSBase):
     __slots__ = ("position", "name")
 
     _classesForName = {"name": str, "position": Point}
+    _identifierKeys = frozenset(["name"])
     _parent = None
     _defaultsForName = {"position": Point(0, 0)}
 
@@ -2408,6 +2989,7 @@ class GSHint(GSBase):
         "name": str,
         "settings": dict,
     }
+    _lazyKeys = {"target": "_target"}
     _defaultsForName = {
         # TODO: (jany) check defaults in glyphs
         "origin": None,
@@ -2583,6 +3165,9 @@ class GSHint(GSBase):
         self._otherNode2 = None
 
 
+_setup_lazy_slots(GSHint)
+
+
 class GSFeature(GSBase):
     __slots__ = ("automatic", "_code", "disabled", "name", "notes")
 
@@ -3053,6 +3638,12 @@ class GSLayer(GSBase):
         "vertOrigin": None,
     }
     _wrapperKeysTranslate = {"guideLines": "guides", "background": "_background"}
+    _identifierKeys = frozenset(["associatedMasterId", "layerId"])
+    _lazyKeys = {
+        "annotations": "_annotations",
+        "backgroundImage": "backgroundImage",
+        "userData": "_userData",
+    }
     _keyOrder = (
         "anchors",
         "annotations",
@@ -3109,6 +3700,19 @@ class GSLayer(GSBase):
             self._background._foreground = self
             self._background.parent = self.parent
 
+    @classmethod
+    def _decoder(cls, key):
+        value_type, setter = super()._decoder(key)
+        if key != "background":
+            return value_type, setter
+
+        def set_background(layer, value):
+            setter(layer, value)
+            layer._background._foreground = layer
+            layer._background.parent = layer.parent
+
+        return value_type, set_background
+
     def __repr__(self):
         name = self.name
         try:
@@ -3235,38 +3839,26 @@ class GSLayer(GSBase):
 
     @property
     def bounds(self):
-        left, bottom, right, top = None, None, None, None
-
-        for item in self.paths.values() + self.components.values():
-
-            newLeft, newBottom, newWidth, newHeight = item.bounds
-            newRight = newLeft + newWidth
-            newTop = newBottom + newHeight
-
-            if left is None:
-                left = newLeft
-            else:
-                left = min(left, newLeft)
-            if bottom is None:
-                bottom = newBottom
-            else:
-                bottom = min(bottom, newBottom)
-            if right is None:
-                right = newRight
-            else:
-                right = max(right, newRight)
-            if top is None:
-                top = newTop
-            else:
-                top = max(top, newTop)
+        """The Rect of the paths and components of the layer, or None if it
+        has none.
 
-        if (
-            left is not None
-            and bottom is not None
-            and right is not None
-            and top is not None
-        ):
-            return Rect(Point(left, bottom), Point(right - left, top - bottom))
+        The bounds of the paths are cached like `GSPath.bounds`: after changes
+        that go around the nodes and proxies of the GS* classes, like editing
+        `node.position.value` in place, call
+        `glyphsLib.fingerprint.invalidate` on the changed path.
+        """
+        # The bounds of the components depend on other glyphs, only those of
+        # the paths are cached.
+        box = self.__dict__.get("_bounds", _NOT_CACHED)
+        if box is _NOT_CACHED:
+            box = self._bounds = _union_boxes(
+                path._bounds_box() for path in self._paths
+            )
+        if self._components:
+            box = _union_boxes(
+                [box] + [component._bounds_box() for component in self._components]
+            )
+        return _bounds_rect(box)
 
     def _find_node_by_indices(self, point):
         """"Find the GSNode that is refered to by the given indices.
@@ -3349,11 +3941,13 @@ class GSBackgroundLayer(GSLayer):
 
 
 GSLayer._classesForName["background"] = GSBackgroundLayer
+_setup_lazy_slots(GSLayer)
 
 
 class GSGlyph(GSBase):
     __slots__ = (
         "_layers",
+        "_name",
         "_unicodes",
         "_userData",
         "bottomKerningGroup",
@@ -3365,7 +3959,6 @@ class GSGlyph(GSBase):
         "leftKerningGroup",
         "leftKerningKey",
         "leftMetricsKey",
-        "name",
         "note",
         "parent",
         "partsSettings",
@@ -3414,6 +4007,13 @@ class GSGlyph(GSBase):
         "glyphname": "name",
         "partsSettings": "smartComponentAxes",
     }
+    _identifierKeys = frozenset(["glyphname"])
+    _lazyKeys = {
+        "color": "color",
+        "lastChange": "lastChange",
+        "note": "note",
+        "userData": "_userData",
+    }
     _defaultsForName = {
         "category": None,
         "color": None,
@@ -3520,6 +4120,7 @@ class GSGlyph(GSBase):
         for layer in list(self._layers):
             if layer == key:
                 del self._layers[key]
+                _invalidate_caches(self)
 
     @property
     def string(self):
@@ -3531,6 +4132,20 @@ class GSGlyph(GSBase):
         lambda self, value: UserDataProxy(self).setter(value),
     )
 
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        old_name = getattr(self, "_name", None)
+        self._name = value
+        # The parent isn't set yet in __init__.
+        font = getattr(self, "parent", None)
+        if font is not None and value != old_name:
+            _invalidate_caches(self)
+            _glyph_renamed(font, self, old_name)
+
     @property
     def glyphname(self):
         return self.name
@@ -3571,6 +4186,300 @@ class GSGlyph(GSBase):
         self._unicodes = UnicodesList(unicodes)
 
 
+_setup_lazy_slots(GSGlyph)
+
+
+class _GraphNode:
+    """A glyph of a `ComponentGraph`, with the names of its components."""
+
+    __slots__ = ("glyph", "components", "dirty")
+
+    def __init__(self, glyph):
+        self.glyph = glyph
+        self.components = ()
+        # Whether the components must be read again before the next query.
+        self.dirty = False
+
+
+class ComponentGraph:
+    """The components of the glyphs of a font, and the glyphs that use them,
+    by glyph name. Use it as `font.componentGraph`:
+
+        graph.components("Aacute")  # ["A", "acutecomb"]
+        graph.users("A")  # ["Aacute", "Adieresis", ...]
+        graph.user_closure(["A"])  # A and the glyphs that use it, directly or not
+
+    The graph is built the first time that it is used, then follows the glyphs
+    that are added to, removed from or replaced in the font through
+    `font.glyphs`, the renamed glyphs, and the components and layers that are
+    added, removed or replaced through the proxies of the GS* classes, or
+    renamed. Only the components of the foreground layers are followed.
+
+    The queries take a time proportional to the size of their result, plus the
+    number of glyphs changed since the last query.
+    """
+
+    def __init__(self, font):
+        # The glyphs by name, in the order of the font.
+        self._nodes = OrderedDict()
+        # The names of the glyphs that use each component, with the number of
+        # glyphs of that name that use it.
+        self._users = {}
+        self._dirty = []
+        for glyph in font._glyphs:
+            self._add(glyph)
+
+    def glyph(self, name):
+        """Return the first glyph named `name`, or None."""
+        nodes = self._nodes.get(name)
+        return nodes[0].glyph if nodes else None
+
+    def components(self, name):
+        """Return the names of the glyphs that the glyph `name` uses as
+        components, in order.
+        """
+        self._update()
+        return list(self._components(name))
+
+    def users(self, name):
+        """Return the names of the glyphs that use the glyph `name` as a
+        component.
+        """
+        self._update()
+        return list(self._users.get(name, ()))
+
+    def component_closure(self, names):
+        """Return the set of `names` and of the names of the glyphs of the font
+        that they use as components, directly or not.
+        """
+        self._update()
+        closure = set()
+        stack = list(names)
+        while stack:
+            name = stack.pop()
+            if name not in closure:
+                closure.add(name)
+                stack.extend(
+                    base for base in self._components(name) if base in self._nodes
+                )
+        return closure
+
+    def user_closure(self, names):
+        """Return the set of `names` and of the names of the glyphs that use
+        them as components, directly or not.
+        """
+        self._update()
+        closure = set()
+        stack = list(names)
+        while stack:
+            name = stack.pop()
+            if name not in closure:
+                closure.add(name)
+                stack.extend(self._users.get(name, ()))
+        return closure
+
+    def topological_order(self):
+        """Return the names of the glyphs of the font, each after the glyphs
+        that it uses as components, and otherwise in the order of the font.
+
+        Raise ValueError if glyphs use each other as components (see `cycles`).
+        """
+        self._update()
+        order = []
+        # True for the glyphs in `order`, False for those being visited.
+        done = {}
+        for root in self._nodes:
+            if root in done:
+                continue
+            done[root] = False
+            stack = [(root, iter(self._components(root)))]
+            while stack:
+                name, bases = stack[-1]
+                for base in bases:
+                    if base not in self._nodes or done.get(base):
+                        continue
+                    if base in done:
+                        names = [name for name, _ in stack]
+                        cycle = names[names.index(base) :] + [base]
+                        raise ValueError(
+                            "The glyphs use each other as components: "
+                            + " -> ".join(cycle)
+                        )
+                    done[base] = False
+                    stack.append((base, iter(self._components(base))))
+                    break
+                else:
+                    stack.pop()
+                    done[name] = True
+                    order.append(name)
+        return order
+
+    def cycles(self):
+        """Return the groups of glyphs that use each other as components,
+        directly or not, as lists of glyph names.
+        """
+        self._update()
+        # Tarjan's algorithm for the strongly connected components.
+        index = {}
+        low = {}
+        stack = []
+        on_stack = set()
+        groups = []
+        for root in self._nodes:
+            if root in index:
+                continue
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(self._components(root)))]
+            while work:
+                name, bases = work[-1]
+                for base in bases:
+                    if base not in self._nodes:
+                        continue
+                    if base not in index:
+                        index[base] = low[base] = len(index)
+                        stack.append(base)
+                        on_stack.add(base)
+                        work.append((base, iter(self._components(base))))
+                        break
+                    if base in on_stack:
+                        low[name] = min(low[name], index[base])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[name])
+                    if low[name] == index[name]:
+                        group = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            group.append(member)
+                            if member == name:
+                                break
+                        if len(group) > 1 or name in self._components(name):
+                            groups.append(group[::-1])
+        return groups
+
+    def _components(self, name):
+        nodes = self._nodes.get(name, ())
+        if len(nodes) == 1:
+            return nodes[0].components
+        return tuple(dict.fromkeys(base for node in nodes for base in node.components))
+
+    def _node(self, glyph, name):
+        for node in self._nodes.get(name, ()):
+            if node.glyph is glyph:
+                return node
+        return None
+
+    def _link(self, node):
+        glyph = node.glyph
+        node.components = tuple(
+            dict.fromkeys(
+                component.name
+                for layer in glyph._layers.values()
+                for component in layer._components
+            )
+        )
+        for base in node.components:
+            users = self._users.setdefault(base, {})
+            users[glyph.name] = users.get(glyph.name, 0) + 1
+
+    def _unlink(self, node, name):
+        for base in node.components:
+            users = self._users[base]
+            users[name] -= 1
+            if not users[name]:
+                del users[name]
+                if not users:
+                    del self._users[base]
+        node.components = ()
+
+    def _add(self, glyph):
+        node = _GraphNode(glyph)
+        self._nodes.setdefault(glyph.name, []).append(node)
+        self._link(node)
+
+    def _remove(self, glyph, name=None):
+        if name is None:
+            name = glyph.name
+        node = self._node(glyph, name)
+        if node is None:
+            return None
+        self._unlink(node, name)
+        nodes = self._nodes[name]
+        nodes.remove(node)
+        if not nodes:
+            del self._nodes[name]
+        return node
+
+    def _rename(self, glyph, old_name):
+        node = self._remove(glyph, old_name)
+        if node is not None:
+            self._nodes.setdefault(glyph.name, []).append(node)
+            self._link(node)
+
+    def _changed(self, glyph):
+        # The proxies call this before they change the glyph: its components
+        # are read at the next query.
+        node = self._node(glyph, glyph.name)
+        if node is not None and not node.dirty:
+            node.dirty = True
+            self._dirty.append(node)
+
+    def _update(self):
+        dirty, self._dirty = self._dirty, []
+        for node in dirty:
+            if node.dirty:
+                node.dirty = False
+                self._unlink(node, node.glyph.name)
+                self._link(node)
+
+
+# The functions below keep the component graph and the bounds cached on a font
+# up to date. The graph is only updated if it was built before the change.
+
+
+def _forget_component_bounds(font, names):
+    """Forget the bounds cached on `font` of the glyphs `names` and of the
+    glyphs that use them as components.
+    """
+    cache = font.__dict__.get("_componentBounds")
+    if cache is not None and cache.boxes:
+        for name in font.componentGraph.user_closure(names):
+            cache.boxes.pop(name, None)
+
+
+def _glyph_added(font, glyph):
+    graph = font.__dict__.get("_componentGraph")
+    _forget_component_bounds(font, [glyph.name])
+    if graph is not None:
+        graph._add(glyph)
+
+
+def _glyph_removed(font, glyph):
+    graph = font.__dict__.get("_componentGraph")
+    _forget_component_bounds(font, [glyph.name])
+    if graph is not None:
+        graph._remove(glyph)
+
+
+def _glyph_changed(font, glyph):
+    graph = font.__dict__.get("_componentGraph")
+    _forget_component_bounds(font, [glyph.name])
+    if graph is not None:
+        graph._changed(glyph)
+
+
+def _glyph_renamed(font, glyph, old_name):
+    graph = font.__dict__.get("_componentGraph")
+    _forget_component_bounds(font, [old_name, glyph.name])
+    if graph is not None:
+        graph._rename(glyph, old_name)
+
+
 class GSFont(GSBase):
     __slots__ = (
         "DisplayStrings",
@@ -3654,7 +4563,9 @@ class GSFont(GSBase):
         "keyboardIncrement": 1,
     }
 
-    def __init__(self, path=None):
+    def __init__(self, path=None, cache_dir=None, jobs=1, lazy=False):
+        if lazy and cache_dir is not None:
+            raise ValueError("lazy parsing can't be used with a cache_dir")
         self.DisplayStrings = ""
         self._glyphs = []
         self._instances = []
@@ -3688,14 +4599,24 @@ class GSFont(GSBase):
 
         if path:
             path = os.fsdecode(os.fspath(path))
-            assert os.path.splitext(path)[-1] == ".glyphs", (
-                "Please supply a file path to a .glyphs file",
+            assert os.path.splitext(path)[-1] in (".glyphs", ".glyphspackage"), (
+                "Please supply a file path to a .glyphs file or .glyphspackage",
             )
 
-            with open(path, "r", encoding="utf-8") as fp:
-                logger.info('Parsing "%s" file into <GSFont>', path)
-                p = Parser()
-                p.parse_into_object(self, fp.read())
+            if path.endswith(".glyphspackage"):
+                from glyphsLib import glyphspackage
+
+                logger.info('Reading "%s" package into <GSFont>', path)
+                glyphspackage.parse_into_object(self, path)
+            elif cache_dir is not None:
+                from glyphsLib import cache
+
+                with open(path, "rb") as fp:
+                    cache.parse_into_object(self, fp.read(), cache_dir, jobs=jobs)
+            else:
+                with open(path, "r", encoding="utf-8") as fp:
+                    logger.info('Parsing "%s" file into <GSFont>', path)
+                    parse_into_object(self, fp.read(), jobs, lazy=lazy)
             self.filepath = path
             for master in self.masters:
                 master.font = self
@@ -3714,6 +4635,12 @@ class GSFont(GSBase):
                 path = self.filepath
             else:
                 raise ValueError("No path provided and GSFont has no filepath")
+        if path.endswith(".glyphspackage"):
+            from glyphsLib import glyphspackage
+
+            logger.info("Writing %r to .glyphspackage", self)
+            glyphspackage.write(self, path)
+            return
         with open(path, "w", encoding="utf-8") as fp:
             w = Writer(fp)
             logger.info("Writing %r to .glyphs file", self)
@@ -3734,6 +4661,14 @@ class GSFont(GSBase):
         lambda self, value: FontGlyphsProxy(self).setter(value),
     )
 
+    @property
+    def componentGraph(self):
+        """The `ComponentGraph` of the glyphs of the font."""
+        graph = self.__dict__.get("_componentGraph")
+        if graph is None:
+            graph = self._componentGraph = ComponentGraph(self)
+        return graph
+
     def _setupGlyph(self, glyph):
         glyph.parent = self
         for layer in glyph.layers:
@@ -14,6 +14,7 @@
 
 
 import argparse
+import contextlib
 import os
 import sys
 
@@ -34,19 +35,32 @@ def main(args=None):
         "--version", action="version", version="glyphsLib %s" % glyphsLib.__version__
     )
     parser_glyphs2ufo.add_argument(
-        "glyphs_file", metavar="GLYPHS_FILE", help="Glyphs file to convert."
+        "glyphs_files",
+        nargs="+",
+        metavar="GLYPHS_FILE",
+        help=(
+            "Glyphs file(s) to convert. Several files are converted in parallel, "
+            "see --jobs."
+        ),
     )
     parser_glyphs2ufo.add_argument(
         "-m",
         "--output-dir",
         default=None,
-        help="Output directory of masters. (default: directory of Glyphs file)",
+        help=(
+            "Output directory of masters. (default: directory of Glyphs file). "
+            "When converting several files, the masters of each file are "
+            "written to a subdirectory named after the file."
+        ),
     )
     parser_glyphs2ufo.add_argument(
         "-d",
         "--designspace-path",
         default=None,
-        help="Output path of designspace file. (default: directory of Glyphs file)",
+        help=(
+            "Output path of designspace file. (default: directory of Glyphs file). "
+            "Only allowed when converting a single file."
+        ),
     )
     parser_glyphs2ufo.add_argument(
         "-n",
@@ -58,6 +72,33 @@ def main(args=None):
             "file."
         ),
     )
+    parser_glyphs2ufo.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help=(
+            "Number of worker processes used to convert several Glyphs files. "
+            "(default: number of CPUs)"
+        ),
+    )
+    parser_glyphs2ufo.add_argument(
+        "--cache-dir",
+        default=None,
+        help=(
+            "Directory where parsed Glyphs files are cached, to load them faster "
+            "the next time they are converted unchanged."
+        ),
+    )
+    parser_glyphs2ufo.add_argument(
+        "--watch",
+        action="store_true",
+        help=(
+            "Keep running after the conversion, and update the masters whenever "
+            "the Glyphs file changes. Only the glyphs that changed, and the "
+            "features, groups and kerning, are rebuilt when possible."
+        ),
+    )
     parser_glyphs2ufo.add_argument(
         "--ufo-module",
         metavar="UFO_MODULE",
@@ -133,6 +174,61 @@ def main(args=None):
         ),
     )
 
+    group = parser_glyphs2ufo.add_argument_group("Partial conversion")
+    group.add_argument(
+        "--glyphs",
+        nargs="+",
+        metavar="GLYPH",
+        default=None,
+        help=(
+            "Only convert the glyphs with these names. Shell-style wildcards are "
+            "accepted, e.g. 'a*' (quote them). The glyphs they use as components "
+            "are converted too, see --no-include-components."
+        ),
+    )
+    group.add_argument(
+        "--no-include-components",
+        dest="include_components",
+        action="store_false",
+        help="Do not add the components of the glyphs selected with --glyphs.",
+    )
+    group.add_argument(
+        "--masters",
+        nargs="+",
+        metavar="MASTER",
+        default=None,
+        help="Only convert the masters with these names (or ids).",
+    )
+
+    group = parser_glyphs2ufo.add_argument_group("Diagnostics")
+    group.add_argument(
+        "--check-compatibility",
+        action="store_true",
+        help=(
+            "Check that the masters, brace and bracket layers of the glyphs are "
+            "compatible before converting them, and list the offending glyphs, "
+            "layers and paths if they are not."
+        ),
+    )
+    group.add_argument(
+        "--trace",
+        metavar="TRACE_FILE",
+        default=None,
+        help=(
+            "Record the time spent in each conversion stage and write it to "
+            "TRACE_FILE in the Chrome trace event format (JSON)."
+        ),
+    )
+    group.add_argument(
+        "--memory-report",
+        action="store_true",
+        help=(
+            "Print the memory high-water marks of each conversion stage and "
+            "the number of glyphsLib objects alive after parsing to stderr. "
+            "This slows down the conversion noticeably."
+        ),
+    )
+
     parser_ufo2glyphs = subparsers.add_parser("ufo2glyphs", help=ufo2glyphs.__doc__)
     parser_ufo2glyphs.set_defaults(func=ufo2glyphs)
     parser_ufo2glyphs.add_argument(
@@ -160,6 +256,26 @@ def main(args=None):
             "(default: %(default)s)"
         ),
     )
+    parser_ufo2glyphs.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help=(
+            "Number of worker processes used to convert the masters, and of "
+            "threads used to read the UFOs of a designspace file. The Glyphs "
+            "file is the same whatever the number. (default: %(default)s)"
+        ),
+    )
+    parser_ufo2glyphs.add_argument(
+        "--streaming",
+        action="store_true",
+        help=(
+            "Read the glyphs of the UFOs one at a time while converting them, "
+            "to use less memory. The Glyphs file is the same. Implies "
+            "--jobs=1 for the conversion of the masters."
+        ),
+    )
     group = parser_ufo2glyphs.add_argument_group(
         "Roundtripping between UFOs and Glyphs"
     )
@@ -193,23 +309,108 @@ def main(args=None):
 
 def glyphs2ufo(options):
     """Converts a Glyphs.app source file into UFO masters and a designspace file."""
+    if len(options.glyphs_files) > 1:
+        return _glyphs2ufo_batch(options)
+    glyphs_file = options.glyphs_files[0]
+
     if options.output_dir is None:
-        options.output_dir = os.path.dirname(options.glyphs_file) or "."
+        options.output_dir = os.path.dirname(glyphs_file) or "."
 
     if options.designspace_path is None:
         options.designspace_path = os.path.join(
             options.output_dir,
-            os.path.basename(os.path.splitext(options.glyphs_file)[0]) + ".designspace",
+            os.path.basename(os.path.splitext(glyphs_file)[0]) + ".designspace",
         )
 
+    if options.watch:
+        return _glyphs2ufo_watch(glyphs_file, options)
+
+    from glyphsLib.compatibility import IncompatibleMastersError
+
     # If options.instance_dir is None, instance UFO paths in the designspace
     # file will either use the value in customParameter's UFO_FILENAME_CUSTOM_PARAM or
     # be made relative to "instance_ufos/".
-    glyphsLib.build_masters(
-        options.glyphs_file,
-        options.output_dir,
-        options.instance_dir,
-        designspace_path=options.designspace_path,
+    with contextlib.ExitStack() as stack:
+        tracer = None
+        if options.trace or options.memory_report:
+            from glyphsLib import tracing
+
+            if options.memory_report:
+                tracer = tracing.MemoryTracer()
+            tracer = stack.enter_context(tracing.trace(options.trace, tracer))
+
+        try:
+            glyphsLib.build_masters(
+                glyphs_file,
+                options.output_dir,
+                options.instance_dir,
+                designspace_path=options.designspace_path,
+                **_build_masters_options(options),
+            )
+        except IncompatibleMastersError as e:
+            print(e, file=sys.stderr)
+            return 1
+
+    if options.memory_report:
+        print(tracer.report(), file=sys.stderr)
+
+
+def _glyphs2ufo_batch(options):
+    if options.designspace_path is not None:
+        print(
+            "The designspace path can't be set when converting several files.",
+            file=sys.stderr,
+        )
+        return 1
+    if options.trace or options.memory_report:
+        print(
+            "Tracing is only supported when converting a single file.", file=sys.stderr,
+        )
+        return 1
+    if options.watch:
+        print("Only a single file can be watched.", file=sys.stderr)
+        return 1
+
+    try:
+        glyphsLib.build_masters_batch(
+            options.glyphs_files,
+            options.output_dir,
+            options.instance_dir,
+            jobs=options.jobs,
+            **_build_masters_options(options),
+        )
+    except glyphsLib.BatchBuildError as e:
+        print("Failed to convert {} file(s):".format(len(e.errors)), file=sys.stderr)
+        for filename, error in e.errors.items():
+            print("\n{}:\n{}".format(filename, error.rstrip()), file=sys.stderr)
+        return 1
+
+
+def _glyphs2ufo_watch(glyphs_file, options):
+    from glyphsLib import watch
+    from glyphsLib.compatibility import IncompatibleMastersError
+
+    kwargs = _build_masters_options(options)
+    # The font stays in memory, the cache would not be used.
+    del kwargs["cache_dir"]
+    try:
+        watch.watch(
+            glyphs_file,
+            options.output_dir,
+            designspace_instance_dir=options.instance_dir,
+            designspace_path=options.designspace_path,
+            **kwargs,
+        )
+    except IncompatibleMastersError as e:
+        print(e, file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        pass
+
+
+def _build_masters_options(options):
+    """Return the keyword arguments of build_masters set by the options."""
+    return dict(
         minimize_glyphs_diffs=options.no_preserve_glyphsapp_metadata,
         propagate_anchors=options.propagate_anchors,
         normalize_ufos=options.normalize_ufos,
@@ -218,6 +419,11 @@ def glyphs2ufo(options):
         store_editor_state=not options.no_store_editor_state,
         write_skipexportglyphs=options.write_public_skip_export_glyphs,
         ufo_module=__import__(options.ufo_module),
+        cache_dir=options.cache_dir,
+        glyph_names=options.glyphs,
+        include_components=options.include_components,
+        master_names=options.masters,
+        check_compatibility=options.check_compatibility,
     )
 
 
@@ -247,7 +453,10 @@ def ufo2glyphs(options):
         designspace.read(designspace_file)
         object_to_read = designspace
     elif all(source.endswith(".ufo") and os.path.isdir(source) for source in sources):
-        ufos = [open_ufo(source, ufo_module.Font) for source in sources]
+        ufos = [
+            open_ufo(source, ufo_module.Font, lazy=options.streaming)
+            for source in sources
+        ]
         ufos.sort(
             key=lambda ufo: [  # Order the masters by weight and width
                 ufo.info.openTypeOS2WeightClass or 400,
@@ -255,6 +464,14 @@ def ufo2glyphs(options):
             ]
         )
         object_to_read = ufos
+        if options.streaming:
+            # The glyphs are read again from the files of the UFOs that the
+            # builder loads itself.
+            object_to_read = [ufo.path for ufo in ufos]
+            for ufo in ufos:
+                close = getattr(ufo, "close", None)
+                if close is not None:
+                    close()
     else:
         print(
             "Please specify just one designspace file *or* one or more "
@@ -267,6 +484,8 @@ def ufo2glyphs(options):
         object_to_read,
         ufo_module=ufo_module,
         minimize_ufo_diffs=options.no_preserve_glyphsapp_metadata,
+        jobs=options.jobs,
+        streaming=options.streaming,
     )
 
     # Make the Glyphs file more suitable for roundtrip:
@@ -0,0 +1,241 @@
+# Copyright 2020 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Check that the masters of a GSFont are compatible before converting it.
+
+Incompatible outlines otherwise only make ufo2ft or varLib fail, at the end of
+a long build:
+
+    incompatibilities = check_compatibility(font)
+    for incompatibility in incompatibilities:
+        print(incompatibility)
+
+or `glyphsLib.build_masters(..., check_compatibility=True)`, which raises an
+`IncompatibleMastersError` before converting anything.
+
+The master layers and brace layers of each glyph must have the same structure:
+the same paths with the same node types, the same components in the same
+order, and the same anchors. The bracket layers of a glyph that apply from the
+same location (and the master layers they replace) must have the same
+structure too, as they become an alternate glyph.
+
+Each layer is reduced to a signature made of one string of node types per
+path, the component names and the anchor names, which is cheap to compare. The
+layers are only compared in detail, to report the offending paths, when their
+signature differs from the most common one of their glyph.
+"""
+
+from collections import Counter, namedtuple
+
+from glyphsLib.classes import CURVE, LINE, OFFCURVE, QCURVE
+from glyphsLib.util import BRACKET_LAYER_RE, select_glyph_names, select_master_ids
+
+__all__ = ["Incompatibility", "IncompatibleMastersError", "check_compatibility"]
+
+
+class Incompatibility(
+    namedtuple("Incompatibility", ["glyph", "layer", "path", "message"])
+):
+    """A layer that is not compatible with the other layers of its glyph.
+
+    Attributes:
+        glyph: The name of the glyph.
+        layer: The name of the layer.
+        path: The index of the offending path of the layer, or None if the
+            problem is not with a single path.
+        message: What differs from the other layers.
+    """
+
+    __slots__ = ()
+
+    def __str__(self):
+        location = "glyph {!r}, layer {!r}".format(self.glyph, self.layer)
+        if self.path is not None:
+            location += ", path {}".format(self.path)
+        return "{}: {}".format(location, self.message)
+
+
+# One character per node type in the packed path signatures.
+_NODE_CODES = {LINE: "l", CURVE: "c", OFFCURVE: "o", QCURVE: "q"}
+_NODE_TYPES = {code: node_type for node_type, code in _NODE_CODES.items()}
+
+
+class IncompatibleMastersError(ValueError):
+    """Raised by `build_masters` when the masters of the font are not
+    compatible.
+
+    Attributes:
+        incompatibilities: list of `Incompatibility` tuples.
+    """
+
+    def __init__(self, incompatibilities):
+        super().__init__(
+            "The masters are not compatible, found {} problem(s):\n{}".format(
+                len(incompatibilities),
+                "\n".join("  {}".format(i) for i in incompatibilities),
+            )
+        )
+        self.incompatibilities = incompatibilities
+
+
+def check_compatibility(
+    font, glyph_names=None, include_components=True, master_names=None
+):
+    """Check that the layers of the glyphs of `font` can be interpolated.
+
+    Args:
+        font: a GSFont.
+        glyph_names: If provided, only check the glyphs with these names
+            (shell-style wildcards are accepted), along with the glyphs they
+            use as components unless include_components is False.
+        master_names: If provided, only check the layers of the masters with
+            these names (or ids).
+
+    Returns:
+        A list of `Incompatibility` tuples, empty if the font is compatible.
+    """
+    master_ids = select_master_ids(font, master_names)
+    master_order = [master.id for master in font.masters if master.id in master_ids]
+    if glyph_names is None:
+        selection = None
+    else:
+        selection = select_glyph_names(font, glyph_names, include_components)
+
+    incompatibilities = []
+    for glyph in font.glyphs:
+        if selection is not None and glyph.name not in selection:
+            continue
+        for layers in _layer_groups(glyph, master_ids, master_order):
+            incompatibilities.extend(_check_layers(glyph.name, layers))
+    return incompatibilities
+
+
+def _layer_groups(glyph, master_ids, master_order):
+    """Return the lists of the layers of `glyph` that must be compatible: the
+    master and brace layers, and the bracket layers of each location along
+    with the master layers that they replace.
+    """
+    masters = {}
+    others = []
+    brackets = {}
+    for layer in glyph.layers:
+        if layer.layerId in master_ids:
+            masters[layer.layerId] = layer
+            continue
+        name = layer.name
+        if (
+            not name
+            or ".background" in name
+            or layer.associatedMasterId not in master_ids
+        ):
+            continue
+        match = BRACKET_LAYER_RE.match(name)
+        if match and glyph.export:
+            key = (int(match.group("value")), match.group("first_bracket") == "]")
+            brackets.setdefault(key, []).append(layer)
+        elif "{" in name and "}" in name:
+            others.append(layer)
+    master_layers = [masters[i] for i in master_order if i in masters]
+    groups = [master_layers + others]
+    for _, layers in sorted(brackets.items()):
+        replaced = {layer.associatedMasterId for layer in layers}
+        groups.append(
+            [masters[i] for i in master_order if i in masters and i not in replaced]
+            + layers
+        )
+    return groups
+
+
+def _signature(layer):
+    return (
+        tuple(
+            "".join([_NODE_CODES.get(node.type, "?") for node in path.nodes.values()])
+            + ("" if path.closed else "|")
+            for path in layer.paths.values()
+        ),
+        tuple(component.name for component in layer.components),
+        tuple(sorted(anchor.name for anchor in layer.anchors)),
+    )
+
+
+def _check_layers(glyph_name, layers):
+    if len(layers) < 2:
+        return []
+    signatures = [_signature(layer) for layer in layers]
+    counts = Counter(signatures)
+    if len(counts) == 1:
+        return []
+    # Compare the layers with the first layer that has the most common
+    # signature, as a single broken master is the most likely problem.
+    most_common = max(counts.values())
+    reference_index = next(
+        i for i, s in enumerate(signatures) if counts[s] == most_common
+    )
+    reference = signatures[reference_index]
+    reference_name = layers[reference_index].name
+    incompatibilities = []
+    for layer, signature in zip(layers, signatures):
+        if signature != reference:
+            incompatibilities.extend(
+                Incompatibility(glyph_name, layer.name, path, message)
+                for path, message in _differences(signature, reference, reference_name)
+            )
+    return incompatibilities
+
+
+def _differences(signature, reference, reference_name):
+    """Yield the (path index, message) pairs describing how `signature`
+    differs from the `reference` signature of the layer `reference_name`.
+    """
+    paths, components, anchors = signature
+    reference_paths, reference_components, reference_anchors = reference
+    if len(paths) != len(reference_paths):
+        yield None, "{} path(s) instead of {} in {!r}".format(
+            len(paths), len(reference_paths), reference_name
+        )
+    else:
+        for index, (path, reference_path) in enumerate(zip(paths, reference_paths)):
+            if path != reference_path:
+                yield index, _path_difference(path, reference_path, reference_name)
+    if components != reference_components:
+        yield None, "components {} instead of {} in {!r}".format(
+            list(components), list(reference_components), reference_name
+        )
+    if anchors != reference_anchors:
+        yield None, "anchors {} instead of {} in {!r}".format(
+            list(anchors), list(reference_anchors), reference_name
+        )
+
+
+def _path_difference(path, reference, reference_name):
+    closed = not path.endswith("|")
+    if closed != (not reference.endswith("|")):
+        return "the path is {} but {} in {!r}".format(
+            "closed" if closed else "open",
+            "open" if closed else "closed",
+            reference_name,
+        )
+    path = path.rstrip("|")
+    reference = reference.rstrip("|")
+    if len(path) != len(reference):
+        return "{} node(s) instead of {} in {!r}".format(
+            len(path), len(reference), reference_name
+        )
+    index = next(i for i, (a, b) in enumerate(zip(path, reference)) if a != b)
+    return "node {} is a {} node but a {} node in {!r}".format(
+        index,
+        _NODE_TYPES.get(path[index], "unknown"),
+        _NODE_TYPES.get(reference[index], "unknown"),
+        reference_name,
+    )
@@ -0,0 +1,211 @@
+# Copyright 2020 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Content fingerprints of GSFont objects, to tell what changed between two
+versions of a font without comparing them in full:
+
+    old = font_fingerprint(old_font)
+    new = font_fingerprint(new_font)
+    changes = diff(old, new)
+    changes.glyphs  # the names of the glyphs that were changed, added or removed
+
+The fingerprints are SHA-256 hex digests of the objects as they are written to
+.glyphs files, computed bottom-up: the fingerprint of a path covers its nodes,
+the fingerprint of a layer covers the fingerprints of its paths (and of its
+background layer), the fingerprint of a glyph those of its layers, and the
+fingerprint of a font those of its top-level sections (masters, instances,
+features, classes, kerning, custom parameters, glyphs...). Equal objects have
+equal fingerprints, from one run to the next.
+
+The fingerprints of the glyphs, layers and paths are cached on the objects.
+With `cached=True`, they are reused, so that only the glyphs that changed since
+the last call are hashed again:
+
+    old = font_fingerprint(font, cached=True)
+    ...  # change the font
+    changes = diff(old, font_fingerprint(font, cached=True))
+
+The caches of an object and of the objects that contain it are cleared when
+objects are added to, removed from or replaced in it through the proxies of
+the GS* classes (`layer.paths`, `path.nodes`, `glyph.layers`,
+`layer.userData`...), when glyphs are renamed, and when the position, type or
+smooth flag of nodes or the name or transform of components are set. Other
+changes, like setting the `width` of a layer, aren't tracked, as watching every
+attribute would make loading fonts much slower: call `invalidate` on the
+objects that you change that way, or don't pass `cached=True`. By default,
+everything is hashed again (and the caches are refreshed).
+"""
+
+from collections import OrderedDict, namedtuple
+import hashlib
+from io import StringIO
+
+from glyphsLib.classes import GSFont, GSGlyph, GSLayer, GSPath, _invalidate_caches
+from glyphsLib.writer import Writer
+
+__all__ = [
+    "FontFingerprint",
+    "FontDiff",
+    "fingerprint",
+    "font_fingerprint",
+    "diff",
+    "invalidate",
+]
+
+FontFingerprint = namedtuple(
+    "FontFingerprint", ["font", "sections", "kerning", "glyphs"]
+)
+FontFingerprint.__doc__ = """The result of `font_fingerprint`.
+
+font -- The fingerprint of the whole font.
+sections -- The fingerprints of the top-level sections of the .glyphs file, by
+    key ("fontMaster", "instances", "features", "kerning", "glyphs"...).
+kerning -- The fingerprints of the kerning of each master, by master id.
+glyphs -- The fingerprints of the glyphs, by name, in the order of the font.
+"""
+
+FontDiff = namedtuple("FontDiff", ["sections", "kerning", "glyphs"])
+FontDiff.__doc__ = """The result of `diff`.
+
+sections -- The keys of the top-level sections that differ.
+kerning -- The ids of the masters whose kerning differs.
+glyphs -- The names of the glyphs that differ, or that are only in one font.
+"""
+
+# The objects whose fingerprint is cached.
+_CACHED_TYPES = (GSGlyph, GSLayer, GSPath)
+
+
+def fingerprint(obj, cached=False):
+    """Return the fingerprint of a GSFont, GSGlyph, GSLayer, GSPath or of any
+    other object that can be written to a .glyphs file.
+
+    cached -- reuse the fingerprints cached on the glyphs, layers and paths
+        (see the module docstring).
+    """
+    if isinstance(obj, GSFont):
+        return font_fingerprint(obj, cached).font
+    if isinstance(obj, _CACHED_TYPES):
+        digest = obj.__dict__.get("_fingerprint") if cached else None
+        if digest is None:
+            digest = obj.__dict__["_fingerprint"] = _digest(obj, cached)
+        return digest
+    return _digest(obj, cached)
+
+
+def font_fingerprint(font, cached=False):
+    """Return the `FontFingerprint` of a GSFont.
+
+    cached -- reuse the fingerprints cached on the glyphs, layers and paths
+        (see the module docstring).
+    """
+    writer = _FontWriter(font, cached)
+    writer.writeValue(font)
+    return FontFingerprint(
+        _hash(writer.file.getvalue()), writer.sections, writer.kerning, writer.glyphs
+    )
+
+
+def diff(old, new):
+    """Return a `FontDiff` of what differs between the `FontFingerprint`s
+    `old` and `new`.
+    """
+    return FontDiff(
+        _changed_keys(old.sections, new.sections),
+        _changed_keys(old.kerning, new.kerning),
+        _changed_keys(old.glyphs, new.glyphs),
+    )
+
+
+def invalidate(obj):
+    """Forget the cached fingerprints (and bounds) of `obj` and of the objects
+    that contain it, after changing one of its attributes.
+    """
+    _invalidate_caches(obj)
+
+
+def _changed_keys(old, new):
+    return sorted(key for key in set(old).union(new) if old.get(key) != new.get(key))
+
+
+def _hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _digest(value, cached):
+    writer = _Writer(value, cached)
+    writer.writeValue(value)
+    return _hash(writer.file.getvalue())
+
+
+class _Writer(Writer):
+    """Write objects like the .glyphs writer, but write the fingerprints of the
+    glyphs, layers and paths that they contain instead of their contents.
+    """
+
+    def __init__(self, root, cached):
+        super().__init__(StringIO())
+        self.root = root
+        self.cached = cached
+
+    def writeValue(self, value, forKey=None, forType=None):
+        if isinstance(value, _CACHED_TYPES) and value is not self.root:
+            self.file.write(fingerprint(value, self.cached))
+        else:
+            super().writeValue(value, forKey, forType)
+
+
+class _FontWriter(_Writer):
+    """Write a GSFont with the fingerprints of its top-level sections instead
+    of their contents, and keep the fingerprints of the sections.
+    """
+
+    def __init__(self, font, cached):
+        super().__init__(font, cached)
+        self.depth = 0
+        self.key = None
+        self.sections = OrderedDict()
+        self.kerning = OrderedDict()
+        self.glyphs = OrderedDict()
+
+    def writeDict(self, dictValue):
+        self.depth += 1
+        try:
+            super().writeDict(dictValue)
+        finally:
+            self.depth -= 1
+
+    def writeKey(self, key):
+        if self.depth == 1:
+            self.key = key
+        super().writeKey(key)
+
+    def writeValue(self, value, forKey=None, forType=None):
+        if self.depth != 1:
+            super().writeValue(value, forKey, forType)
+            return
+        if self.key == "glyphs":
+            for glyph in value:
+                self.glyphs[glyph.name] = fingerprint(glyph, self.cached)
+            digest = _hash("\n".join(self.glyphs.values()))
+        elif self.key == "kerning":
+            for master_id, kerning in value.items():
+                self.kerning[master_id] = _digest(kerning, self.cached)
+            digest = _hash(
+                "\n".join("{} {}".format(*item) for item in self.kerning.items())
+            )
+        else:
+            digest = _digest(value, self.cached)
+        self.sections[self.key] = digest
+        self.file.write(digest)
@@ -82,6 +82,25 @@ class GlyphData:
         return cls(name_mapping, alt_name_mapping, production_name_mapping)
 
 
+def default_glyph_data():
+    """Return the GlyphData of the included GlyphData.xml and
+    GlyphData_Ideographs.xml files, reading them on first use.
+    """
+    global GLYPHDATA
+    if GLYPHDATA is None:
+        try:
+            from importlib.resources import open_binary
+        except ImportError:
+            # use backport for python < 3.7
+            from importlib_resources import open_binary
+
+        GLYPHDATA = GlyphData.from_files(
+            open_binary("glyphsLib.data", "GlyphData.xml"),
+            open_binary("glyphsLib.data", "GlyphData_Ideographs.xml"),
+        )
+    return GLYPHDATA
+
+
 def get_glyph(glyph_name, data=None):
     """Return a named tuple (Glyph) containing information derived from a glyph
     name akin to GSGlyphInfo.
@@ -90,21 +109,8 @@ def get_glyph(glyph_name, data=None):
     and GlyphData_Ideographs.xml, going purely by the glyph name.
     """
 
-    # Read data on first use.
     if data is None:
-        global GLYPHDATA
-        if GLYPHDATA is None:
-            try:
-                from importlib.resources import open_binary
-            except ImportError:
-                # use backport for python < 3.7
-                from importlib_resources import open_binary
-
-            GLYPHDATA = GlyphData.from_files(
-                open_binary("glyphsLib.data", "GlyphData.xml"),
-                open_binary("glyphsLib.data", "GlyphData_Ideographs.xml"),
-            )
-        data = GLYPHDATA
+        data = default_glyph_data()
 
     # Look up data by full glyph name first.
     attributes = _lookup_attributes(glyph_name, data)
@@ -0,0 +1,187 @@
+# Copyright 2020 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Read and write fonts in the .glyphspackage layout, a directory with one
+file per glyph instead of a single .glyphs file:
+
+    MyFont.glyphspackage/
+        fontinfo.plist      everything but the glyphs and the display strings
+        order.plist         the names of the glyphs, in order
+        UIState.plist       the display strings
+        glyphs/
+            A_.glyph        one file per glyph, named like the glifs of UFOs
+            a.glyph
+            ...
+
+`GSFont(path)` and `GSFont.save(path)` use this layout when the path ends with
+".glyphspackage". The files contain what the .glyphs files that glyphsLib reads
+and writes contain.
+
+The glyph files are read and written by a pool of threads. Saving only
+rewrites the glyph files whose content changed, and deletes the files of the
+glyphs that are not in the font anymore.
+"""
+
+import concurrent.futures
+import logging
+import os
+from io import StringIO
+
+from fontTools.misc.filenames import userNameToFileName
+
+from glyphsLib.classes import GSGlyph
+from glyphsLib.parser import Parser
+from glyphsLib.tracing import span
+from glyphsLib.writer import Writer
+
+__all__ = ["parse_into_object", "write", "PACKAGE_SUFFIX"]
+
+logger = logging.getLogger(__name__)
+
+PACKAGE_SUFFIX = ".glyphspackage"
+
+_FONTINFO = "fontinfo.plist"
+_ORDER = "order.plist"
+_UI_STATE = "UIState.plist"
+_GLYPHS_DIR = "glyphs"
+_GLYPH_SUFFIX = ".glyph"
+
+# The keys of the font that are not written to fontinfo.plist.
+_PACKAGE_KEYS = frozenset(["glyphs", "DisplayStrings"])
+
+
+def parse_into_object(font, path, threads=None):
+    """Read the .glyphspackage at `path` into the new GSFont `font`.
+
+    The glyph files are read by a pool of `threads` threads (default: the
+    default of `concurrent.futures.ThreadPoolExecutor`).
+    """
+    # The ids and names are shared by all the files, see Parser.
+    strings = {}
+    fontinfo = _read(os.path.join(path, _FONTINFO))
+    Parser(strings=strings).parse_into_object(font, fontinfo)
+
+    order_path = os.path.join(path, _ORDER)
+    order = Parser().parse(_read(order_path)) if os.path.exists(order_path) else []
+    ui_state_path = os.path.join(path, _UI_STATE)
+    if os.path.exists(ui_state_path):
+        ui_state = Parser().parse(_read(ui_state_path))
+        if "displayStrings" in ui_state:
+            font.DisplayStrings = ui_state["displayStrings"]
+
+    glyphs_dir = os.path.join(path, _GLYPHS_DIR)
+    filenames = sorted(
+        name for name in os.listdir(glyphs_dir) if name.endswith(_GLYPH_SUFFIX)
+    )
+    glyphs = []
+    with span("read_glyph_files", count=len(filenames)):
+        with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+            paths = [os.path.join(glyphs_dir, name) for name in filenames]
+            for text in executor.map(_read, paths):
+                glyphs.append(Parser(GSGlyph, strings=strings).parse(text))
+    # The glyphs missing from the order go at the end, by file name.
+    index = {name: i for i, name in enumerate(order)}
+    glyphs.sort(key=lambda glyph: index.get(glyph.name, len(index)))
+    font.glyphs = glyphs
+
+
+def write(font, path, threads=None):
+    """Write `font` to the .glyphspackage at `path`, which is created if
+    needed.
+
+    Only the files whose content changed are written, by a pool of `threads`
+    threads. The glyph files of the package that don't belong to any glyph of
+    the font are deleted.
+
+    Return the sorted list of the paths of the files that were written.
+    """
+    glyphs_dir = os.path.join(path, _GLYPHS_DIR)
+    os.makedirs(glyphs_dir, exist_ok=True)
+
+    files = {
+        os.path.join(path, _FONTINFO): _dumps(_FontInfo(font)),
+        os.path.join(path, _ORDER): _dumps([glyph.name for glyph in font.glyphs]),
+        os.path.join(path, _UI_STATE): _dumps(
+            {"displayStrings": font.DisplayStrings or []}
+        ),
+    }
+    filenames = set()
+    for glyph in font.glyphs:
+        filename = userNameToFileName(glyph.name, filenames, suffix=_GLYPH_SUFFIX)
+        filenames.add(filename.lower())
+        files[os.path.join(glyphs_dir, filename)] = _dumps(glyph)
+
+    with span("write_glyph_files", count=len(files)):
+        with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+            written = [
+                file_path
+                for file_path, changed in zip(
+                    files, executor.map(_write_if_changed, files, files.values())
+                )
+                if changed
+            ]
+    for name in os.listdir(glyphs_dir):
+        if name.endswith(_GLYPH_SUFFIX) and name.lower() not in filenames:
+            logger.info("Removing %s", name)
+            os.remove(os.path.join(glyphs_dir, name))
+    return sorted(written)
+
+
+class _FontInfo:
+    """The font without the keys that are written outside of fontinfo.plist,
+    for the Writer.
+    """
+
+    def __init__(self, font):
+        self._font = font
+        self._classesForName = {
+            key: value
+            for key, value in font._classesForName.items()
+            if key not in _PACKAGE_KEYS
+        }
+
+    def __getattr__(self, name):
+        return getattr(self._font, name)
+
+
+def _dumps(value):
+    fp = StringIO()
+    writer = Writer(fp)
+    if isinstance(value, list):
+        writer.writeArray(value)
+        fp.write("\n")
+    else:
+        writer.write(value)
+    return fp.getvalue()
+
+
+def _read(path):
+    with open(path, "r", encoding="utf-8") as fp:
+        return fp.read()
+
+
+def _write_if_changed(path, text):
+    """Write `text` to `path` unless it is already there, return whether the
+    file was written.
+    """
+    data = text.encode("utf-8")
+    try:
+        with open(path, "rb") as fp:
+            if fp.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    with open(path, "wb") as fp:
+        fp.write(data)
+    return True
@@ -1,3 +1,641 @@
+"""Interpolation of the static instances of a designspace built by glyphsLib.
+
+`interpolate_instances` builds the instance UFOs of a designspace made by
+`glyphsLib.to_designspace` or `glyphsLib.build_masters`:
+
+    designspace = glyphsLib.to_designspace(font)
+    ufos = interpolate_instances(designspace)
+
+Instead of interpolating each point of each glyph on its own, the outlines,
+anchors and advance widths of all the glyphs that are defined in the same set
+of sources are packed into one matrix, with one row per source. The instances
+are then computed for all of those glyphs at once, as the product of the
+matrix of the source weights at each instance location with that matrix. This
+uses NumPy when it is installed, and plain Python lists otherwise.
+
+Brace layers are used as sparse sources for the glyphs that have them, and the
+substitutions of the bracket layer rules that apply at each instance location
+are swapped into the instance.
+"""
+
+import copy
+import logging
+import os
+from collections import OrderedDict
+
+from fontTools.designspaceLib import evaluateRule
+from fontTools.misc.fixedTools import otRound
+from fontTools.varLib.models import (
+    VariationModel,
+    normalizeLocation,
+    piecewiseLinearMap,
+)
+
 from glyphsLib.builder.instances import apply_instance_data, apply_instance_data_to_ufo
+from glyphsLib.tracing import span
+from glyphsLib.util import want_numpy
+
+__all__ = ["apply_instance_data", "apply_instance_data_to_ufo", "interpolate_instances"]
+
+logger = logging.getLogger(__name__)
+
+# fontinfo attributes interpolated between the masters. The others are copied
+# from the default master.
+INFO_NUMBER_ATTRIBUTES = (
+    "ascender",
+    "descender",
+    "xHeight",
+    "capHeight",
+    "italicAngle",
+    "openTypeHheaAscender",
+    "openTypeHheaDescender",
+    "openTypeHheaLineGap",
+    "openTypeHheaCaretSlopeRise",
+    "openTypeHheaCaretSlopeRun",
+    "openTypeHheaCaretOffset",
+    "openTypeOS2TypoAscender",
+    "openTypeOS2TypoDescender",
+    "openTypeOS2TypoLineGap",
+    "openTypeOS2WinAscent",
+    "openTypeOS2WinDescent",
+    "openTypeOS2SubscriptXSize",
+    "openTypeOS2SubscriptYSize",
+    "openTypeOS2SubscriptXOffset",
+    "openTypeOS2SubscriptYOffset",
+    "openTypeOS2SuperscriptXSize",
+    "openTypeOS2SuperscriptYSize",
+    "openTypeOS2SuperscriptXOffset",
+    "openTypeOS2SuperscriptYOffset",
+    "openTypeOS2StrikeoutSize",
+    "openTypeOS2StrikeoutPosition",
+    "openTypeVheaVertTypoAscender",
+    "openTypeVheaVertTypoDescender",
+    "openTypeVheaVertTypoLineGap",
+    "postscriptUnderlineThickness",
+    "postscriptUnderlinePosition",
+    "postscriptSlantAngle",
+    "postscriptBlueValues",
+    "postscriptOtherBlues",
+    "postscriptFamilyBlues",
+    "postscriptFamilyOtherBlues",
+    "postscriptStemSnapH",
+    "postscriptStemSnapV",
+)
+_INFO_UNROUNDED_ATTRIBUTES = frozenset(["italicAngle", "postscriptSlantAngle"])
+
+# fontinfo attributes of the default master that don't apply to an instance.
+_INFO_MASTER_ATTRIBUTES = (
+    "styleMapFamilyName",
+    "styleMapStyleName",
+    "postscriptFontName",
+    "postscriptFullName",
+    "openTypeNamePreferredSubfamilyName",
+    "openTypeNameCompatibleFullName",
+    "openTypeNameWWSSubfamilyName",
+)
+
+# Font lib keys copied from the default master.
+_LIB_PREFIXES = ("public.", "com.github.googlei18n.ufo2ft.")
+
+
+def interpolate_instances(
+    designspace,
+    include_filenames=None,
+    ufo_module=None,
+    round_geometry=True,
+    apply_glyphs_data=True,
+    save=False,
+    use_numpy=None,
+):
+    """Interpolate the instances of a designspace made by glyphsLib.
+
+    Args:
+        designspace: a DesignSpaceDocument, such as the one returned by
+            `to_designspace`. The UFOs of the sources are loaded from their
+            paths if they are not attached to the sources.
+        include_filenames: optional set of instance filenames (relative to
+            the designspace path) to be built. By default all instances are.
+        ufo_module: the module used to create the instance UFOs, ufoLib2 or
+            defcon (default: ufoLib2).
+        round_geometry: round the coordinates, anchors, advances and
+            metrics to integers.
+        apply_glyphs_data: also apply the Glyphs instance data, like
+            `apply_instance_data_to_ufo`.
+        save: write each instance UFO to its path, relative to the path of
+            the designspace.
+        use_numpy: use NumPy for the matrix products. By default NumPy is
+            used if it is installed.
+    Returns:
+        List of the instance UFOs, in the order of the designspace instances.
+    """
+    if ufo_module is None:
+        import ufoLib2 as ufo_module
+    matmul = _numpy_matmul if want_numpy(use_numpy) else _python_matmul
+
+    instances = _selected_instances(designspace, include_filenames)
+    if not instances:
+        return []
+    normalize = _location_normalizer(designspace)
+    sources = _load_sources(designspace, normalize, ufo_module)
+    masters = [source for source in sources if source.is_master]
+    default = next((s for s in masters if not any(s.location.values())), None)
+    if default is None:
+        raise ValueError("The designspace has no master at the default location")
+    locations = [
+        normalize(_design_location(instance, designspace)) for instance in instances
+    ]
+    models = _Models([source.location for source in sources])
+
+    with span("interpolate_glyphs"):
+        glyphs = _interpolate_glyphs(sources, default, locations, models, matmul)
+    with span("interpolate_kerning"):
+        kerning = _interpolate_kerning(
+            sources, masters, default, locations, models, matmul, round_geometry
+        )
+    info = _interpolate_info(sources, masters, locations, models, round_geometry)
+
+    ufos = []
+    for index, instance in enumerate(instances):
+        ufo = ufo_module.Font()
+        _copy_font_data(default.font, ufo)
+        for name, value in info[index].items():
+            setattr(ufo.info, name, value)
+        _set_instance_names(ufo, instance)
+        layer = ufo.layers.defaultLayer
+        for name, (template, values) in glyphs.items():
+            _write_glyph(layer.newGlyph(name), template, values[index], round_geometry)
+        ufo.kerning.update(kerning[index])
+        _apply_rules(ufo, designspace, _design_location(instance, designspace))
+        if apply_glyphs_data:
+            apply_instance_data_to_ufo(ufo, instance, designspace)
+        if save:
+            _save(ufo, instance, designspace)
+        ufos.append(ufo)
+    return ufos
+
+
+class _Source:
+    """A master or a brace layer, with its normalized location."""
+
+    def __init__(self, font, layer, location, is_master):
+        self.font = font
+        self.layer = layer
+        self.location = location
+        self.is_master = is_master
+
+
+class _Models:
+    """The VariationModels of the subsets of the sources, and the weights of
+    their sources at the instance locations.
+    """
+
+    def __init__(self, locations):
+        self.locations = locations
+        self._weights = {}
+
+    def weights(self, indices, locations):
+        """Return the matrix of the weights of the sources `indices` at each
+        of the normalized `locations`: one row per location, one column per
+        source.
+        """
+        key = tuple(indices)
+        if key not in self._weights:
+            model = VariationModel([self.locations[i] for i in indices])
+            # The deltas are linear combinations of the source values, so the
+            # weight of source k at a location is the interpolation of the
+            # deltas of the unit vector of k.
+            unit_deltas = []
+            for k in range(len(indices)):
+                unit = [0] * len(indices)
+                unit[k] = 1
+                unit_deltas.append(model.getDeltas(unit))
+            matrix = []
+            for location in locations:
+                scalars = model.getScalars(location)
+                matrix.append(
+                    [
+                        sum(s * d for s, d in zip(scalars, deltas))
+                        for deltas in unit_deltas
+                    ]
+                )
+            self._weights[key] = matrix
+        return self._weights[key]
+
+
+def _numpy_matmul(weights, matrix):
+    import numpy
+
+    return (numpy.array(weights) @ numpy.array(matrix, dtype=float)).tolist()
+
+
+def _python_matmul(weights, matrix):
+    result = []
+    width = len(matrix[0]) if matrix else 0
+    for row in weights:
+        values = [0.0] * width
+        for weight, source_values in zip(row, matrix):
+            if weight:
+                values = [v + weight * s for v, s in zip(values, source_values)]
+        result.append(values)
+    return result
+
+
+def _selected_instances(designspace, include_filenames):
+    from os.path import normcase, normpath
+
+    if include_filenames is None:
+        return list(designspace.instances)
+    include_filenames = {normcase(normpath(p)) for p in include_filenames}
+    return [
+        instance
+        for instance in designspace.instances
+        if instance.filename is not None
+        and normcase(normpath(instance.filename)) in include_filenames
+    ]
+
+
+def _design_location(descriptor, designspace):
+    if hasattr(descriptor, "getFullDesignLocation"):  # fontTools >= 4.33
+        return descriptor.getFullDesignLocation(designspace)
+    return descriptor.location
+
+
+def _location_normalizer(designspace):
+    axes = {}
+    for axis in designspace.axes:
+        mapping = dict(axis.map) if axis.map else None
+        axes[axis.name] = tuple(
+            piecewiseLinearMap(value, mapping) if mapping else value
+            for value in (axis.minimum, axis.default, axis.maximum)
+        )
+
+    def normalize(location):
+        location = {name: value for name, value in location.items() if name in axes}
+        return normalizeLocation(location, axes)
+
+    return normalize
+
+
+def _load_sources(designspace, normalize, ufo_module):
+    from glyphsLib.util import open_ufo
+
+    fonts = {}
+    sources = []
+    for source in designspace.sources:
+        font = source.font
+        if font is None:
+            if source.path not in fonts:
+                fonts[source.path] = open_ufo(source.path, ufo_module.Font)
+            font = fonts[source.path]
+        if source.layerName is None:
+            layer = font.layers.defaultLayer
+        elif source.layerName in font.layers:
+            layer = font.layers[source.layerName]
+        else:
+            continue
+        location = normalize(_design_location(source, designspace))
+        sources.append(_Source(font, layer, location, source.layerName is None))
+    return sources
+
+
+def _glyph_structure(glyph):
+    """Return what must be the same in all the sources of a glyph to
+    interpolate it.
+    """
+    return (
+        tuple(tuple(point.segmentType for point in contour) for contour in glyph),
+        tuple(component.baseGlyph for component in glyph.components),
+        tuple(anchor.name for anchor in glyph.anchors),
+    )
+
+
+def _glyph_values(glyph):
+    values = []
+    for contour in glyph:
+        for point in contour:
+            values.append(point.x)
+            values.append(point.y)
+    for component in glyph.components:
+        values.extend(component.transformation)
+    for anchor in glyph.anchors:
+        values.append(anchor.x)
+        values.append(anchor.y)
+    values.append(glyph.width)
+    values.append(glyph.height)
+    return values
+
+
+def _glyph_value_count(glyph):
+    return (
+        2 * sum(len(contour) for contour in glyph)
+        + 6 * len(glyph.components)
+        + 2 * len(glyph.anchors)
+        + 2
+    )
+
+
+def _interpolate_glyphs(sources, default, locations, models, matmul):
+    """Return an OrderedDict mapping the glyph names to the glyph of the
+    default master used as a template, and the list of the values of the
+    glyph in each instance.
+    """
+    glyph_names = list(default.layer.keys())
+    for source in sources:
+        if source.is_master:
+            glyph_names.extend(
+                name for name in source.layer.keys() if name not in default.layer
+            )
+    glyph_order = default.font.glyphOrder
+    if glyph_order:
+        order = {name: i for i, name in enumerate(glyph_order)}
+        glyph_names.sort(key=lambda name: order.get(name, len(order)))
+    default_index = sources.index(default)
+
+    # Group the glyphs by the sources that define them.
+    groups = OrderedDict()
+    templates = OrderedDict()
+    for name in glyph_names:
+        template = default.layer[name] if name in default.layer else None
+        indices = []
+        seen = set()
+        structure = None
+        for index, source in enumerate(sources):
+            if name not in source.layer:
+                continue
+            glyph = source.layer[name]
+            if template is None:
+                template = glyph
+            if structure is None:
+                structure = _glyph_structure(template)
+            if _glyph_structure(glyph) != structure:
+                logger.warning(
+                    "Glyph %s is not compatible in all sources, the "
+                    "incompatible sources are ignored",
+                    name,
+                )
+                continue
+            # Sources at the same location as another one are ignored.
+            key = tuple(sorted(source.location.items()))
+            if key in seen:
+                continue
+            seen.add(key)
+            indices.append(index)
+        templates[name] = template
+        if default_index not in indices:
+            logger.warning(
+                "Glyph %s is not in the default master, it is not interpolated", name,
+            )
+            indices = [sources.index(s) for s in sources if name in s.layer][:1]
+        groups.setdefault(tuple(indices), []).append(name)
+
+    result = OrderedDict((name, None) for name in glyph_names)
+    for indices, names in groups.items():
+        rows = [[] for _ in indices]
+        for row, index in zip(rows, indices):
+            layer = sources[index].layer
+            for name in names:
+                row.extend(_glyph_values(layer[name]))
+        if len(indices) == 1:
+            values = [rows[0]] * len(locations)
+        else:
+            values = matmul(models.weights(indices, locations), rows)
+        start = 0
+        for name in names:
+            length = _glyph_value_count(templates[name])
+            result[name] = (
+                templates[name],
+                [instance[start : start + length] for instance in values],
+            )
+            start += length
+    return result
+
+
+def _write_glyph(glyph, template, values, round_geometry):
+    rnd = otRound if round_geometry else (lambda v: v)
+    values = iter(values)
+    pen = glyph.getPointPen()
+    for contour in template:
+        pen.beginPath()
+        for point in contour:
+            x = rnd(next(values))
+            y = rnd(next(values))
+            pen.addPoint((x, y), point.segmentType, point.smooth, point.name)
+        pen.endPath()
+    for component in template.components:
+        transformation = [next(values) for _ in range(6)]
+        transformation[4] = rnd(transformation[4])
+        transformation[5] = rnd(transformation[5])
+        pen.addComponent(component.baseGlyph, tuple(transformation))
+    for anchor in template.anchors:
+        glyph.appendAnchor(
+            {"name": anchor.name, "x": rnd(next(values)), "y": rnd(next(values))}
+        )
+    glyph.width = rnd(next(values))
+    glyph.height = rnd(next(values))
+    glyph.unicodes = list(template.unicodes)
+    glyph.lib.update(copy.deepcopy(dict(template.lib)))
+
+
+def _kerning_value(font, pair, groups_by_glyph):
+    """Return the kerning value of `pair` in `font`, with the fallbacks to
+    the kerning groups of the glyphs of the pair.
+    """
+    kerning = font.kerning
+    if pair in kerning:
+        return kerning[pair]
+    first, second = pair
+    first_group = groups_by_glyph[0].get(first)
+    second_group = groups_by_glyph[1].get(second)
+    for candidate in (
+        (first, second_group),
+        (first_group, second),
+        (first_group, second_group),
+    ):
+        if None not in candidate and candidate in kerning:
+            return kerning[candidate]
+    return 0
+
+
+def _interpolate_kerning(
+    sources, masters, default, locations, models, matmul, round_geometry
+):
+    groups_by_glyph = ({}, {})
+    for name, members in default.font.groups.items():
+        for side, prefix in enumerate(("public.kern1.", "public.kern2.")):
+            if name.startswith(prefix):
+                for glyph_name in members:
+                    groups_by_glyph[side][glyph_name] = name
+    pairs = []
+    seen = set()
+    for master in masters:
+        for pair in master.font.kerning.keys():
+            if pair not in seen:
+                seen.add(pair)
+                pairs.append(pair)
+    if not pairs:
+        return [{} for _ in locations]
+    indices = [sources.index(master) for master in masters]
+    rows = [
+        [_kerning_value(master.font, pair, groups_by_glyph) for pair in pairs]
+        for master in masters
+    ]
+    if len(indices) == 1:
+        values = [rows[0]] * len(locations)
+    else:
+        values = matmul(models.weights(indices, locations), rows)
+    rnd = otRound if round_geometry else (lambda v: v)
+    return [
+        {pair: rnd(value) for pair, value in zip(pairs, instance)}
+        for instance in values
+    ]
+
+
+def _interpolate_info(sources, masters, locations, models, round_geometry):
+    """Return the interpolated fontinfo attributes of each instance."""
+    names = []
+    rows = [[] for _ in masters]
+    lengths = []
+    for name in INFO_NUMBER_ATTRIBUTES:
+        values = [getattr(master.font.info, name, None) for master in masters]
+        if any(value is None for value in values):
+            continue
+        if isinstance(values[0], (list, tuple)):
+            if any(len(value) != len(values[0]) for value in values):
+                continue
+            lengths.append(len(values[0]))
+            for row, value in zip(rows, values):
+                row.extend(value)
+        else:
+            lengths.append(None)
+            for row, value in zip(rows, values):
+                row.append(value)
+        names.append(name)
+    if not names:
+        return [{} for _ in locations]
+    indices = [sources.index(master) for master in masters]
+    if len(indices) == 1:
+        values = [rows[0]] * len(locations)
+    else:
+        values = _python_matmul(models.weights(indices, locations), rows)
+
+    result = []
+    for instance in values:
+        info = {}
+        position = 0
+        for name, length in zip(names, lengths):
+            rnd = (
+                otRound
+                if round_geometry and name not in _INFO_UNROUNDED_ATTRIBUTES
+                else (lambda v: v)
+            )
+            if length is None:
+                info[name] = rnd(instance[position])
+                position += 1
+            else:
+                info[name] = [rnd(v) for v in instance[position : position + length]]
+                position += length
+        result.append(info)
+    return result
+
+
+def _copy_font_data(default, ufo):
+    from fontTools.ufoLib import fontInfoAttributesVersion3
+
+    for name in fontInfoAttributesVersion3:
+        if name == "guidelines" or name in _INFO_MASTER_ATTRIBUTES:
+            continue
+        value = getattr(default.info, name, None)
+        if value is not None:
+            setattr(ufo.info, name, copy.deepcopy(value))
+    for key, value in default.lib.items():
+        if key.startswith(_LIB_PREFIXES):
+            ufo.lib[key] = copy.deepcopy(value)
+    for name, members in default.groups.items():
+        ufo.groups[name] = list(members)
+    ufo.features.text = default.features.text
+
+
+def _set_instance_names(ufo, instance):
+    if instance.familyName is not None:
+        ufo.info.familyName = instance.familyName
+    if instance.styleName is not None:
+        ufo.info.styleName = instance.styleName
+    ufo.info.styleMapFamilyName = instance.styleMapFamilyName
+    ufo.info.styleMapStyleName = instance.styleMapStyleName
+    ufo.info.postscriptFontName = instance.postScriptFontName
+
+
+def _apply_rules(ufo, designspace, location):
+    """Swap the glyphs substituted by the rules that apply at `location`."""
+    layer = ufo.layers.defaultLayer
+    for rule in designspace.rules:
+        if not evaluateRule(rule, location):
+            continue
+        for name, substitute in rule.subs:
+            if name in layer and substitute in layer:
+                _swap_glyphs(ufo, name, substitute)
+
+
+def _swap_glyphs(ufo, first, second):
+    """Swap the outlines, anchors, advances and references of two glyphs.
+    Their unicodes stay with their names.
+    """
+    layer = ufo.layers.defaultLayer
+    a, b = layer[first], layer[second]
+    data_a = _glyph_data(a)
+    data_b = _glyph_data(b)
+    _set_glyph_data(a, data_b)
+    _set_glyph_data(b, data_a)
+
+    swap = {first: second, second: first}
+    for glyph in layer:
+        for component in glyph.components:
+            if component.baseGlyph in swap:
+                component.baseGlyph = swap[component.baseGlyph]
+    kerning = {
+        (swap.get(left, left), swap.get(right, right)): value
+        for (left, right), value in ufo.kerning.items()
+    }
+    ufo.kerning.clear()
+    ufo.kerning.update(kerning)
+    for name, members in list(ufo.groups.items()):
+        if first in members or second in members:
+            ufo.groups[name] = [swap.get(member, member) for member in members]
+
+
+def _glyph_data(glyph):
+    from fontTools.pens.recordingPen import RecordingPointPen
+
+    pen = RecordingPointPen()
+    glyph.drawPoints(pen)
+    anchors = [
+        {"name": anchor.name, "x": anchor.x, "y": anchor.y} for anchor in glyph.anchors
+    ]
+    return pen, anchors, glyph.width, glyph.height
+
+
+def _set_glyph_data(glyph, data):
+    pen, anchors, width, height = data
+    glyph.clearContours()
+    glyph.clearComponents()
+    glyph.clearAnchors()
+    pen.replay(glyph.getPointPen())
+    for anchor in anchors:
+        glyph.appendAnchor(anchor)
+    glyph.width = width
+    glyph.height = height
+
+
+def _save(ufo, instance, designspace):
+    from glyphsLib.util import clean_ufo
 
-__all__ = ["apply_instance_data", "apply_instance_data_to_ufo"]
+    if instance.path is not None:
+        path = instance.path
+    else:
+        if designspace.path is None:
+            raise ValueError("Can't save the instances of an unsaved designspace")
+        path = os.path.join(os.path.dirname(designspace.path), instance.filename)
+    path = os.path.normpath(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    clean_ufo(path)
+    ufo.save(path)
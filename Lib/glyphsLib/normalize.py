@@ -0,0 +1,428 @@
+# Copyright 2020 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Save UFOs in the form that ufonormalizer gives them, in one pass.
+
+`save_ufo(ufo, path)` writes the same bytes as saving the UFO and then running
+`ufonormalizer.normalizeUFO(path, writeModTimes=False)` on it, but serializes
+the glyphs and the property lists straight from the UFO objects, instead of
+writing them with ufoLib and then reading, parsing and rewriting every file.
+The formatting (XML layout, order of the attributes and keys, numbers, file
+names) is done by the public functions of ufonormalizer, so that both stay the
+same. Only its rules for the colors and guidelines, which are private to
+ufonormalizer, are repeated here.
+
+Works with UFOs of ufoLib2 and defcon.
+"""
+
+from collections.abc import Mapping
+import os
+import plistlib
+
+import ufonormalizer
+from fontTools.ufoLib import (
+    fontInfoAttributesVersion3ValueData,
+    validateInfoVersion3Data,
+)
+
+__all__ = ["save_ufo"]
+
+# What ufoLib writes to metainfo.plist.
+_CREATOR = "com.github.fonttools.ufoLib"
+_FORMAT_VERSION = 3
+_GLIF_FORMAT_VERSION = 2
+_DEFAULT_GLYPHS_DIRECTORY = "glyphs"
+
+_TRANSFORMATION = (
+    ("xScale", 1),
+    ("xyScale", 0),
+    ("yxScale", 0),
+    ("yScale", 1),
+    ("xOffset", 0),
+    ("yOffset", 0),
+)
+
+
+def save_ufo(ufo, path):
+    """Write `ufo` to `path` as ufonormalizer would normalize it.
+
+    The directory is created if needed. Files of a previous UFO at `path` that
+    aren't written again are not removed: delete the directory first (see
+    `glyphsLib.util.clean_ufo`).
+    """
+    os.makedirs(path, exist_ok=True)
+    metainfo = {"creator": _CREATOR, "formatVersion": _FORMAT_VERSION}
+    _write_plist(path, "metainfo.plist", metainfo, remove_empty=False)
+
+    layer_contents = []
+    directories = {_DEFAULT_GLYPHS_DIRECTORY}
+    referenced_images = set()
+    default_layer = ufo.layers.defaultLayer
+    for layer in ufo.layers:
+        if layer is default_layer:
+            directory = _DEFAULT_GLYPHS_DIRECTORY
+        else:
+            directory = ufonormalizer.userNameToFileName(
+                layer.name, directories, prefix="glyphs."
+            )
+            directories.add(directory.lower())
+        layer_contents.append([layer.name, directory])
+        referenced_images.update(_write_layer(layer, os.path.join(path, directory)))
+
+    _write_plist(
+        path,
+        "fontinfo.plist",
+        _info_data(ufo.info),
+        preprocessor=_normalize_info_guidelines,
+    )
+    _write_plist(
+        path,
+        "groups.plist",
+        {name: list(glyphs) for name, glyphs in ufo.groups.items()},
+    )
+    kerning = {}
+    for (first, second), value in ufo.kerning.items():
+        kerning.setdefault(first, {})[second] = value
+    _write_plist(path, "kerning.plist", kerning)
+    _write_plist(path, "layercontents.plist", layer_contents, remove_empty=False)
+    _write_plist(path, "lib.plist", ufo.lib)
+
+    if ufo.features.text:
+        _write_file(ufo.features.text.encode("utf-8"), path, "features.fea")
+    for file_name in ufo.data.fileNames:
+        _write_file(ufo.data[file_name], path, "data", file_name)
+    # ufonormalizer deletes the images that no glyph uses.
+    for file_name in ufo.images.fileNames:
+        if file_name in referenced_images:
+            _write_file(ufo.images[file_name], path, "images", file_name)
+
+
+def _write_layer(layer, directory):
+    """Write the glyphs, contents.plist and layerinfo.plist of a layer, return
+    the file names of the images that the glyphs use.
+    """
+    os.makedirs(directory, exist_ok=True)
+    contents = {}
+    file_names = set()
+    for name in sorted(layer.keys()):
+        file_name = ufonormalizer.userNameToFileName(name, file_names, suffix=".glif")
+        file_names.add(file_name.lower())
+        contents[name] = file_name
+
+    lib = _plist_object(getattr(layer, "lib", None) or {})
+    image_references = ufonormalizer.readImageReferences(lib) or {}
+    for name, file_name in contents.items():
+        glyph = layer[name]
+        _write_file(glif_text(name, glyph).encode("utf-8"), directory, file_name)
+        image_file_name = _image_file_name(glyph)
+        if image_file_name is not None:
+            image_references[file_name] = image_file_name
+        else:
+            image_references.pop(file_name, None)
+    _write_plist(directory, "contents.plist", contents, remove_empty=False)
+
+    if image_references:
+        ufonormalizer.storeImageReferences(lib, image_references)
+    info = {}
+    color = getattr(layer, "color", None)
+    if color is not None:
+        info["color"] = str(color)
+    if lib:
+        info["lib"] = lib
+    _write_plist(
+        directory, "layerinfo.plist", info, preprocessor=_normalize_layer_color,
+    )
+    return set(image_references.values())
+
+
+def glif_text(name, glyph):
+    """Return the normalized .glif of the glyph `glyph` named `name`."""
+    writer = ufonormalizer.XMLWriter()
+    writer.beginElement("glyph", attrs={"name": name, "format": _GLIF_FORMAT_VERSION})
+
+    seen = set()
+    for code in getattr(glyph, "unicodes", None) or []:
+        if code not in seen:
+            seen.add(code)
+            writer.simpleElement("unicode", attrs={"hex": "%04X" % code})
+
+    advance = {}
+    width = float(getattr(glyph, "width", None) or 0)
+    if width:
+        advance["width"] = width
+    height = float(getattr(glyph, "height", None) or 0)
+    if height:
+        advance["height"] = height
+    if advance:
+        writer.simpleElement("advance", attrs=advance)
+
+    image = getattr(glyph, "image", None)
+    if image and image.get("fileName"):
+        attrs = {"fileName": image["fileName"]}
+        attrs.update(
+            _transformation(
+                image.get(attr, default) for attr, default in _TRANSFORMATION
+            )
+        )
+        color = image.get("color")
+        if color is not None:
+            attrs["color"] = _color_string(color)
+        writer.simpleElement("image", attrs=attrs)
+
+    pen = _OutlinePen()
+    glyph.drawPoints(pen)
+    if pen.outline:
+        writer.beginElement("outline")
+        for tag, attrs, points in pen.outline:
+            if tag == "contour":
+                writer.beginElement("contour", attrs=attrs)
+                for point in points:
+                    writer.simpleElement("point", attrs=point)
+                writer.endElement("contour")
+            else:
+                writer.simpleElement("component", attrs=attrs)
+        writer.endElement("outline")
+
+    for anchor in getattr(glyph, "anchors", None) or []:
+        attrs = {"x": float(anchor["x"]), "y": float(anchor["y"])}
+        name_ = anchor.get("name")
+        if name_ is not None:
+            attrs["name"] = name_
+        color = anchor.get("color")
+        if color is not None:
+            attrs["color"] = _color_string(color)
+        identifier = anchor.get("identifier")
+        if identifier is not None:
+            attrs["identifier"] = identifier
+        writer.simpleElement("anchor", attrs=attrs)
+
+    for guideline in getattr(glyph, "guidelines", None) or []:
+        attrs = _guideline(
+            {
+                key: guideline.get(key)
+                for key in ("x", "y", "angle", "color", "name", "identifier")
+            }
+        )
+        if attrs is not None:
+            writer.simpleElement("guideline", attrs=attrs)
+
+    lib = getattr(glyph, "lib", None)
+    if lib:
+        lib = _plist_object(lib)
+        if "public.markColor" in lib:
+            color = _color_string(lib.pop("public.markColor"))
+            if color is not None:
+                lib["public.markColor"] = color
+        writer.beginElement("lib")
+        writer.propertyListObject(lib)
+        writer.endElement("lib")
+
+    note = getattr(glyph, "note", None)
+    if note and note.strip():
+        writer.simpleElement(
+            "note", value=ufonormalizer.xmlEscapeText("\n" + note.strip() + "\n")
+        )
+
+    writer.endElement("glyph")
+    writer.raw("")
+    return writer.getText()
+
+
+class _OutlinePen:
+    """A point pen that keeps the contours and components of a glyph as
+    ufonormalizer writes them.
+    """
+
+    def __init__(self):
+        self.outline = []
+        self._attrs = None
+        self._points = None
+
+    def beginPath(self, identifier=None, **kwargs):
+        self._attrs = {}
+        if identifier is not None:
+            self._attrs["identifier"] = identifier
+        self._points = []
+
+    def addPoint(
+        self, pt, segmentType=None, smooth=False, name=None, identifier=None, **kwargs
+    ):
+        if self._points is None:
+            return
+        if pt is None:
+            # ufonormalizer drops the contours with invalid points.
+            self._points = None
+            return
+        attrs = {"x": float(pt[0]), "y": float(pt[1])}
+        if segmentType is not None and segmentType != "offcurve":
+            attrs["type"] = segmentType
+            if smooth:
+                attrs["smooth"] = "yes"
+        if name is not None:
+            attrs["name"] = name
+        if identifier is not None:
+            attrs["identifier"] = identifier
+        self._points.append(attrs)
+
+    def endPath(self):
+        if self._points:
+            self.outline.append(("contour", self._attrs, self._points))
+        self._attrs = self._points = None
+
+    def addComponent(self, baseGlyphName, transformation, identifier=None, **kwargs):
+        if not baseGlyphName:
+            return
+        attrs = {"base": baseGlyphName}
+        attrs.update(_transformation(transformation))
+        if identifier is not None:
+            attrs["identifier"] = identifier
+        self.outline.append(("component", attrs, None))
+
+
+def _transformation(values):
+    """Return the attributes of a transformation that differ from the
+    identity.
+    """
+    return {
+        attr: float(value)
+        for (attr, default), value in zip(_TRANSFORMATION, values)
+        if float(value) != default
+    }
+
+
+def _color_string(value):
+    """Return a color string as ufonormalizer writes it, or None if it is not
+    a valid color.
+    """
+    if value.count(",") != 3:
+        return None
+    try:
+        components = [float(v) for v in value.split(",")]
+    except ValueError:
+        return None
+    if any(v < 0 or v > 1 for v in components):
+        return None
+    return ",".join(ufonormalizer.xmlConvertFloat(v) for v in components)
+
+
+def _guideline(guideline):
+    """Return a guideline as ufonormalizer writes it, or None if ufonormalizer
+    drops it.
+    """
+    values = {}
+    for key in ("x", "y", "angle"):
+        value = guideline.get(key)
+        if value is not None:
+            try:
+                value = float(value)
+            except ValueError:
+                return None
+        values[key] = value
+    x, y, angle = values["x"], values["y"], values["angle"]
+    # <x=300 y=0> and <x=0 y=300> are horizontal and vertical guidelines.
+    if angle is None:
+        if x == 0 and y is not None:
+            x = None
+        if y == 0 and x is not None:
+            y = None
+    # Either x or y, or both with an angle.
+    if x is None and y is None:
+        return None
+    if (x is None or y is None) != (angle is None):
+        return None
+
+    normalized = {}
+    for key, value in (("x", x), ("y", y), ("angle", angle)):
+        if value is not None:
+            normalized[key] = value
+    name = guideline.get("name")
+    if name is not None:
+        normalized["name"] = name
+    color = guideline.get("color")
+    if color is not None:
+        color = _color_string(color)
+        if color is not None:
+            normalized["color"] = color
+    identifier = guideline.get("identifier")
+    if identifier is not None:
+        normalized["identifier"] = identifier
+    return normalized
+
+
+def _normalize_info_guidelines(info):
+    guidelines = info.get("guidelines")
+    if guidelines:
+        info["guidelines"] = [
+            normalized
+            for normalized in map(_guideline, guidelines)
+            if normalized is not None
+        ]
+
+
+def _normalize_layer_color(info):
+    if "color" in info:
+        color = _color_string(info.pop("color"))
+        if color is not None:
+            info["color"] = color
+
+
+def _image_file_name(glyph):
+    image = getattr(glyph, "image", None)
+    if image:
+        return image.get("fileName")
+    return None
+
+
+def _info_data(info):
+    """Return the content of fontinfo.plist, like `UFOWriter.writeInfo`."""
+    data = {}
+    for attr in fontInfoAttributesVersion3ValueData:
+        value = getattr(info, attr, None)
+        if value is not None:
+            data[attr] = value
+    return _plist_object(validateInfoVersion3Data(data))
+
+
+def _plist_object(value):
+    """Return a copy of `value` with plain dicts and lists, for the property
+    list writer of ufonormalizer.
+    """
+    if isinstance(value, Mapping):
+        return {key: _plist_object(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plist_object(item) for item in value]
+    return value
+
+
+def _write_plist(path, file_name, data, preprocessor=None, remove_empty=True):
+    """Write a property list like ufonormalizer, which doesn't keep the empty
+    ones unless `remove_empty` is False.
+    """
+    data = _plist_object(data)
+    if not data:
+        # ufonormalizer writes the empty ones that it keeps with plistlib.
+        if not remove_empty:
+            _write_file(plistlib.dumps(data), path, file_name)
+        return
+    text = ufonormalizer.normalizePropertyList(data, preprocessor=preprocessor)
+    _write_file(text.encode("utf-8"), path, file_name)
+
+
+def _write_file(data, path, *subpath):
+    file_path = os.path.join(path, *subpath)
+    directory = os.path.dirname(file_path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    with open(file_path, "wb") as fp:
+        fp.write(data)
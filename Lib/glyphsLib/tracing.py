@@ -0,0 +1,349 @@
+# Copyright 2020 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Stage-level instrumentation of conversions.
+
+The conversion code marks its main stages (parsing, building the UFO masters,
+assembling the designspace, writing files...) with `span` blocks. Nothing is
+recorded unless a `Tracer` is active, in which case `span` only costs a global
+lookup and returns a shared no-op context manager.
+
+    from glyphsLib import tracing
+
+    with tracing.trace("out.json") as tracer:
+        glyphsLib.build_masters("MyFont.glyphs", "master_ufo")
+    print(tracer.summary())
+
+The written file uses the Chrome trace event format, which can be opened in
+chrome://tracing or https://ui.perfetto.dev.
+
+A `MemoryTracer` additionally records the memory high-water mark of each stage
+and counts the glyphsLib objects alive after parsing:
+
+    with tracing.trace(tracer=tracing.MemoryTracer()) as tracer:
+        glyphsLib.build_masters("MyFont.glyphs", "master_ufo")
+    print(tracer.report())
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+import gc
+import os
+import sys
+import threading
+import time
+
+# This module is imported with glyphsLib (for `span`), so json and tracemalloc,
+# which only the tracers use, are imported where they are needed.
+
+__all__ = [
+    "Tracer",
+    "MemoryTracer",
+    "span",
+    "start",
+    "stop",
+    "trace",
+    "active_tracer",
+    "count_objects",
+]
+
+# The currently active Tracer, or None when tracing is disabled.
+_tracer = None
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "token")
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.token = None
+
+    def __enter__(self):
+        self.token = self.tracer.begin(self.name, self.args)
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.tracer.end(self.token)
+        return False
+
+
+def span(name, **args):
+    """Return a context manager timing the enclosed block as stage `name`.
+
+    Extra keyword arguments are stored along with the span (e.g. the name of
+    the file being written). When no tracer is active, this is a no-op.
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_SPAN
+    return _Span(tracer, name, args)
+
+
+class Tracer:
+    """Collect the spans entered while this tracer is active.
+
+    Each completed span is stored as a Chrome trace "complete" event (a dict
+    with "name", "ph", "ts", "dur", "pid", "tid" and "args" keys) in `events`,
+    with times in microseconds relative to the creation of the tracer.
+    """
+
+    def __init__(self):
+        self.events = []
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+
+    def begin(self, name, args):
+        """Called when a span is entered. Return a token passed to `end`."""
+        return (name, args, time.perf_counter())
+
+    def end(self, token):
+        """Called when a span is exited with the token returned by `begin`."""
+        now = time.perf_counter()
+        name, args, start = token
+        self.events.append(
+            {
+                "name": name,
+                "cat": "glyphsLib",
+                "ph": "X",
+                "ts": (start - self._origin) * 1e6,
+                "dur": (now - start) * 1e6,
+                "pid": self._pid,
+                "tid": threading.get_ident(),
+                "args": args,
+            }
+        )
+
+    def close(self):
+        """Called when the tracer is deactivated by `trace`."""
+
+    def summary(self):
+        """Return a dict of total time in seconds spent in each stage, in the
+        order in which the stages were first completed.
+        """
+        totals = {}
+        for event in self.events:
+            name = event["name"]
+            totals[name] = totals.get(name, 0.0) + event["dur"] / 1e6
+        return totals
+
+    def to_chrome_trace(self):
+        """Return the recorded spans as a Chrome trace JSON object."""
+        events = sorted(self.events, key=lambda event: event["ts"])
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, path):
+        """Write the recorded spans to `path` in the Chrome trace format."""
+        import json
+
+        with open(path, "w", encoding="utf-8") as fp:
+            json.dump(self.to_chrome_trace(), fp, indent=1)
+
+
+class MemoryTracer(Tracer):
+    """A Tracer that also records the memory used by each stage.
+
+    For every span, the event "args" get the following entries, in bytes:
+
+    - "peak": high-water mark of the memory allocated by Python (as seen by
+      tracemalloc) while the stage was running. On Python < 3.9 the peak
+      cannot be reset and is the high-water mark since the tracer started;
+    - "current": memory allocated by Python at the end of the stage;
+    - "maxrss": high-water mark of the resident set size of the process at
+      the end of the stage, when the platform reports it.
+
+    After each outermost span named in `census_spans`, the glyphsLib objects
+    that are alive are counted by class (see `count_objects`) and stored in
+    `object_counts` under the span name.
+
+    tracemalloc is started when the tracer is created if it is not running
+    already, and stopped again by `close`. Tracing Python allocations slows
+    down the conversion noticeably, so this is meant for diagnostics only.
+    """
+
+    def __init__(self, census_spans=("parse",)):
+        import tracemalloc
+
+        super().__init__()
+        self.census_spans = frozenset(census_spans)
+        self.object_counts = {}
+        self._peaks = []
+        self._names = []
+        self._started_tracemalloc = not tracemalloc.is_tracing()
+        if self._started_tracemalloc:
+            tracemalloc.start()
+
+    def begin(self, name, args):
+        import tracemalloc
+
+        _, peak = tracemalloc.get_traced_memory()
+        if self._peaks:
+            self._peaks[-1] = max(self._peaks[-1], peak)
+        self._peaks.append(0)
+        self._names.append(name)
+        _reset_peak()
+        return super().begin(name, args)
+
+    def end(self, token):
+        import tracemalloc
+
+        current, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, self._peaks.pop())
+        self._names.pop()
+        if self._peaks:
+            self._peaks[-1] = max(self._peaks[-1], peak)
+        _reset_peak()
+
+        name, args, _ = token
+        args = dict(args, current=current, peak=peak)
+        maxrss = _max_rss()
+        if maxrss is not None:
+            args["maxrss"] = maxrss
+        super().end((name, args, token[2]))
+
+        if name in self.census_spans and name not in self._names:
+            self.object_counts[name] = count_objects()
+
+    def close(self):
+        import tracemalloc
+
+        if self._started_tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def report(self):
+        """Return a human-readable table of the memory used by each stage,
+        followed by the object counts.
+        """
+        mib = 1024 * 1024
+        rows = []
+        for event in sorted(self.events, key=lambda event: event["ts"]):
+            args = event["args"]
+            name = event["name"]
+            detail = args.get("path") or args.get("master")
+            if detail:
+                name = "{} ({})".format(name, os.path.basename(detail))
+            maxrss = args.get("maxrss")
+            rows.append(
+                (
+                    name,
+                    "{:.3f}".format(event["dur"] / 1e6),
+                    "{:.1f}".format(args["peak"] / mib),
+                    "{:.1f}".format(args["current"] / mib),
+                    "-" if maxrss is None else "{:.1f}".format(maxrss / mib),
+                )
+            )
+        width = max([len("stage")] + [len(row[0]) for row in rows])
+        line = "{:<%d} {:>10} {:>12} {:>12} {:>12}" % width
+        lines = [
+            line.format("stage", "time (s)", "peak (MiB)", "end (MiB)", "RSS (MiB)")
+        ]
+        lines.extend(line.format(*row) for row in rows)
+        for name, counts in self.object_counts.items():
+            lines.append("")
+            lines.append("objects alive after {}:".format(name))
+            for class_name, count in counts.most_common():
+                lines.append("  {:<30} {:>10}".format(class_name, count))
+        return "\n".join(lines)
+
+
+def _reset_peak():
+    import tracemalloc
+
+    # tracemalloc.reset_peak is new in Python 3.9
+    reset_peak = getattr(tracemalloc, "reset_peak", None)
+    if reset_peak is not None:
+        reset_peak()
+
+
+def _max_rss():
+    """Return the maximum resident set size of the process in bytes, or None
+    if it is not available on this platform.
+    """
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def count_objects():
+    """Return a Counter of the live instances of the classes defined in
+    glyphsLib.classes (GSNode, GSPath, GSLayer, the proxies...) and
+    glyphsLib.types (Point, Transform...), keyed by class name.
+    """
+    modules = {"glyphsLib.classes", "glyphsLib.types"}
+    counts = Counter()
+    for obj in gc.get_objects():
+        cls = type(obj)
+        if cls.__module__ in modules:
+            counts[cls.__name__] += 1
+    return counts
+
+
+def active_tracer():
+    """Return the active Tracer, or None if tracing is disabled."""
+    return _tracer
+
+
+def start(tracer=None):
+    """Start recording spans into `tracer` (a new Tracer by default) and return
+    it. Tracing stays enabled until `stop` is called.
+    """
+    global _tracer
+    if tracer is None:
+        tracer = Tracer()
+    _tracer = tracer
+    return tracer
+
+
+def stop():
+    """Stop recording spans and return the tracer that was active, if any."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+@contextmanager
+def trace(path=None, tracer=None):
+    """Record the spans of the enclosed block and yield the tracer.
+
+    If `path` is given, the Chrome trace is written there on exit. The
+    previously active tracer, if any, is restored afterwards.
+    """
+    global _tracer
+    previous = _tracer
+    tracer = start(tracer)
+    try:
+        yield tracer
+    finally:
+        _tracer = previous
+        tracer.close()
+        if path is not None:
+            tracer.write(path)
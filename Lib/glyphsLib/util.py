@@ -14,14 +14,20 @@
 
 # TODO: (jany) merge with builder/common.py
 
+from contextlib import contextmanager
+import fnmatch
+import gc
 import logging
 import itertools
 import os
+import re
 import shutil
 from fontTools.misc.textTools import num2binary
 
 logger = logging.getLogger(__name__)
 
+BRACKET_LAYER_RE = re.compile(r".*(?P<first_bracket>[\[\]])\s*(?P<value>\d+)\s*\].*")
+
 
 def build_ufo_path(out_dir, family_name, style_name):
     """Build string to use as a UFO path."""
@@ -33,9 +39,9 @@ def build_ufo_path(out_dir, family_name, style_name):
     )
 
 
-def open_ufo(path, font_class, **kwargs):
+def open_ufo(path, font_class, lazy=False, **kwargs):
     try:
-        return font_class.open(path, lazy=False, **kwargs)  # ufoLib2
+        return font_class.open(path, lazy=lazy, **kwargs)  # ufoLib2
     except AttributeError:
         return font_class(path, **kwargs)  # defcon, fontParts, etc.
 
@@ -123,3 +129,70 @@ def tostr(s, encoding="ascii", errors="strict"):
         return s.decode(encoding, errors)
     else:
         return s
+
+
+@contextmanager
+def gc_disabled():
+    """Disable the garbage collector in the block.
+
+    Parsing, pickling and unpickling fonts create or traverse millions of
+    objects, which would trigger many useless garbage collections.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def want_numpy(use_numpy=None):
+    """Return whether to use NumPy, for the functions with a `use_numpy`
+    argument: if it is None, whether NumPy is installed. True raises an
+    ImportError if it isn't.
+    """
+    if use_numpy is False:
+        return False
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        if use_numpy:
+            raise
+        return False
+    return True
+
+
+def select_master_ids(font, master_names=None):
+    """Return the set of the ids of the masters of `font` that have their name
+    or id in `master_names`, or of all the masters if it is None.
+    """
+    if master_names is None:
+        return {master.id for master in font.masters}
+    master_ids = set()
+    for name in master_names:
+        matching = {
+            master.id for master in font.masters if name in (master.name, master.id)
+        }
+        if not matching:
+            raise ValueError(f"The font has no master named {name!r}")
+        master_ids.update(matching)
+    return master_ids
+
+
+def select_glyph_names(font, patterns, include_components=True):
+    """Return the set of the names of the glyphs of `font` that match one of
+    the shell-style `patterns`, and of the glyphs they use as components if
+    `include_components` is True.
+    """
+    all_names = [glyph.name for glyph in font.glyphs]
+    names = set()
+    for pattern in patterns:
+        # Glyph names are case sensitive on all platforms.
+        matching = [name for name in all_names if fnmatch.fnmatchcase(name, pattern)]
+        if not matching:
+            raise ValueError(f"The font has no glyph matching {pattern!r}")
+        names.update(matching)
+    if include_components:
+        names = font.componentGraph.component_closure(names)
+    return names
@@ -0,0 +1,457 @@
+# Copyright 2020 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Keep the UFO masters of a .glyphs file up to date while it is being edited.
+
+    glyphs2ufo --watch MyFont.glyphs -m master_ufo
+
+or from Python:
+
+    build = IncrementalBuild("MyFont.glyphs", "master_ufo")
+    build.build()
+    ...
+    build.update()  # after the file was saved
+
+`IncrementalBuild` keeps the parsed GSFont and the master UFOs in memory. When
+the file changes, only the glyphs whose source text changed are parsed again.
+They are rebuilt in the UFOs along with the composite glyphs that use them,
+then the features, groups and kerning are rebuilt, and only the files that
+changed are written to the UFOs on disk.
+
+Any other change (font info, masters, instances, added, removed or renamed
+glyphs, changes of layer names, bracket layers...) triggers a full rebuild, as
+done by `glyphsLib.build_masters`.
+"""
+
+from collections import namedtuple
+import copy
+import logging
+import os
+import time
+
+import glyphsLib
+from glyphsLib import classes
+from glyphsLib.parser import Parser, skim
+from glyphsLib.tracing import span
+from glyphsLib.util import BRACKET_LAYER_RE, select_glyph_names
+
+__all__ = ["IncrementalBuild", "Update", "watch"]
+
+logger = logging.getLogger(__name__)
+
+# The top-level sections of a .glyphs file whose changes can be applied
+# without rebuilding everything (besides the glyphs).
+INCREMENTAL_SECTIONS = frozenset(["classes", "featurePrefixes", "features", "kerning"])
+
+Update = namedtuple("Update", ["full", "glyphs", "sections"])
+Update.__doc__ = """The result of `IncrementalBuild.update`.
+
+full -- True if the masters were completely rebuilt.
+glyphs -- The names of the glyphs that were rebuilt, when full is False.
+sections -- The names of the top-level sections of the file that changed.
+"""
+
+
+class IncrementalBuild:
+    """Build the masters and designspace of a .glyphs file like
+    `glyphsLib.build_masters`, and update them when the file changes.
+
+    The arguments are the same as the arguments of `build_masters`.
+    """
+
+    def __init__(
+        self,
+        filename,
+        master_dir,
+        designspace_instance_dir=None,
+        designspace_path=None,
+        family_name=None,
+        propagate_anchors=True,
+        minimize_glyphs_diffs=False,
+        normalize_ufos=False,
+        create_background_layers=False,
+        generate_GDEF=True,
+        store_editor_state=True,
+        write_skipexportglyphs=False,
+        ufo_module=None,
+        glyph_names=None,
+        include_components=True,
+        master_names=None,
+        check_compatibility=False,
+    ):
+        self.filename = filename
+        self.master_dir = master_dir
+        if designspace_instance_dir is None:
+            self.instance_dir = None
+        else:
+            self.instance_dir = os.path.relpath(designspace_instance_dir, master_dir)
+        self.designspace_path = designspace_path
+        self.family_name = family_name
+        self.propagate_anchors = propagate_anchors
+        self.minimize_glyphs_diffs = minimize_glyphs_diffs
+        self.normalize_ufos = normalize_ufos
+        self.create_background_layers = create_background_layers
+        self.generate_GDEF = generate_GDEF
+        self.store_editor_state = store_editor_state
+        self.write_skipexportglyphs = write_skipexportglyphs
+        self.ufo_module = ufo_module
+        self.glyph_names = glyph_names
+        self.include_components = include_components
+        self.master_names = master_names
+        self.check_compatibility = check_compatibility
+
+        # The GSFont and the result of build_masters, kept up to date.
+        self.font = None
+        self.masters = None
+        self._builder = None
+        self._text = None
+        self._skim = None
+
+    def build(self):
+        """Parse the whole file and write all the masters and the designspace.
+        Return the same named tuple as `build_masters`.
+        """
+        self._full_build(self._read())
+        return self.masters
+
+    def update(self):
+        """Bring the masters up to date with the file.
+
+        Return None if the file did not change since the last build or update,
+        otherwise an `Update` tuple describing what was rebuilt.
+        """
+        text = self._read()
+        if self._builder is None:
+            self._full_build(text)
+            return Update(True, [], [])
+        if text == self._text:
+            return None
+        try:
+            return self._update(text)
+        except BaseException:
+            # The font and UFOs may be half updated, start from scratch the
+            # next time.
+            self._builder = None
+            raise
+
+    def _read(self):
+        with open(self.filename, "r", encoding="utf-8") as fp:
+            return fp.read()
+
+    def _full_build(self, text, sections=()):
+        from glyphsLib.builder.builders import UFOBuilder
+
+        if not os.path.isdir(self.master_dir):
+            os.mkdir(self.master_dir)
+
+        self._builder = None
+        font = glyphsLib.loads(text)
+        font.filepath = self.filename
+        if self.check_compatibility:
+            glyphsLib._check_compatibility(
+                font, self.glyph_names, self.include_components, self.master_names
+            )
+        builder = UFOBuilder(
+            font,
+            ufo_module=self.ufo_module,
+            family_name=self.family_name,
+            instance_dir=self.instance_dir,
+            propagate_anchors=self.propagate_anchors,
+            use_designspace=True,
+            minimize_glyphs_diffs=self.minimize_glyphs_diffs,
+            generate_GDEF=self.generate_GDEF,
+            store_editor_state=self.store_editor_state,
+            write_skipexportglyphs=self.write_skipexportglyphs,
+            glyph_names=self.glyph_names,
+            include_components=self.include_components,
+            master_names=self.master_names,
+        )
+        self.masters = glyphsLib._write_masters(
+            builder.designspace,
+            self.master_dir,
+            self.designspace_path,
+            create_background_layers=self.create_background_layers,
+            normalize_ufos=self.normalize_ufos,
+        )
+        self.font = font
+        self._text = text
+        self._skim = skim(text)
+        self._builder = builder
+        return Update(True, [], sorted(sections))
+
+    def _update(self, text):
+        with span("skim"):
+            new_skim = skim(text)
+        old_text, old_skim = self._text, self._skim
+
+        sections = {
+            key
+            for key in set(old_skim.sections).union(new_skim.sections)
+            if key != "glyphs"
+            and _section_text(old_text, old_skim, key)
+            != _section_text(text, new_skim, key)
+        }
+        if sections - INCREMENTAL_SECTIONS or len(old_skim.glyphs) != len(
+            new_skim.glyphs
+        ):
+            return self._full_build(text, sections)
+
+        font = self.font
+        new_glyphs = {}
+        for index, (old_span, new_span) in enumerate(
+            zip(old_skim.glyphs, new_skim.glyphs)
+        ):
+            source = text[new_span[0] : new_span[1]]
+            if old_text[old_span[0] : old_span[1]] == source:
+                continue
+            glyph = Parser(current_type=classes.GSGlyph).parse(source)
+            # Set up the master layers the way the font does when loading.
+            font._setupGlyph(glyph)
+            old_glyph = font.glyphs[index]
+            if (
+                glyph.name != old_glyph.name
+                or glyph.export != old_glyph.export
+                or _layer_signature(glyph) != _layer_signature(old_glyph)
+                or _has_bracket_layers(glyph)
+                or _has_bracket_layers(old_glyph)
+            ):
+                return self._full_build(text, sections)
+            new_glyphs[index] = glyph
+
+        for index, glyph in new_glyphs.items():
+            font.glyphs[index] = glyph
+        if self.check_compatibility and new_glyphs:
+            # Only the glyphs that changed need to be checked again.
+            glyphsLib._check_compatibility(
+                font,
+                [glyph.name for glyph in new_glyphs.values()],
+                False,
+                self.master_names,
+            )
+        if sections:
+            header = classes.GSFont()
+            if "glyphs" in new_skim.sections:
+                start, end = new_skim.sections["glyphs"]
+                Parser().parse_into_object(header, text[:start] + "()" + text[end:])
+            else:
+                Parser().parse_into_object(header, text)
+            for key in sections:
+                setattr(font, key, getattr(header, key))
+
+        # The glyphs whose components refer to the changed glyphs must be
+        # rebuilt too: their anchors are propagated from their components, and
+        # smart components are decomposed.
+        names = font.componentGraph.user_closure(
+            glyph.name for glyph in new_glyphs.values()
+        )
+        selection = self._builder._glyph_names
+        if selection is not None:
+            if selection != select_glyph_names(
+                font, self.glyph_names, self.include_components
+            ):
+                # The components of the selected glyphs changed.
+                return self._full_build(text, sections)
+            names &= selection
+        glyphs = [glyph for glyph in font.glyphs if glyph.name in names]
+        # Bracket layers become alternate glyphs and designspace rules, which
+        # are only built for the whole font.
+        if self._builder.bracket_layers:
+            return self._full_build(text, sections)
+        if self._builder._is_vertical() != self._builder.is_vertical:
+            return self._full_build(text, sections)
+
+        if not self._rebuild(glyphs, names):
+            return self._full_build(text, sections)
+
+        self._text = text
+        self._skim = new_skim
+        return Update(False, [glyph.name for glyph in glyphs], sorted(sections))
+
+    def _rebuild(self, glyphs, names):
+        """Rebuild the given glyphs, the features, groups and kerning in the
+        UFOs and write them. Return False if a full rebuild is needed instead.
+        """
+        from glyphsLib.builder.constants import PUBLIC_PREFIX
+        from glyphsLib.builder.user_data import GLYPH_USER_DATA_KEY
+
+        builder = self._builder
+        builder._glyph_sets.clear()
+        ufos = [source.font for source in builder._sources.values()]
+
+        before = []
+        for ufo in ufos:
+            previous = _UFOState(ufo, names)
+            before.append(previous)
+            for layer in ufo.layers:
+                for name in names:
+                    if name in layer:
+                        del layer[name]
+            ps_names = ufo.lib.get(PUBLIC_PREFIX + "postscriptNames", {})
+            for name in names:
+                ps_names.pop(name, None)
+                ufo.lib.pop(GLYPH_USER_DATA_KEY + "." + name, None)
+
+        with span("glyphs"):
+            builder.to_ufo_glyph_layers(glyphs)
+        for ufo in ufos:
+            if self.propagate_anchors:
+                with span("propagate_anchors", master=ufo.info.styleName):
+                    builder.to_ufo_propagate_font_anchors(ufo, names)
+            if self.create_background_layers:
+                from glyphsLib.util import ufo_create_background_layer_for_all_glyphs
+
+                ufo_create_background_layer_for_all_glyphs(ufo)
+            ufo.groups.clear()
+            ufo.kerning.clear()
+        with span("features"):
+            builder.to_ufo_features()
+        with span("groups"):
+            builder.to_ufo_groups()
+        with span("kerning"):
+            builder.to_ufo_kerning()
+
+        if any(
+            [layer.name for layer in ufo.layers] != previous.layer_names
+            for ufo, previous in zip(ufos, before)
+        ):
+            # New UFO layers, or layer names made unique differently.
+            return False
+
+        for source, ufo, previous in zip(builder._sources.values(), ufos, before):
+            path = os.path.join(self.master_dir, source.filename)
+            with span("save_ufo", path=path):
+                previous.write_changes(ufo, path, names)
+            if self.normalize_ufos:
+                import ufonormalizer
+
+                with span("normalize_ufo", path=path):
+                    ufonormalizer.normalizeUFO(path, writeModTimes=False)
+        return True
+
+
+class _UFOState:
+    """The parts of a UFO that an incremental update may change, to write only
+    what changed.
+    """
+
+    def __init__(self, ufo, names):
+        self.layer_names = [layer.name for layer in ufo.layers]
+        self.glyphs = {
+            layer.name: {name for name in names if name in layer}
+            for layer in ufo.layers
+        }
+        self.lib = copy.deepcopy(dict(ufo.lib))
+        self.groups = copy.deepcopy(dict(ufo.groups))
+        self.kerning = dict(ufo.kerning)
+        self.features = ufo.features.text
+
+    def write_changes(self, ufo, path, names):
+        from fontTools.ufoLib import UFOWriter
+
+        writer = UFOWriter(path)
+        default_layer = ufo.layers.defaultLayer
+        for layer in ufo.layers:
+            glyph_set = writer.getGlyphSet(
+                layer.name, defaultLayer=layer is default_layer
+            )
+            for name in sorted(names):
+                if name in layer:
+                    glyph = layer[name]
+                    glyph_set.writeGlyph(name, glyph, drawPointsFunc=glyph.drawPoints)
+                elif name in self.glyphs[layer.name]:
+                    glyph_set.deleteGlyph(name)
+            glyph_set.writeContents()
+        if dict(ufo.lib) != self.lib:
+            writer.writeLib(dict(ufo.lib))
+        if dict(ufo.groups) != self.groups:
+            writer.writeGroups(dict(ufo.groups))
+        if dict(ufo.kerning) != self.kerning:
+            writer.writeKerning(dict(ufo.kerning))
+        if ufo.features.text != self.features:
+            writer.writeFeatures(ufo.features.text)
+        writer.close()
+
+
+def _section_text(text, skim_, key):
+    if key not in skim_.sections:
+        return None
+    start, end = skim_.sections[key]
+    return text[start:end]
+
+
+def _layer_signature(glyph):
+    """Return what determines the UFO layers and designspace sources that a
+    glyph contributes to, besides its master layers.
+    """
+    return [
+        (layer.layerId, layer.associatedMasterId, layer.name)
+        for layer in glyph.layers.values()
+        if layer.layerId != layer.associatedMasterId
+    ]
+
+
+def _has_bracket_layers(glyph):
+    return any(
+        layer.name and BRACKET_LAYER_RE.match(layer.name)
+        for layer in glyph.layers.values()
+    )
+
+
+def watch(filename, master_dir, interval=0.5, callback=None, **kwargs):
+    """Build the masters of a .glyphs file, then update them whenever the file
+    changes, until interrupted.
+
+    Keyword arguments:
+    filename -- the .glyphs file
+    master_dir -- the directory where the masters are written
+    interval -- how often to check the file for changes, in seconds
+    callback -- if given, called with the `Update` tuple returned by
+        `IncrementalBuild.update` each time the masters were updated
+    kwargs -- the other arguments of `IncrementalBuild`
+    """
+    build = IncrementalBuild(filename, master_dir, **kwargs)
+    build.build()
+    logger.info("Watching %s", filename)
+    stamp = _stamp(filename)
+    while True:
+        time.sleep(interval)
+        new_stamp = _stamp(filename)
+        if new_stamp is None or new_stamp == stamp:
+            continue
+        stamp = new_stamp
+        start = time.perf_counter()
+        try:
+            update = build.update()
+        except Exception:
+            # Keep watching, the file may be fixed by the next save.
+            logger.exception("Failed to update the masters of %s", filename)
+            continue
+        if update is None:
+            continue
+        logger.info(
+            "Updated %s in %.2fs (%s)",
+            filename,
+            time.perf_counter() - start,
+            "full rebuild" if update.full else "{} glyph(s)".format(len(update.glyphs)),
+        )
+        if callback is not None:
+            callback(update)
+
+
+def _stamp(filename):
+    try:
+        stat = os.stat(filename)
+    except OSError:  # being replaced
+        return None
+    return stat.st_mtime_ns, stat.st_size
@@ -31,6 +31,10 @@ from io import StringIO
 
 logger = logging.getLogger(__name__)
 
+# The raw values of lazily parsed keys that are parsed to be written, as empty
+# values are not written.
+_EMPTY_RAW_VALUES = frozenset(['""', "()", "{}"])
+
 
 class Writer:
     def __init__(self, fp):
@@ -62,7 +66,16 @@ class Writer:
             keys = dictValue.keys()
             if not isinstance(dictValue, OrderedDict):
                 keys = sorted(keys)
+        lazy_keys = getattr(dictValue, "_lazyKeys", None)
         for key in keys:
+            if lazy_keys and key in lazy_keys:
+                # The values that were not parsed are written as they were.
+                raw = glyphsLib.classes._raw_value(dictValue, lazy_keys[key])
+                if raw is not None and raw.text not in _EMPTY_RAW_VALUES:
+                    self.writeKey(key)
+                    self.file.write(raw.text)
+                    self.file.write(";\n")
+                    continue
             if hasattr(dictValue, "_classesForName"):
                 forType = dictValue._classesForName[key]
             try:
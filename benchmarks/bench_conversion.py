@@ -0,0 +1,256 @@
+# Copyright 2020 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import os
+
+from fontTools.designspaceLib import DesignSpaceDocument
+from fontTools.varLib.models import (
+    VariationModel,
+    normalizeLocation,
+    piecewiseLinearMap,
+)
+import pytest
+import ufoLib2
+
+import glyphsLib
+from glyphsLib import glyphspackage
+from glyphsLib.interpolation import interpolate_instances
+from synthetic import make_font
+
+pytest.importorskip("pytest_benchmark")
+
+
+def bench_make_font_is_deterministic(font_params, glyphs_text):
+    assert glyphsLib.dumps(make_font(**font_params)) == glyphs_text
+
+
+def bench_load(benchmark, glyphs_text):
+    font = benchmark(glyphsLib.loads, glyphs_text)
+    assert len(font.glyphs)
+
+
+def bench_load_lazy(benchmark, glyphs_text):
+    font = benchmark(glyphsLib.loads, glyphs_text, lazy=True)
+    assert glyphsLib.dumps(font) == glyphs_text
+
+
+def bench_load_parallel(benchmark, glyphs_text):
+    jobs = os.cpu_count() or 1
+    font = benchmark(glyphsLib.loads, glyphs_text, jobs=jobs)
+    assert len(font.glyphs)
+
+
+def bench_load_cached(benchmark, glyphs_path, tmp_path):
+    cache_dir = str(tmp_path)
+    glyphsLib.GSFont(glyphs_path, cache_dir=cache_dir)
+    font = benchmark(glyphsLib.GSFont, glyphs_path, cache_dir=cache_dir)
+    assert len(font.glyphs)
+
+
+def bench_load_package(benchmark, font, glyphs_text, tmp_path):
+    path = str(tmp_path / "font.glyphspackage")
+    font.save(path)
+    package = benchmark(glyphsLib.GSFont, path)
+    assert glyphsLib.dumps(package) == glyphs_text
+
+
+def bench_save_package_unchanged(benchmark, font, tmp_path):
+    path = str(tmp_path / "font.glyphspackage")
+    font.save(path)
+    assert benchmark(glyphspackage.write, font, path) == []
+
+
+def bench_dumps(benchmark, font, glyphs_text):
+    assert benchmark(glyphsLib.dumps, font) == glyphs_text
+
+
+def bench_clone(benchmark, font, glyphs_text):
+    clone = benchmark(font.clone)
+    assert glyphsLib.dumps(clone) == glyphs_text
+
+
+def bench_deepcopy(benchmark, font, glyphs_text):
+    clone = benchmark(copy.deepcopy, font)
+    assert glyphsLib.dumps(clone) == glyphs_text
+
+
+def bench_font_fingerprint(benchmark, font):
+    from glyphsLib.fingerprint import font_fingerprint
+
+    # Hash fresh copies, which have no cached fingerprints.
+    benchmark.pedantic(font_fingerprint, setup=lambda: ((font.clone(),), {}), rounds=5)
+
+
+def bench_font_fingerprint_cached(benchmark, font):
+    from glyphsLib.fingerprint import font_fingerprint, invalidate
+
+    expected = font_fingerprint(font, cached=True)
+    glyph = font.glyphs[0]
+
+    def changed_glyph():
+        invalidate(glyph)
+        return font_fingerprint(font, cached=True)
+
+    assert benchmark(changed_glyph) == expected
+
+
+def bench_font_bounds(benchmark, font):
+    from glyphsLib.bounds import font_bounds
+
+    # Measure fresh copies, which have no cached bounds.
+    benchmark.pedantic(
+        font_bounds, setup=lambda: ((font.clone(),), {"use_numpy": False}), rounds=5,
+    )
+
+
+def bench_font_bounds_numpy(benchmark, font):
+    from glyphsLib.bounds import font_bounds
+
+    pytest.importorskip("numpy")
+    benchmark.pedantic(
+        font_bounds, setup=lambda: ((font.clone(),), {"use_numpy": True}), rounds=5,
+    )
+
+
+def bench_font_bounds_cached(benchmark, font):
+    from glyphsLib.bounds import font_bounds
+
+    expected = font_bounds(font)
+    path = font.glyphs[0].layers[0].paths[0]
+
+    def changed_path():
+        path.nodes = list(path.nodes)
+        return font_bounds(font)
+
+    assert benchmark(changed_path) == expected
+
+
+def bench_component_user_closure(benchmark, font):
+    font = font.clone()
+    glyph = font.glyphs[0]
+    expected = font.componentGraph.user_closure([glyph.name])
+
+    def changed_glyph():
+        glyph.layers[0].components = list(glyph.layers[0].components)
+        return font.componentGraph.user_closure([glyph.name])
+
+    assert benchmark(changed_glyph) == expected
+
+
+def bench_check_compatibility(benchmark, font):
+    from glyphsLib.compatibility import check_compatibility
+
+    assert benchmark(check_compatibility, font) == []
+
+
+def bench_to_ufos(benchmark, font):
+    benchmark(glyphsLib.to_ufos, font)
+
+
+def bench_to_designspace(benchmark, font):
+    benchmark(glyphsLib.to_designspace, font)
+
+
+def bench_build_masters(benchmark, glyphs_path, tmp_path):
+    benchmark(glyphsLib.build_masters, glyphs_path, str(tmp_path))
+
+
+def bench_build_masters_normalized(benchmark, glyphs_path, tmp_path):
+    benchmark(glyphsLib.build_masters, glyphs_path, str(tmp_path), normalize_ufos=True)
+
+
+def bench_build_masters_pipelined(benchmark, glyphs_path, tmp_path):
+    benchmark(glyphsLib.build_masters, glyphs_path, str(tmp_path), pipeline=True)
+
+
+def bench_to_glyphs(benchmark, designspace_path):
+    # to_glyphs modifies the UFOs of the designspace, so read them every time.
+    def to_glyphs():
+        return glyphsLib.to_glyphs(DesignSpaceDocument.fromfile(designspace_path))
+
+    benchmark(to_glyphs)
+
+
+def bench_to_glyphs_parallel(benchmark, designspace_path):
+    jobs = os.cpu_count() or 1
+
+    def to_glyphs():
+        return glyphsLib.to_glyphs(
+            DesignSpaceDocument.fromfile(designspace_path), jobs=jobs
+        )
+
+    benchmark(to_glyphs)
+
+
+def bench_to_glyphs_streaming(benchmark, designspace_path):
+    def to_glyphs():
+        return glyphsLib.to_glyphs(
+            DesignSpaceDocument.fromfile(designspace_path), streaming=True
+        )
+
+    benchmark(to_glyphs)
+
+
+@pytest.fixture(scope="module")
+def designspace(designspace_path):
+    designspace = DesignSpaceDocument.fromfile(designspace_path)
+    designspace.loadSourceFonts(ufoLib2.Font.open)
+    return designspace
+
+
+def bench_interpolate_instances(benchmark, designspace):
+    ufos = benchmark(interpolate_instances, designspace, apply_glyphs_data=False)
+    assert len(ufos) == len(designspace.instances)
+
+
+def bench_interpolate_instances_per_glyph(benchmark, designspace):
+    # The baseline of bench_interpolate_instances: the points of each glyph
+    # interpolated one by one between the masters, without the brace layers,
+    # bracket rules, kerning and fontinfo.
+    axes = {
+        axis.name: tuple(
+            piecewiseLinearMap(value, dict(axis.map))
+            for value in (axis.minimum, axis.default, axis.maximum)
+        )
+        for axis in designspace.axes
+    }
+    masters = [s for s in designspace.sources if s.layerName is None]
+    model = VariationModel([normalizeLocation(s.location, axes) for s in masters])
+    locations = [normalizeLocation(i.location, axes) for i in designspace.instances]
+
+    def interpolate():
+        result = []
+        for location in locations:
+            glyphs = {}
+            for name in masters[0].font.keys():
+                sources = [master.font[name] for master in masters]
+                glyphs[name] = [
+                    [
+                        (
+                            model.interpolateFromMasters(
+                                location, [s[i][j].x for s in sources]
+                            ),
+                            model.interpolateFromMasters(
+                                location, [s[i][j].y for s in sources]
+                            ),
+                        )
+                        for j in range(len(contour))
+                    ]
+                    for i, contour in enumerate(sources[0])
+                ]
+            result.append(glyphs)
+        return result
+
+    assert len(benchmark(interpolate)) == len(designspace.instances)
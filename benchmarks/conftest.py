@@ -0,0 +1,62 @@
+# Copyright 2020 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+import glyphsLib
+from synthetic import SIZES, make_font
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--synthetic-size",
+        choices=sorted(SIZES),
+        default="small",
+        help="Size of the synthetic font used by the benchmarks (default: small)",
+    )
+
+
+@pytest.fixture(scope="session")
+def font_params(request):
+    params = dict(SIZES[request.config.getoption("--synthetic-size")])
+    params.update(component_depth=2, bracket_layers=5, brace_layers=5, instances=5)
+    return params
+
+
+@pytest.fixture(scope="session")
+def glyphs_text(font_params):
+    return glyphsLib.dumps(make_font(**font_params))
+
+
+@pytest.fixture(scope="session")
+def glyphs_path(glyphs_text, tmp_path_factory):
+    path = tmp_path_factory.mktemp("synthetic") / "Synthetic.glyphs"
+    path.write_text(glyphs_text, encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def font(glyphs_text):
+    return glyphsLib.loads(glyphs_text)
+
+
+@pytest.fixture(scope="session")
+def designspace_path(glyphs_path, tmp_path_factory):
+    # Skip the GDEF table, which would refer to the bracket glyphs that are
+    # turned back into layers by to_glyphs.
+    master_dir = tmp_path_factory.mktemp("master_ufo")
+    masters = glyphsLib.build_masters(
+        glyphs_path, str(master_dir), generate_GDEF=False, minimize_glyphs_diffs=True
+    )
+    return masters.designspace_path
@@ -0,0 +1,268 @@
+# Copyright 2020 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Deterministic generator of synthetic Glyphs sources for benchmarking.
+
+The generated fonts are fully compatible across masters, so that they can go
+through the whole glyphs2ufo pipeline (including bracket and brace layers,
+anchor propagation and designspace generation), and they only depend on the
+parameters: calling `make_font` twice with the same arguments gives fonts that
+serialize to the same .glyphs text.
+
+    python benchmarks/synthetic.py --glyphs 20000 --masters 3 Big.glyphs
+"""
+
+import argparse
+import datetime
+import math
+import random
+
+from glyphsLib.classes import (
+    GSAnchor,
+    GSComponent,
+    GSFont,
+    GSFontMaster,
+    GSGlyph,
+    GSInstance,
+    GSLayer,
+    GSNode,
+    GSPath,
+    CURVE,
+    OFFCURVE,
+)
+from glyphsLib.types import Point
+
+# Predefined sizes used by the benchmark suite (see conftest.py).
+SIZES = {
+    "small": dict(glyphs=100, masters=2, nodes=24, kerning_pairs=200),
+    "medium": dict(glyphs=1000, masters=3, nodes=40, kerning_pairs=2000),
+    "large": dict(glyphs=10000, masters=3, nodes=60, kerning_pairs=10000),
+}
+
+FIRST_CODEPOINT = 0x4E00
+NODES_PER_CONTOUR = 12
+MIN_WEIGHT, MAX_WEIGHT = 100, 900
+WEIGHT_CLASSES = (
+    "Thin",
+    "ExtraLight",
+    "Light",
+    "Regular",
+    "Medium",
+    "SemiBold",
+    "Bold",
+    "ExtraBold",
+    "Black",
+)
+
+
+def make_font(
+    glyphs=100,
+    masters=2,
+    nodes=24,
+    component_depth=1,
+    kerning_pairs=100,
+    bracket_layers=0,
+    brace_layers=0,
+    instances=2,
+    seed=0,
+):
+    """Return a synthetic GSFont.
+
+    Keyword arguments:
+    glyphs -- total number of glyphs
+    masters -- number of masters, spread along the weight axis
+    nodes -- number of nodes in each layer of the outline glyphs
+    component_depth -- nesting depth of composite glyphs; with a depth of 0,
+        all glyphs are outlines, otherwise a quarter of the glyphs are
+        composites referring to glyphs of the previous nesting level
+    kerning_pairs -- number of kerning pairs per master
+    bracket_layers -- number of glyphs with an alternate ("[500]") layer in
+        each master
+    brace_layers -- number of glyphs with an intermediate ("{...}") layer
+    instances -- number of instances, spread along the weight axis
+    seed -- seed of the pseudo-random generator
+    """
+    rng = random.Random(seed)
+
+    font = GSFont()
+    font.familyName = "Synthetic"
+    font.appVersion = "1342"
+    font.date = datetime.datetime(2020, 1, 1)
+    font.upm = 1000
+    font.versionMajor = 1
+    font.versionMinor = 0
+
+    for index in range(masters):
+        master = GSFontMaster()
+        master.id = "MASTER-%02d" % index
+        master.weightValue = _weight(index, masters)
+        master.weight = "Master %d" % index
+        master.name = master.weight
+        font.masters.append(master)
+
+    n_composites = glyphs // 4 if component_depth > 0 else 0
+    levels = [list(range(glyphs - n_composites))]
+    if n_composites:
+        per_level = max(1, n_composites // component_depth)
+        start = len(levels[0])
+        while start < glyphs:
+            end = glyphs if len(levels) == component_depth else start + per_level
+            levels.append(list(range(start, min(end, glyphs))))
+            start = end
+    names = ["uni%04X" % (FIRST_CODEPOINT + index) for index in range(glyphs)]
+    shapes = {}
+
+    for level, indices in enumerate(levels):
+        for index in indices:
+            glyph = GSGlyph(names[index])
+            glyph.unicode = "%04X" % (FIRST_CODEPOINT + index)
+            # Like the files of Glyphs.app, which records when each glyph was
+            # last changed.
+            glyph.lastChange = font.date + datetime.timedelta(minutes=index)
+            glyph.userData["com.example.index"] = index
+            if level == 0:
+                shape = _outline_shape(rng, nodes)
+            else:
+                previous = levels[level - 1]
+                shape = _composite_shape(
+                    rng, [names[rng.choice(previous)] for _ in range(2)]
+                )
+            shapes[index] = shape
+            layers = []
+            for master_index, master in enumerate(font.masters):
+                layers.append(_layer(shape, master.id, master.id, master_index))
+            glyph.layers = layers
+            font.glyphs.append(glyph)
+
+    outlines = levels[0]
+    if masters > 1:
+        for index in outlines[:brace_layers]:
+            glyph = font.glyphs[index]
+            location = (font.masters[0].weightValue + font.masters[1].weightValue) / 2
+            layer = _layer(
+                shapes[index], "BRACE-" + glyph.name, font.masters[0].id, 0.5
+            )
+            layer.name = "{%g}" % location
+            glyph.layers.append(layer)
+    for index in outlines[brace_layers : brace_layers + bracket_layers]:
+        glyph = font.glyphs[index]
+        for master_index, master in enumerate(font.masters):
+            layer_id = "BRACKET-%s-%02d" % (glyph.name, master_index)
+            layer = _layer(shapes[index], layer_id, master.id, master_index + 0.25)
+            layer.name = "Alternate [%d]" % ((MIN_WEIGHT + MAX_WEIGHT) // 2)
+            glyph.layers.append(layer)
+
+    pairs = set()
+    kerning_pairs = min(kerning_pairs, glyphs * glyphs)
+    while len(pairs) < kerning_pairs:
+        pairs.add((rng.choice(names), rng.choice(names)))
+    pairs = sorted(pairs)
+    values = [rng.randrange(-100, 50) for _ in pairs]
+    for master_index, master in enumerate(font.masters):
+        for (left, right), value in zip(pairs, values):
+            font.setKerningForPair(master.id, left, right, value * (master_index + 1))
+
+    for index in range(instances):
+        instance = GSInstance()
+        instance.name = "Instance %d" % index
+        instance.weightValue = _weight(index, instances)
+        # Spread the instances over the weight classes too, so that the axis
+        # mapping derived from them is well formed.
+        instance.weight = WEIGHT_CLASSES[round(instance.weightValue / 100) - 1]
+        font.instances.append(instance)
+
+    return font
+
+
+def _weight(index, count):
+    if count < 2:
+        return (MIN_WEIGHT + MAX_WEIGHT) // 2
+    return MIN_WEIGHT + (MAX_WEIGHT - MIN_WEIGHT) * index // (count - 1)
+
+
+def _outline_shape(rng, nodes):
+    """Return the master-independent description of an outline glyph: a list of
+    (center x, center y, radius, number of nodes) contours and a list of
+    anchors.
+    """
+    contours = []
+    remaining = max(3, nodes - nodes % 3)
+    while remaining > 0:
+        count = min(NODES_PER_CONTOUR, remaining)
+        remaining -= count
+        center_x, center_y = rng.randrange(150, 850), rng.randrange(100, 600)
+        contours.append((center_x, center_y, rng.randrange(50, 150), count))
+    anchors = [("top", rng.randrange(200, 800), 700), ("bottom", 500, 0)]
+    return {"contours": contours, "anchors": anchors, "components": []}
+
+
+def _composite_shape(rng, base_names):
+    components = [
+        (name, rng.randrange(-100, 100), rng.randrange(-100, 100))
+        for name in base_names
+    ]
+    return {"contours": [], "anchors": [], "components": components}
+
+
+def _layer(shape, layer_id, master_id, variation):
+    """Make a layer for the given shape. The coordinates depend linearly on
+    `variation`, which keeps all layers of a glyph compatible.
+    """
+    layer = GSLayer()
+    layer.layerId = layer_id
+    layer.associatedMasterId = master_id
+    layer.width = 1000 + round(20 * variation)
+    stroke = 10 * variation
+    for cx, cy, radius, count in shape["contours"]:
+        path = GSPath()
+        path.closed = True
+        nodes = []
+        for i in range(count):
+            angle = 2 * math.pi * i / count
+            r = radius + stroke
+            x = round(cx + r * math.cos(angle))
+            y = round(cy + r * math.sin(angle))
+            node_type = CURVE if i % 3 == 2 else OFFCURVE
+            nodes.append(GSNode((x, y), node_type, smooth=node_type == CURVE))
+        path.nodes = nodes
+        layer.paths.append(path)
+    for name, x, y in shape["components"]:
+        layer.components.append(GSComponent(name, offset=(x + stroke, y)))
+    for name, x, y in shape["anchors"]:
+        layer.anchors.append(GSAnchor(name, Point(x + round(stroke), y)))
+    return layer
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("output", help="Path of the .glyphs file to write.")
+    parser.add_argument("--size", choices=sorted(SIZES), default=None)
+    parser.add_argument("--glyphs", type=int)
+    parser.add_argument("--masters", type=int)
+    parser.add_argument("--nodes", type=int)
+    parser.add_argument("--component-depth", type=int)
+    parser.add_argument("--kerning-pairs", type=int)
+    parser.add_argument("--bracket-layers", type=int)
+    parser.add_argument("--brace-layers", type=int)
+    parser.add_argument("--instances", type=int)
+    parser.add_argument("--seed", type=int)
+    options = vars(parser.parse_args(args))
+    output = options.pop("output")
+    params = dict(SIZES.get(options.pop("size"), {}))
+    params.update((k, v) for k, v in options.items() if v is not None)
+    make_font(**params).save(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#
+# Copyright 2020 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import pytest
+
+import glyphsLib
+from glyphsLib.bounds import font_bounds, layer_bounds
+
+
+def _font(datadir, filename="GlyphsUnitTestSans.glyphs"):
+    return glyphsLib.GSFont(str(datadir.join(filename)))
+
+
+def _boxes(bounds):
+    return {
+        (glyph_name, layer_id): tuple(rect) if rect is not None else None
+        for glyph_name, layers in bounds.items()
+        for layer_id, rect in layers.items()
+    }
+
+
+def test_font_bounds(datadir):
+    font = _font(datadir)
+
+    bounds = font_bounds(font, use_numpy=False)
+
+    assert list(bounds) == [glyph.name for glyph in font.glyphs]
+    for glyph in font.glyphs:
+        for layer in glyph.layers:
+            assert bounds[glyph.name][layer.layerId] == layer.bounds
+    assert layer_bounds([glyphsLib.GSLayer()], use_numpy=False) == [None]
+
+
+@pytest.mark.parametrize(
+    "filename", ["GlyphsUnitTestSans.glyphs", "IntegerFloat.glyphs"]
+)
+def test_numpy(datadir, filename):
+    pytest.importorskip("numpy")
+    expected = _boxes(font_bounds(_font(datadir, filename), use_numpy=False))
+
+    font = _font(datadir, filename)
+
+    assert _boxes(font_bounds(font, use_numpy=True)) == expected
+    # The bounds of the paths are cached.
+    layer = font.glyphs["a"].layers[0]
+    assert "_bounds" in layer.paths[0].__dict__
+    assert layer_bounds([layer]) == [layer.bounds]
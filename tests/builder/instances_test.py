@@ -79,6 +79,42 @@ def test_apply_instance_data(tmpdir, instance_names, ufo_module):
         assert ufo.info.openTypeOS2WidthClass is None  # GlyphsUnitTestSans is wght only
 
 
+def test_apply_instance_data_jobs(tmpdir, ufo_module):
+    font = glyphsLib.GSFont(os.path.join(DATA, "GlyphsUnitTestSans.glyphs"))
+    designspace = glyphsLib.to_designspace(font, instance_dir="instances")
+    path = str(tmpdir / (font.familyName + ".designspace"))
+    write_designspace_and_UFOs(designspace, path)
+    tmpdir.mkdir("instances")
+    for instance in designspace.instances:
+        ufo_module.Font().save(str(tmpdir / instance.filename))
+    # Skip one instance, in the middle
+    include_filenames = [instance.filename for instance in designspace.instances]
+    del include_filenames[1]
+
+    ufos = apply_instance_data(
+        designspace.path, include_filenames=include_filenames, jobs=4
+    )
+
+    assert [os.path.normcase(ufo.path) for ufo in ufos] == [
+        os.path.normcase(os.path.normpath(str(tmpdir / filename)))
+        for filename in include_filenames
+    ]
+    expected = apply_instance_data(
+        designspace.path, include_filenames=include_filenames
+    )
+    assert [ufo.info.openTypeOS2WeightClass for ufo in ufos] == [
+        ufo.info.openTypeOS2WeightClass for ufo in expected
+    ]
+
+    # Numbers of jobs below 1 process the instances one after the other.
+    ufos = apply_instance_data(
+        designspace.path, include_filenames=include_filenames, jobs=0
+    )
+    assert [ufo.info.openTypeOS2WeightClass for ufo in ufos] == [
+        ufo.info.openTypeOS2WeightClass for ufo in expected
+    ]
+
+
 def test_reexport_apply_instance_data():
     # this is for compatibility with fontmake
     # https://github.com/googlefonts/fontmake/issues/451
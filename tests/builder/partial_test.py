@@ -0,0 +1,131 @@
+#
+# Copyright 2020 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import os
+
+import pytest
+import ufoLib2
+
+import glyphsLib
+import glyphsLib.cli
+from glyphsLib import to_designspace, to_ufos
+
+
+@pytest.fixture
+def font(datadir):
+    return glyphsLib.GSFont(str(datadir.join("GlyphsUnitTestSans.glyphs")))
+
+
+def _glyph_data(glyph):
+    return (
+        [[(p.x, p.y, p.segmentType) for p in contour] for contour in glyph],
+        [(c.baseGlyph, tuple(c.transformation)) for c in glyph.components],
+        [(a.name, a.x, a.y) for a in glyph.anchors],
+        glyph.width,
+        glyph.unicodes,
+    )
+
+
+def test_glyph_names_with_components(font, ufo_module):
+    full = to_ufos(font, ufo_module=ufo_module)
+    ufos = to_ufos(font, ufo_module=ufo_module, glyph_names=["Adieresis", "h"])
+
+    assert len(ufos) == 3
+    for ufo, full_ufo in zip(ufos, full):
+        expected = ["A", "Adieresis", "h", "dieresis", "_part.shoulder", "_part.stem"]
+        assert ufo.glyphOrder == expected
+        assert sorted(ufo.keys()) == sorted(expected)
+        for name in expected:
+            # Including the anchors propagated from the components.
+            assert _glyph_data(ufo[name]) == _glyph_data(full_ufo[name])
+
+
+def test_glyph_names_without_components(font, ufo_module):
+    font.setKerningForPair(font.masters[0].id, "@MMK_L_a", "@MMK_R_n", -10)
+    font.setKerningForPair(font.masters[0].id, "a.sc", "dieresis", -20)
+    (full,) = to_ufos(font, ufo_module=ufo_module, master_names=["Light"])
+    (ufo,) = to_ufos(
+        font,
+        ufo_module=ufo_module,
+        glyph_names=["a*", "n"],
+        include_components=False,
+        master_names=["Light"],
+    )
+
+    assert ufo.glyphOrder == ["a", "adieresis", "n", "a.sc"]
+    assert ufo["adieresis"].components[0].baseGlyph == "a"
+    # Kerning and kerning groups are limited to the converted glyphs
+    assert dict(ufo.groups) == {
+        "public.kern1.a": ["a"],
+        "public.kern2.a": ["a"],
+        "public.kern1.A.sc": ["a.sc"],
+        "public.kern2.A.sc": ["a.sc"],
+        "public.kern1.n": ["n"],
+        "public.kern2.n": ["n"],
+    }
+    assert ufo.kerning[("public.kern1.a", "public.kern2.n")] == -10
+    assert dict(ufo.kerning) == {
+        pair: value
+        for pair, value in full.kerning.items()
+        if all(name in ufo.groups or name in ufo for name in pair)
+    }
+
+
+def test_master_names(font, ufo_module):
+    designspace = to_designspace(
+        font, ufo_module=ufo_module, master_names=["Bold", font.masters[0].id]
+    )
+
+    assert [source.styleName for source in designspace.sources] == ["Light", "Bold"]
+    assert designspace.sources[0].copyInfo
+    full = to_designspace(font, ufo_module=ufo_module)
+    assert [axis.serialize() for axis in designspace.axes] == [
+        axis.serialize() for axis in full.axes
+    ]
+    assert dict(designspace.sources[0].font.kerning) == dict(
+        full.sources[0].font.kerning
+    )
+
+
+def test_unknown_names(font):
+    with pytest.raises(ValueError, match="no glyph matching 'b\\*'"):
+        to_ufos(font, glyph_names=["A", "b*"])
+    with pytest.raises(ValueError, match="no master named 'Black'"):
+        to_ufos(font, master_names=["Black"])
+
+
+def test_cli(datadir, tmpdir):
+    master_dir = str(tmpdir.join("masters"))
+    glyphsLib.cli.main(
+        [
+            "glyphs2ufo",
+            str(datadir.join("GlyphsUnitTestSans.glyphs")),
+            "-m",
+            master_dir,
+            "--glyphs",
+            "n",
+            "--no-include-components",
+            "--masters",
+            "Regular",
+        ]
+    )
+
+    assert sorted(os.listdir(master_dir)) == [
+        "GlyphsUnitTestSans-Regular.ufo",
+        "GlyphsUnitTestSans.designspace",
+    ]
+    ufo = ufoLib2.Font.open(os.path.join(master_dir, "GlyphsUnitTestSans-Regular.ufo"))
+    assert list(ufo.keys()) == ["n"]
@@ -17,10 +17,13 @@
 import pytest
 import datetime
 import os
+import re
 
+import glyphsLib
 from glyphsLib.builder.constants import GLYPHS_COLORS, GLYPHLIB_PREFIX
 from glyphsLib import to_glyphs, to_ufos, to_designspace
 from glyphsLib import classes
+from glyphsLib.util import open_ufo
 
 from fontTools.designspaceLib import DesignSpaceDocument, AxisDescriptor
 
@@ -531,6 +534,27 @@ def test_background_before_foreground(ufo_module):
     to_glyphs([ufo])
 
 
+def test_names_are_shared_by_the_masters(ufo_module):
+    ufos = []
+    for weight in ("Regular", "Bold"):
+        ufo = ufo_module.Font()
+        ufo.info.styleName = weight
+        # Make equal strings that are different objects.
+        glyph = ufo.newGlyph("".join(["a", "cute"]))
+        glyph.appendAnchor(dict(x=100, y=600, name="".join(["to", "p"])))
+        pen = ufo.newGlyph("b").getPen()
+        pen.addComponent("".join(["ac", "ute"]), (1, 0, 0, 1, 0, 0))
+        ufos.append(ufo)
+
+    font = to_glyphs(ufos)
+
+    name = font.glyphs["acute"].name
+    regular, bold = font.glyphs["acute"].layers
+    assert regular.anchors[0].name is bold.anchors[0].name
+    for layer in font.glyphs["b"].layers:
+        assert layer.components[0].name is name
+
+
 def test_only_background(ufo_module):
     ufo = ufo_module.Font()
     background = ufo.newLayer("public.background")
@@ -644,3 +668,136 @@ def test_weird_kerning_roundtrip(ufo_module):
         assert set(glyphs) == set(ufo.groups[name])
 
     assert ufo.kerning == kerning
+
+
+@pytest.mark.parametrize(
+    "filename", ["GlyphsUnitTestSans.glyphs", "BraceTestFont.glyphs"]
+)
+def test_jobs(datadir, tmpdir, ufo_module, filename):
+    designspace_path = glyphsLib.build_masters(
+        str(datadir.join(filename)),
+        str(tmpdir),
+        minimize_glyphs_diffs=True,
+        ufo_module=ufo_module,
+    ).designspace_path
+    expected = glyphsLib.dumps(
+        to_glyphs(
+            DesignSpaceDocument.fromfile(designspace_path),
+            ufo_module=ufo_module,
+            minimize_ufo_diffs=True,
+        )
+    )
+
+    # The UFOs are loaded by threads, and loaded again by the processes that
+    # build the layers.
+    font = to_glyphs(
+        DesignSpaceDocument.fromfile(designspace_path),
+        ufo_module=ufo_module,
+        minimize_ufo_diffs=True,
+        jobs=2,
+    )
+
+    assert glyphsLib.dumps(font) == expected
+
+
+def test_jobs_in_memory(datadir, ufo_module):
+    font = classes.GSFont(str(datadir.join("GlyphsUnitTestSans.glyphs")))
+    expected = glyphsLib.dumps(
+        to_glyphs(
+            to_designspace(font, ufo_module=ufo_module, minimize_glyphs_diffs=True)
+        )
+    )
+
+    # The UFOs that can be pickled are sent to the processes.
+    designspace = to_designspace(
+        font, ufo_module=ufo_module, minimize_glyphs_diffs=True
+    )
+
+    assert glyphsLib.dumps(to_glyphs(designspace, jobs=2)) == expected
+
+
+def _without_layer_ids(text):
+    # The bracket layers get new random ids.
+    return re.sub(r'layerId = "[^"]*";', "", text)
+
+
+@pytest.mark.parametrize(
+    "filename",
+    ["GlyphsUnitTestSans.glyphs", "BraceTestFont.glyphs", "BracketTestFont.glyphs"],
+)
+def test_streaming(datadir, tmpdir, ufo_module, filename):
+    designspace_path = glyphsLib.build_masters(
+        str(datadir.join(filename)),
+        str(tmpdir),
+        minimize_glyphs_diffs=True,
+        ufo_module=ufo_module,
+    ).designspace_path
+    expected_designspace = DesignSpaceDocument.fromfile(designspace_path)
+    expected = glyphsLib.dumps(
+        to_glyphs(expected_designspace, ufo_module=ufo_module, minimize_ufo_diffs=True)
+    )
+
+    designspace = DesignSpaceDocument.fromfile(designspace_path)
+    font = to_glyphs(
+        designspace, ufo_module=ufo_module, minimize_ufo_diffs=True, streaming=True
+    )
+
+    assert _without_layer_ids(glyphsLib.dumps(font)) == _without_layer_ids(expected)
+    # The glyphs were released from copies of the UFOs, not from the UFOs of
+    # the designspace.
+    for source, expected_source in zip(
+        designspace.sources, expected_designspace.sources
+    ):
+        if not source.layerName:
+            assert sorted(source.font.keys()) == sorted(expected_source.font.keys())
+
+
+def test_streaming_keeps_changes_and_closes_copies(
+    datadir, tmpdir, ufo_module, monkeypatch
+):
+    designspace_path = glyphsLib.build_masters(
+        str(datadir.join("GlyphsUnitTestSans.glyphs")),
+        str(tmpdir),
+        ufo_module=ufo_module,
+    ).designspace_path
+    closed = []
+    monkeypatch.setattr(
+        ufo_module.Font, "close", lambda self: closed.append(self), raising=False
+    )
+
+    # The UFOs loaded by the builder are read from copies, which are closed.
+    designspace = DesignSpaceDocument.fromfile(designspace_path)
+    to_glyphs(designspace, ufo_module=ufo_module, streaming=True)
+    masters = [source for source in designspace.sources if not source.layerName]
+    assert len(closed) == len(masters)
+    assert not any(ufo is source.font for ufo in closed for source in masters)
+
+    # The UFOs given with the designspace are read with their changes.
+    del closed[:]
+    designspace = DesignSpaceDocument.fromfile(designspace_path)
+    for source in designspace.sources:
+        source.font = open_ufo(source.path, ufo_module.Font)
+    designspace.sources[0].font["A"].width = 1234
+    font = to_glyphs(designspace, ufo_module=ufo_module, streaming=True)
+    assert font.glyphs["A"].layers[0].width == 1234
+    assert closed == []
+
+
+def test_streaming_ufos(datadir, tmpdir, ufo_module):
+    font = classes.GSFont(str(datadir.join("GlyphsUnitTestSans.glyphs")))
+    ufos = to_ufos(font, ufo_module=ufo_module, minimize_glyphs_diffs=True)
+    expected = glyphsLib.dumps(to_glyphs(ufos))
+    # The UFOs without a path are read as they are.
+    assert glyphsLib.dumps(to_glyphs(ufos, streaming=True)) == expected
+
+    for i, ufo in enumerate(ufos):
+        ufo.save(str(tmpdir.join("%d.ufo" % i)))
+    ufos = [
+        open_ufo(str(tmpdir.join("%d.ufo" % i)), ufo_module.Font, lazy=True)
+        for i in range(len(ufos))
+    ]
+    assert glyphsLib.dumps(to_glyphs(ufos, streaming=True)) == expected
+    # The UFOs given as paths are loaded by the builder.
+    paths = [str(tmpdir.join("%d.ufo" % i)) for i in range(len(ufos))]
+    font = to_glyphs(paths, ufo_module=ufo_module, streaming=True)
+    assert glyphsLib.dumps(font) == expected
@@ -0,0 +1,162 @@
+#
+# Copyright 2020 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import os
+import time
+
+import pytest
+
+import glyphsLib
+import glyphsLib.cli
+from glyphsLib import cache
+from glyphsLib.classes import GSFont
+from glyphsLib.parser import Parser
+
+
+@pytest.fixture
+def glyphs_path(datadir):
+    return str(datadir.join("GlyphsUnitTestSans.glyphs"))
+
+
+def _forbid_parsing(monkeypatch):
+    def parse_into_object(self, res, text):
+        raise AssertionError("the font should be loaded from the cache")
+
+    monkeypatch.setattr(Parser, "parse_into_object", parse_into_object)
+
+
+def _entries(cache_dir):
+    return sorted(name for name in os.listdir(cache_dir) if not name.endswith(".tmp"))
+
+
+def test_cached_font(glyphs_path, tmpdir, monkeypatch):
+    cache_dir = str(tmpdir.join("cache"))
+    font = GSFont(glyphs_path, cache_dir=cache_dir)
+    assert len(_entries(cache_dir)) == 1
+
+    _forbid_parsing(monkeypatch)
+    cached = GSFont(glyphs_path, cache_dir=cache_dir)
+
+    assert glyphsLib.dumps(cached) == glyphsLib.dumps(font)
+    assert cached.filepath == glyphs_path
+    assert all(glyph.parent is cached for glyph in cached.glyphs)
+    assert all(master.font is cached for master in cached.masters)
+    assert cached.glyphs[0].layers[0].parent is cached.glyphs[0]
+
+
+def test_loads_shares_entries_with_gsfont(glyphs_path, tmpdir, monkeypatch):
+    cache_dir = str(tmpdir)
+    font = GSFont(glyphs_path, cache_dir=cache_dir)
+
+    _forbid_parsing(monkeypatch)
+    with open(glyphs_path, encoding="utf-8") as fp:
+        cached = glyphsLib.loads(fp.read(), cache_dir=cache_dir)
+
+    assert cached.filepath is None
+    assert glyphsLib.dumps(cached) == glyphsLib.dumps(font)
+
+
+def test_load_and_loads(glyphs_path, tmpdir):
+    cache_dir = str(tmpdir)
+    with open(glyphs_path, encoding="utf-8") as fp:
+        font = glyphsLib.load(fp, cache_dir=cache_dir)
+    with open(glyphs_path, "rb") as fp:
+        cached = glyphsLib.loads(fp.read(), cache_dir=cache_dir)
+
+    # str and bytes sources share the same entry
+    assert len(_entries(cache_dir)) == 1
+    assert cached is not font
+    assert glyphsLib.dumps(cached) == glyphsLib.dumps(font)
+    assert glyphsLib.dumps(cached) == glyphsLib.dumps(GSFont(glyphs_path))
+
+
+def test_invalidation(glyphs_path, tmpdir, monkeypatch):
+    cache_dir = str(tmpdir.join("cache"))
+    with open(glyphs_path, encoding="utf-8") as fp:
+        text = fp.read()
+
+    glyphsLib.loads(text, cache_dir=cache_dir)
+    font = glyphsLib.loads(text.replace("Glyphs Unit Test Sans", "Changed"), cache_dir)
+    assert font.familyName == "Changed"
+    assert len(_entries(cache_dir)) == 2
+
+    monkeypatch.setattr(glyphsLib, "__version__", "999.0")
+    glyphsLib.loads(text, cache_dir=cache_dir)
+    assert len(_entries(cache_dir)) == 3
+
+    # The version of source checkouts doesn't change with their code.
+    monkeypatch.setattr(cache, "CACHE_FORMAT", cache.CACHE_FORMAT + 1)
+    glyphsLib.loads(text, cache_dir=cache_dir)
+    assert len(_entries(cache_dir)) == 4
+
+
+def test_lazy_with_cache_dir(glyphs_path, tmpdir):
+    cache_dir = str(tmpdir)
+
+    with pytest.raises(ValueError, match="lazy"):
+        GSFont(glyphs_path, cache_dir=cache_dir, lazy=True)
+    with pytest.raises(ValueError, match="lazy"):
+        with open(glyphs_path, encoding="utf-8") as fp:
+            glyphsLib.load(fp, cache_dir=cache_dir, lazy=True)
+    assert not _entries(cache_dir)
+
+
+def test_unreadable_entry(glyphs_path, tmpdir):
+    cache_dir = str(tmpdir)
+    font = GSFont(glyphs_path, cache_dir=cache_dir)
+    (entry,) = _entries(cache_dir)
+    with open(os.path.join(cache_dir, entry), "wb") as fp:
+        fp.write(b"garbage")
+
+    cached = GSFont(glyphs_path, cache_dir=cache_dir)
+
+    assert glyphsLib.dumps(cached) == glyphsLib.dumps(font)
+    # The broken entry was replaced
+    assert _entries(cache_dir) == [entry]
+    assert os.path.getsize(os.path.join(cache_dir, entry)) > len(b"garbage")
+
+
+def test_prune(tmpdir):
+    cache_dir = str(tmpdir)
+    now = time.time()
+    for i in range(4):
+        path = os.path.join(cache_dir, "{}.glyphs-pickle".format(i))
+        with open(path, "wb") as fp:
+            fp.write(b"x" * 100)
+        # Entry 0 is the least recently used
+        os.utime(path, (now - 100 + i, now - 100 + i))
+    tmpdir.join("other.txt").write("not an entry")
+
+    cache.prune(
+        cache_dir, max_size=250, keep=os.path.join(cache_dir, "0.glyphs-pickle")
+    )
+
+    assert _entries(cache_dir) == ["0.glyphs-pickle", "3.glyphs-pickle", "other.txt"]
+
+
+def test_build_masters_cache_dir(glyphs_path, tmpdir):
+    cache_dir = str(tmpdir.join("cache"))
+    glyphsLib.cli.main(
+        [
+            "glyphs2ufo",
+            glyphs_path,
+            "-m",
+            str(tmpdir.join("master_ufo")),
+            "--cache-dir",
+            cache_dir,
+        ]
+    )
+    assert len(_entries(cache_dir)) == 1
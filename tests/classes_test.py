@@ -18,8 +18,11 @@ import os
 import datetime
 import copy
 import unittest
+import unittest.mock
 import pytest
 
+import glyphsLib
+from glyphsLib import classes
 from glyphsLib.classes import (
     GSFont,
     GSFontMaster,
@@ -1430,6 +1433,102 @@ class GSComponentFromFileTest(GSObjectsTestCase):
         self.assertEqual(round(bounds.size.width * 10), round(317.9 * 10))
         self.assertEqual(round(bounds.size.height * 10), round(539 * 10))
 
+    def test_rotatedBounds(self):
+        self.component.rotation = 90
+        # The bounds of the rotated outline, not of the rotated bounds of "a".
+        bounds = self.component.bounds
+        self.assertEqual(tuple(bounds), (-480, 80, 490, 289))
+        self.assertEqual(self.component.applyTransformation(100, 0), (0, 100))
+
+    def test_bounds_follow_base_glyph(self):
+        base_path = self.font.glyphs["a"].layers[0].paths[0]
+        self.assertEqual(self.layer.bounds.origin.y, -10)
+
+        node = base_path.nodes[0]
+        node.position = Point(node.position.x, -1000)
+        self.assertEqual(self.component.bounds.origin.y, -1000)
+        self.assertEqual(self.layer.bounds.origin.y, -1000)
+        del self.font.glyphs["a"]
+        self.assertIsNone(self.component.bounds)
+
+    def test_bounds_follow_nested_components(self):
+        # A glyph that uses adieresis, whose components change.
+        layer = GSLayer()
+        layer.layerId = layer.associatedMasterId = self.layer.layerId
+        layer.components.append(GSComponent("adieresis"))
+        glyph = GSGlyph("X")
+        glyph.layers.append(layer)
+        self.font.glyphs.append(glyph)
+        self.assertEqual(layer.bounds, self.layer.bounds)
+
+        accent = self.layer.components[1]
+        accent.position = Point(accent.position.x, accent.position.y + 1000)
+        self.assertEqual(layer.bounds.size.height, self.layer.bounds.size.height)
+        self.assertEqual(layer.bounds, self.layer.bounds)
+        accent.transform = Transform(1, 0, 0, 1, 0, 0)
+        self.assertEqual(layer.bounds, self.layer.bounds)
+        accent.scale = 2
+        self.assertEqual(layer.bounds, self.layer.bounds)
+        accent.rotation = 90
+        self.assertEqual(layer.bounds, self.layer.bounds)
+        accent.name = "a"
+        self.assertEqual(layer.bounds, self.layer.bounds)
+        self.assertEqual(self.font.componentGraph.users("a"), ["adieresis"])
+
+    def test_bounds_nested_rotated_components(self):
+        # Each glyph uses the previous one twice, rotated by about 53 degrees,
+        # which never adds up to a multiple of 90 degrees.
+        path = GSPath()
+        for position in ((0, 0), (100, 0), (100, 10)):
+            path.nodes.append(GSNode(position))
+        names = []
+        for depth in range(12):
+            layer = GSLayer()
+            layer.layerId = layer.associatedMasterId = self.layer.layerId
+            if names:
+                for offset in (0, 1000):
+                    layer.components.append(
+                        GSComponent(
+                            names[-1],
+                            transform=Transform(0.6, 0.8, -0.8, 0.6, offset, 0),
+                        )
+                    )
+            else:
+                layer.paths.append(path)
+            names.append(f"rotated{depth}")
+            glyph = GSGlyph(names[-1])
+            glyph.layers.append(layer)
+            self.font.glyphs.append(glyph)
+
+        calls = []
+        component_box = classes._component_box
+
+        def counting_component_box(*args, **kwargs):
+            calls.append(args[0].name)
+            return component_box(*args, **kwargs)
+
+        with unittest.mock.patch.object(
+            classes, "_component_box", counting_component_box
+        ):
+            bounds = layer.bounds
+        # Twice per glyph rather than twice as many for each level.
+        self.assertLess(len(calls), 4 * len(names))
+        self.assertEqual(
+            tuple(round(v, 3) for v in bounds),
+            (-3667.049, -2270.81, 7419.684, 6528.592),
+        )
+
+        path.nodes[2].position = Point(100, 20)
+        self.assertEqual(
+            tuple(round(v, 3) for v in layer.bounds),
+            (-3667.049, -2277.951, 7419.684, 6535.733),
+        )
+
+    def test_bounds_recursion(self):
+        self.font.glyphs["a"].layers[0].components.append(GSComponent("adieresis"))
+        # The components that use their own glyph are ignored.
+        self.assertEqual(tuple(self.component.bounds), (80, -10, 289, 490))
+
     # def test_automaticAlignment(self):
     #     self.assertBool(self.component.automaticAlignment)
 
@@ -1602,6 +1701,65 @@ class GSPathFromFileTest(GSObjectsTestCase):
         self.assertEqual(bounds.size.width, 289)
         self.assertEqual(bounds.size.height, 490)
 
+    def test_bounds_cache(self):
+        segments = self.path.segments
+        self.assertIs(self.path.segments, segments)
+        self.assertEqual(self.layer.bounds, self.path.bounds)
+
+        # Moving a node or changing the nodes forgets the cached bounds of the
+        # path and of its layer.
+        node = self.path.nodes[0]
+        self.assertNotEqual(node.type, "offcurve")
+        node.position = Point(node.position.x, -1000)
+        self.assertEqual(self.path.bounds.origin.y, -1000)
+        self.assertEqual(self.layer.bounds.origin.y, -1000)
+        self.assertIsNot(self.path.segments, segments)
+        self.path.nodes = []
+        self.assertIsNone(self.path.bounds)
+        self.assertEqual(len(self.path.segments), 0)
+        self.assertIsNone(self.layer.bounds)
+
+    def test_bounds_cache_node_changes(self):
+        width = self.path.bounds.size.width
+        layer_width = self.layer.bounds.size.width
+        segments = self.path.segments
+
+        # Points of the nodes changed in place.
+        node = max(self.path.nodes, key=lambda node: node.position.x)
+        node.position.x += 500
+        self.assertEqual(self.path.bounds.size.width, width + 500)
+        self.assertEqual(self.layer.bounds.size.width, layer_width + 500)
+        node.position[0] -= 500
+        self.assertEqual(self.path.bounds.size.width, width)
+        self.assertEqual(self.layer.bounds.size.width, layer_width)
+
+        # The types of the nodes make the segments.
+        self.assertIsNot(self.path.segments, segments)
+        segments = self.path.segments
+        node = next(node for node in self.path.nodes if node.type == "offcurve")
+        node.type = "line"
+        self.assertIsNot(self.path.segments, segments)
+        self.assertNotEqual(
+            [len(segment) for segment in self.path.segments],
+            [len(segment) for segment in segments],
+        )
+        segments = self.path.segments
+        node.smooth = not node.smooth
+        self.assertIsNot(self.path.segments, segments)
+
+    def test_bounds_extrema(self):
+        # A curve with two extrema in x, which are both out of its points.
+        p = GSPath()
+        p.nodes = [
+            GSNode((0, 0), "line"),
+            GSNode((100, 100), "offcurve"),
+            GSNode((-100, 200), "offcurve"),
+            GSNode((0, 300), "curve"),
+        ]
+        bounds = p.bounds
+        self.assertAlmostEqual(bounds.origin.x, -28.8675, 4)
+        self.assertAlmostEqual(bounds.size.width, 2 * 28.8675, 4)
+
 
 class GSNodeFromFileTest(GSObjectsTestCase):
     def setUp(self):
@@ -1755,6 +1913,68 @@ class segmentTest(unittest.TestCase):
         self.assertAlmostEqual(bbox[3], 367)
 
 
+class CloneTest(unittest.TestCase):
+    def setUp(self):
+        self.font = GSFont(TESTFILE_PATH)
+
+    def test_clone_font(self):
+        font = self.font.clone()
+
+        self.assertIsNot(font, self.font)
+        self.assertEqual(glyphsLib.dumps(font), glyphsLib.dumps(self.font))
+        self.assertIs(font.masters[0].font, font)
+        self.assertIs(font.instances[0].parent, font)
+        glyph = font.glyphs["A"]
+        self.assertIs(glyph.parent, font)
+        layer = glyph.layers[0]
+        self.assertIs(layer.parent, glyph)
+        self.assertIs(layer.background.foreground, layer)
+        self.assertIs(layer.paths[0].parent, layer)
+        self.assertIs(layer.paths[0].nodes[0].parent, layer.paths[0])
+
+    def test_clone_is_independent(self):
+        font = self.font.clone()
+        node = font.glyphs["A"].layers[0].paths[0].nodes[0]
+        node.position = Point(1, 2)
+        font.glyphs["A"].name = "B"
+        font.glyphs["A"].layers[0].width = 1
+
+        original = self.font.glyphs["A"]
+        self.assertEqual(original.name, "A")
+        self.assertNotEqual(original.layers[0].paths[0].nodes[0].position, (1, 2))
+        self.assertNotEqual(original.layers[0].width, 1)
+
+    def test_clone_glyph(self):
+        glyph = self.font.glyphs["A"].clone()
+
+        # The links to the outside of the copied tree are kept.
+        self.assertIs(glyph.parent, self.font)
+        for layer in glyph.layers:
+            self.assertIs(layer.parent, glyph)
+        (layer,) = [layer for layer in glyph.layers if layer.hints]
+        hint = layer.hints[0]
+        self.assertIs(hint.parent, layer)
+        nodes = [node for path in layer.paths for node in path.nodes]
+        self.assertTrue(any(node is hint.originNode for node in nodes))
+
+    def test_clone_layer(self):
+        original = self.font.glyphs["A"].layers[0]
+        layer = original.clone()
+
+        self.assertIs(layer.parent, original.parent)
+        self.assertEqual(layer.layerId, original.layerId)
+        self.assertIs(layer.paths[0].parent, layer)
+        self.assertIsNot(layer.paths[0], original.paths[0])
+
+    def test_deepcopy_proxy(self):
+        layer = self.font.glyphs["A"].layers[0]
+        paths = copy.deepcopy(layer.paths)
+
+        self.assertEqual(len(paths), len(layer.paths))
+        self.assertIsNot(paths[0], layer.paths[0])
+        self.assertIs(paths[0].parent, layer)
+
+
 class FontGlyphsProxyTest(unittest.TestCase):
     def setUp(self):
         self.font = GSFont(TESTFILE_PATH)
@@ -1775,6 +1995,105 @@ class FontGlyphsProxyTest(unittest.TestCase):
             del self.font.glyphs[self.font]
 
 
+class ComponentGraphTest(unittest.TestCase):
+    def setUp(self):
+        self.font = GSFont(TESTFILE_PATH)
+        self.graph = self.font.componentGraph
+
+    def test_queries(self):
+        graph = self.graph
+        self.assertIs(graph, self.font.componentGraph)
+        self.assertIs(graph.glyph("A"), self.font.glyphs["A"])
+        self.assertIsNone(graph.glyph("xxx"))
+        self.assertEqual(graph.components("Adieresis"), ["A", "dieresis"])
+        self.assertEqual(graph.components("A"), [])
+        self.assertEqual(graph.users("dieresis"), ["Adieresis", "adieresis"])
+        self.assertEqual(graph.users("Adieresis"), [])
+        self.assertEqual(
+            graph.component_closure(["h", "a"]),
+            {"h", "a", "_part.stem", "_part.shoulder"},
+        )
+        self.assertEqual(
+            graph.user_closure(["_part.stem"]), {"_part.stem", "h", "m", "n"}
+        )
+
+        order = graph.topological_order()
+        self.assertEqual(
+            sorted(order), sorted(glyph.name for glyph in self.font.glyphs)
+        )
+        for name in order:
+            for base in graph.components(name):
+                self.assertLess(order.index(base), order.index(name))
+        self.assertEqual(graph.cycles(), [])
+
+    def test_follow_proxies(self):
+        graph = self.graph
+        layer = self.font.glyphs["a"].layers[0]
+        layer.components.append(GSComponent("dieresis"))
+        self.assertEqual(graph.components("a"), ["dieresis"])
+        self.assertEqual(
+            graph.user_closure(["dieresis"]),
+            {"dieresis", "Adieresis", "adieresis", "a"},
+        )
+        del layer.components[0]
+        self.assertEqual(graph.components("a"), [])
+
+        # The components of the background layers are not followed.
+        layer.background.components.append(GSComponent("A"))
+        self.assertEqual(graph.components("a"), [])
+
+        glyph = self.font.glyphs["adieresis"]
+        glyph.layers[0].components = []
+        self.assertEqual(graph.users("a"), ["adieresis"])
+        del glyph.layers[self.font.masters[1].id]
+        del glyph.layers[self.font.masters[2].id]
+        self.assertEqual(graph.users("a"), [])
+
+        del self.font.glyphs["Adieresis"]
+        self.assertEqual(graph.users("A"), [])
+        self.assertIsNone(graph.glyph("Adieresis"))
+        self.font.glyphs.append(GSGlyph("Adieresis"))
+        self.font.glyphs["Adieresis"].layers.append(GSLayer())
+        self.font.glyphs["Adieresis"].layers[0].components.append(GSComponent("A"))
+        self.assertEqual(graph.users("A"), ["Adieresis"])
+
+        self.font.glyphs[0] = GSGlyph("B")
+        self.assertIsNone(graph.glyph("A"))
+        self.assertEqual(graph.component_closure(["Adieresis"]), {"Adieresis"})
+
+        self.font.glyphs = [GSGlyph("C")]
+        self.assertIsNot(self.font.componentGraph, graph)
+        self.assertEqual(self.font.componentGraph.topological_order(), ["C"])
+
+    def test_rename(self):
+        graph = self.graph
+        self.font.glyphs["dieresis"].name = "dieresiscomb"
+        self.assertIsNone(graph.glyph("dieresis"))
+        self.assertEqual(graph.users("dieresis"), ["Adieresis", "adieresis"])
+        self.assertEqual(graph.component_closure(["Adieresis"]), {"Adieresis", "A"})
+
+        self.font.glyphs["Adieresis"].name = "Adieresis.alt"
+        self.assertEqual(graph.users("A"), ["Adieresis.alt"])
+        self.assertEqual(graph.components("Adieresis.alt"), ["A", "dieresis"])
+
+    def test_rename_bounds(self):
+        layer = self.font.glyphs["Adieresis"].layers[0]
+        bounds = layer.bounds
+        self.font.glyphs["dieresis"].name = "dieresiscomb"
+        self.assertNotEqual(layer.bounds, bounds)
+        self.font.glyphs["dieresiscomb"].name = "dieresis"
+        self.assertEqual(layer.bounds, bounds)
+
+    def test_cycles(self):
+        graph = self.graph
+        for name, base in (("A", "Adieresis"), ("a", "a")):
+            layer = self.font.glyphs[name].layers[0]
+            layer.components.append(GSComponent(base))
+        self.assertEqual(graph.cycles(), [["A", "Adieresis"], ["a"]])
+        with self.assertRaisesRegex(ValueError, "A -> Adieresis -> A"):
+            graph.topological_order()
+
+
 class FontClassesProxyTest(unittest.TestCase):
     def setUp(self):
         self.font = GSFont(TESTFILE_PATH)
@@ -0,0 +1,160 @@
+#
+# Copyright 2020 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import os
+
+import pytest
+
+import glyphsLib
+import glyphsLib.cli
+from glyphsLib.classes import GSAnchor, GSComponent, GSNode
+from glyphsLib.compatibility import (
+    Incompatibility,
+    IncompatibleMastersError,
+    check_compatibility,
+)
+
+
+@pytest.fixture
+def font(datadir):
+    return glyphsLib.GSFont(str(datadir.join("GlyphsUnitTestSans.glyphs")))
+
+
+def _layer(font, glyph_name, layer_name):
+    for layer in font.glyphs[glyph_name].layers:
+        if layer.name == layer_name:
+            return layer
+    raise KeyError(layer_name)
+
+
+def test_compatible(datadir):
+    for name in ("GlyphsUnitTestSans", "BraceTestFont", "BracketTestFont"):
+        font = glyphsLib.GSFont(str(datadir.join(name + ".glyphs")))
+        assert check_compatibility(font) == []
+
+
+def test_paths(font):
+    del _layer(font, "A", "Bold").paths[1].nodes[0]
+    _layer(font, "a.sc", "Light").paths[0].nodes[0].type = "qcurve"
+    _layer(font, "a", "{155, 100}").paths[0].closed = False
+    _layer(font, "dieresis", "Regular").paths = []
+
+    assert check_compatibility(font) == [
+        Incompatibility("A", "Bold", 1, "3 node(s) instead of 4 in 'Light'"),
+        Incompatibility("a", "{155, 100}", 0, "the path is open but closed in 'Light'"),
+        Incompatibility(
+            "a.sc", "Light", 0, "node 0 is a qcurve node but a line node in 'Regular'"
+        ),
+        Incompatibility(
+            "dieresis", "Regular", None, "0 path(s) instead of 2 in 'Light'"
+        ),
+    ]
+
+
+def test_components_and_anchors(font):
+    _layer(font, "Adieresis", "Bold").components.append(GSComponent("A"))
+    del _layer(font, "A", "Bold").anchors["top"]
+    _layer(font, "a", "Light").anchors.append(GSAnchor("top_1"))
+
+    assert [str(i) for i in check_compatibility(font)] == [
+        "glyph 'A', layer 'Bold': anchors ['bottom', 'ogonek'] "
+        "instead of ['bottom', 'ogonek', 'top'] in 'Light'",
+        "glyph 'Adieresis', layer 'Bold': components ['A', 'dieresis', 'A'] "
+        "instead of ['A', 'dieresis'] in 'Light'",
+        "glyph 'a', layer 'Light': anchors ['bottom', 'ogonek', 'top', 'top_1'] "
+        "instead of ['bottom', 'ogonek', 'top'] in 'Regular'",
+    ]
+
+
+def test_bracket_layers(datadir):
+    font = glyphsLib.GSFont(str(datadir.join("BracketTestFont.glyphs")))
+    condensed_bold = font.masters[3].id
+    glyph = font.glyphs["x"]
+    (layer,) = [
+        layer
+        for layer in glyph.layers
+        if layer.name == "[300]" and layer.associatedMasterId == font.masters[1].id
+    ]
+    del layer.paths[1]
+    # The master layer is used in place of the missing bracket layer.
+    glyph = font.glyphs["a"]
+    (layer,) = [
+        layer
+        for layer in glyph.layers
+        if layer.name == "[300]" and layer.associatedMasterId == condensed_bold
+    ]
+    del glyph.layers[layer.layerId]
+
+    assert [str(i) for i in check_compatibility(font)] == [
+        "glyph 'a', layer 'Condensed Bold', path 0: "
+        "4 node(s) instead of 12 in '[300]'",
+        "glyph 'x', layer '[300]': 1 path(s) instead of 2 in 'Something [300]'",
+    ]
+
+
+def test_selection(font):
+    _layer(font, "A", "Bold").paths[0].nodes[0].type = "qcurve"
+    _layer(font, "a.sc", "Light").paths[0].nodes[0].type = "qcurve"
+
+    assert [(i.glyph, i.layer) for i in check_compatibility(font)] == [
+        ("A", "Bold"),
+        ("a.sc", "Light"),
+    ]
+    # Adieresis uses A as a component.
+    assert [i.glyph for i in check_compatibility(font, glyph_names=["Adieresis"])] == [
+        "A"
+    ]
+    assert (
+        check_compatibility(font, glyph_names=["Adieresis"], include_components=False)
+        == []
+    )
+    assert [
+        (i.glyph, i.layer)
+        for i in check_compatibility(font, master_names=["Light", "Regular"])
+    ] == [("a.sc", "Regular")]
+
+
+def test_build_masters(datadir, tmpdir):
+    path = str(tmpdir.join("GlyphsUnitTestSans.glyphs"))
+    font = glyphsLib.GSFont(str(datadir.join("GlyphsUnitTestSans.glyphs")))
+    _layer(font, "A", "Bold").paths[0].nodes.append(GSNode((0, 0)))
+    font.save(path)
+    master_dir = str(tmpdir.join("masters"))
+
+    with pytest.raises(IncompatibleMastersError) as excinfo:
+        glyphsLib.build_masters(path, master_dir, check_compatibility=True)
+
+    assert excinfo.value.incompatibilities == [
+        Incompatibility("A", "Bold", 0, "9 node(s) instead of 8 in 'Light'")
+    ]
+    assert "glyph 'A', layer 'Bold', path 0" in str(excinfo.value)
+    assert not os.path.exists(master_dir)
+    glyphsLib.build_masters(path, master_dir)
+    assert os.path.isdir(master_dir)
+
+
+def test_cli(datadir, tmpdir, capsys):
+    path = str(tmpdir.join("GlyphsUnitTestSans.glyphs"))
+    font = glyphsLib.GSFont(str(datadir.join("GlyphsUnitTestSans.glyphs")))
+    _layer(font, "A", "Bold").paths[0].nodes.append(GSNode((0, 0)))
+    font.save(path)
+    master_dir = str(tmpdir.join("masters"))
+
+    args = ["glyphs2ufo", path, "-m", master_dir, "--check-compatibility"]
+    assert glyphsLib.cli.main(args) == 1
+
+    assert "glyph 'A', layer 'Bold', path 0" in capsys.readouterr().err
+    assert not os.path.exists(master_dir)
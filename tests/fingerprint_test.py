@@ -0,0 +1,110 @@
+#
+# Copyright 2020 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import pytest
+
+import glyphsLib
+from glyphsLib.classes import GSGlyph, GSNode
+from glyphsLib.fingerprint import (
+    FontDiff,
+    diff,
+    fingerprint,
+    font_fingerprint,
+    invalidate,
+)
+from glyphsLib.types import Point
+
+
+@pytest.fixture
+def font(datadir):
+    return glyphsLib.GSFont(str(datadir.join("GlyphsUnitTestSans.glyphs")))
+
+
+def test_stable(datadir, font):
+    expected = font_fingerprint(font)
+    other = glyphsLib.GSFont(str(datadir.join("GlyphsUnitTestSans.glyphs")))
+
+    assert font_fingerprint(other) == expected
+    assert font_fingerprint(glyphsLib.loads(glyphsLib.dumps(font))) == expected
+    assert fingerprint(font) == expected.font
+    assert list(expected.glyphs) == [glyph.name for glyph in font.glyphs]
+    assert list(expected.kerning) == list(font.kerning)
+    assert expected.glyphs["A"] == fingerprint(font.glyphs["A"])
+    assert "fontMaster" in expected.sections
+    assert fingerprint(font.glyphs["A"]) != fingerprint(font.glyphs["Adieresis"])
+
+
+def test_proxy_changes(font):
+    before = font_fingerprint(font)
+    path = font.glyphs["A"].layers[0].paths[0]
+    path_before = fingerprint(path)
+
+    path.nodes.append(GSNode((10, 10)))
+    font.glyphs["n"].layers[1].background.anchors.append(glyphsLib.GSAnchor("top"))
+    font.glyphs["a"].layers[0].userData["key"] = "value"
+
+    assert fingerprint(path) != path_before
+    assert diff(before, font_fingerprint(font)) == FontDiff(
+        ["glyphs"], [], ["A", "a", "n"]
+    )
+
+
+def test_attribute_changes(font):
+    before = font_fingerprint(font)
+
+    font.glyphs["A"].layers[0].paths[0].nodes[0].position.x += 10
+    font.glyphs["a"].layers[0].width = 9999
+
+    assert diff(before, font_fingerprint(font)).glyphs == ["A", "a"]
+
+
+def test_cached(font):
+    before = font_fingerprint(font, cached=True)
+    node = font.glyphs["A"].layers[0].paths[0].nodes[0]
+    layer = font.glyphs["a"].layers[0]
+
+    node.position = Point(10, 10)
+    font.glyphs["dieresis"].layers[0].paths[0].nodes[0].type = "offcurve"
+    assert diff(before, font_fingerprint(font, cached=True)).glyphs == [
+        "A",
+        "dieresis",
+    ]
+
+    layer.width = 9999
+    # Other attribute changes aren't tracked.
+    assert diff(before, font_fingerprint(font, cached=True)).glyphs == [
+        "A",
+        "dieresis",
+    ]
+    invalidate(layer)
+    assert diff(before, font_fingerprint(font, cached=True)).glyphs == [
+        "A",
+        "a",
+        "dieresis",
+    ]
+
+
+def test_sections(font):
+    before = font_fingerprint(font)
+
+    font.masters[1].name = "Medium"
+    font.setKerningForPair(font.masters[2].id, "@MMK_L_A", "@MMK_R_J", -15)
+    font.glyphs.append(GSGlyph("B"))
+    del font.glyphs["a.sc"]
+
+    assert diff(before, font_fingerprint(font)) == FontDiff(
+        ["fontMaster", "glyphs", "kerning"], [font.masters[2].id], ["B", "a.sc"]
+    )
@@ -0,0 +1,85 @@
+#
+# Copyright 2020 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import os
+
+import pytest
+
+import glyphsLib
+from glyphsLib.classes import GSGlyph
+from glyphsLib.glyphspackage import write
+
+
+@pytest.fixture
+def font(datadir):
+    return glyphsLib.GSFont(str(datadir.join("GlyphsUnitTestSans.glyphs")))
+
+
+@pytest.fixture
+def package(tmpdir):
+    return str(tmpdir.join("GlyphsUnitTestSans.glyphspackage"))
+
+
+def test_roundtrip(font, package):
+    font.save(package)
+
+    assert sorted(os.listdir(package)) == [
+        "UIState.plist",
+        "fontinfo.plist",
+        "glyphs",
+        "order.plist",
+    ]
+    assert "A_.glyph" in os.listdir(os.path.join(package, "glyphs"))
+    other = glyphsLib.GSFont(package)
+    assert other.filepath == package
+    assert other.DisplayStrings == font.DisplayStrings
+    assert [glyph.name for glyph in other.glyphs] == [
+        glyph.name for glyph in font.glyphs
+    ]
+    assert glyphsLib.dumps(other) == glyphsLib.dumps(font)
+
+
+def test_write_changed_files(font, package):
+    assert len(write(font, package)) == len(font.glyphs) + 3
+    assert write(font, package) == []
+
+    font.glyphs["a"].layers[0].width = 600
+    font.glyphs.append(GSGlyph("b"))
+    assert write(font, package) == [
+        os.path.join(package, "glyphs", "a.glyph"),
+        os.path.join(package, "glyphs", "b.glyph"),
+        os.path.join(package, "order.plist"),
+    ]
+
+    del font.glyphs["A"]
+    assert write(font, package) == [os.path.join(package, "order.plist")]
+    assert "A_.glyph" not in os.listdir(os.path.join(package, "glyphs"))
+    assert [glyph.name for glyph in glyphsLib.GSFont(package).glyphs] == [
+        glyph.name for glyph in font.glyphs
+    ]
+
+
+def test_order(font, package):
+    font.save(package)
+    with open(os.path.join(package, "order.plist"), "w") as fp:
+        fp.write("(\nn,\nA\n)\n")
+
+    names = [glyph.name for glyph in glyphsLib.GSFont(package).glyphs]
+    # The glyphs that aren't in the order come last, sorted by file name.
+    assert names[:2] == ["n", "A"]
+    assert sorted(names[2:]) == sorted(
+        glyph.name for glyph in font.glyphs if glyph.name not in ("n", "A")
+    )
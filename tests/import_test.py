@@ -0,0 +1,113 @@
+#
+# Copyright 2020 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import subprocess
+import sys
+
+import pytest
+
+import glyphsLib
+
+# Generous upper bound of the cumulative time (in seconds) of a cold
+# `import glyphsLib`. Importing the builder eagerly takes several times longer.
+MAX_IMPORT_TIME = 0.2
+
+requires_pep562 = pytest.mark.skipif(
+    sys.version_info < (3, 7), reason="module __getattr__ requires Python 3.7"
+)
+
+
+def _run_python(statement):
+    """Run `statement` in a new interpreter. Return the modules imported at
+    the end, and a dict of their cumulative import time in seconds (modules
+    imported with importlib.import_module are missing from the latter).
+    """
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            statement + "; import sys; print('\\n'.join(sys.modules))",
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, module = line[len("import time:") :].split("|")
+        if cumulative.strip().isdigit():
+            times[module.strip()] = int(cumulative) / 1e6
+    return set(result.stdout.split()), times
+
+
+@requires_pep562
+def test_import_is_lazy():
+    modules, times = _run_python("import glyphsLib")
+
+    for module in (
+        "glyphsLib.builder",
+        "glyphsLib.classes",
+        "fontTools.designspaceLib",
+        "fontTools.feaLib",
+    ):
+        assert module not in modules
+    assert times["glyphsLib"] < MAX_IMPORT_TIME
+
+
+@requires_pep562
+def test_load_does_not_import_builder():
+    modules, _ = _run_python("import glyphsLib; glyphsLib.loads; glyphsLib.GSFont")
+
+    assert "glyphsLib.classes" in modules
+    assert "glyphsLib.builder" not in modules
+    assert "fontTools.designspaceLib" not in modules
+
+
+def test_lazy_attributes():
+    from glyphsLib.builder import to_designspace
+    from glyphsLib.classes import GSFont
+
+    assert glyphsLib.to_designspace is to_designspace
+    assert glyphsLib.GSFont is GSFont
+    assert glyphsLib.builder.to_designspace is to_designspace
+    assert "GSFont" in glyphsLib.__all__
+    assert "to_ufos" in dir(glyphsLib)
+    with pytest.raises(AttributeError):
+        glyphsLib.GSDoesNotExist
+    with pytest.raises(AttributeError):
+        glyphsLib.__does_not_exist__
+
+    namespace = {}
+    exec("from glyphsLib import *", namespace)
+    assert namespace["build_masters"] is glyphsLib.build_masters
+    assert namespace["GSFont"] is GSFont
+
+
+def test_compatibility_does_not_import_builder(datadir):
+    path = str(datadir.join("GlyphsUnitTestSans.glyphs"))
+    modules, _ = _run_python(
+        "import glyphsLib; from glyphsLib.compatibility import check_compatibility; "
+        f"check_compatibility(glyphsLib.GSFont({path!r}), glyph_names=['A'])"
+    )
+
+    assert "glyphsLib.compatibility" in modules
+    assert "glyphsLib.builder" not in modules
+    assert "fontTools.designspaceLib" not in modules
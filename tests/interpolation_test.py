@@ -0,0 +1,182 @@
+#
+# Copyright 2020 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import copy
+import os
+
+import pytest
+import ufoLib2
+from fontTools.designspaceLib import DesignSpaceDocument
+from fontTools.varLib.models import VariationModel, normalizeLocation
+
+import glyphsLib
+from glyphsLib.interpolation import interpolate_instances
+
+
+def _designspace(datadir, name, ufo_module=ufoLib2):
+    font = glyphsLib.GSFont(str(datadir.join(name)))
+    return glyphsLib.to_designspace(font, ufo_module=ufo_module)
+
+
+def _instance(designspace, style_name):
+    (index,) = [
+        i
+        for i, instance in enumerate(designspace.instances)
+        if instance.styleName == style_name
+    ]
+    return index
+
+
+def _glyph_data(glyph):
+    return (
+        [[(p.x, p.y, p.segmentType) for p in contour] for contour in glyph],
+        [(c.baseGlyph, tuple(c.transformation)) for c in glyph.components],
+        [(a.name, a.x, a.y) for a in glyph.anchors],
+        glyph.width,
+    )
+
+
+def _values(glyph):
+    values = [v for contour in glyph for point in contour for v in (point.x, point.y)]
+    for component in glyph.components:
+        values.extend(component.transformation)
+    return values + [glyph.width]
+
+
+def _master(designspace, style_name):
+    for source in designspace.sources:
+        if source.styleName == style_name and source.layerName is None:
+            return source.font
+    raise KeyError(style_name)
+
+
+def test_master_locations(datadir, ufo_module):
+    designspace = _designspace(datadir, "GlyphsUnitTestSans.glyphs", ufo_module)
+    ufos = interpolate_instances(designspace, ufo_module=ufo_module)
+
+    assert len(ufos) == len(designspace.instances)
+    for style_name, master_name in (("Thin", "Light"), ("Black", "Bold")):
+        ufo = ufos[_instance(designspace, style_name)]
+        master = _master(designspace, master_name)
+        assert ufo.glyphOrder == master.glyphOrder
+        assert ufo.info.styleName == style_name
+        for glyph in master:
+            assert _glyph_data(ufo[glyph.name]) == _glyph_data(glyph)
+            assert ufo[glyph.name].unicodes == glyph.unicodes
+        assert ufo.info.xHeight == master.info.xHeight
+        for pair, value in master.kerning.items():
+            assert ufo.kerning[pair] == value
+
+
+def test_intermediate_locations(datadir):
+    designspace = _designspace(datadir, "GlyphsUnitTestSans.glyphs")
+    ufos = interpolate_instances(designspace, round_geometry=False)
+
+    axes = {axis.name: (17, 90, 220) for axis in designspace.axes}
+    masters = [s.font for s in designspace.sources if s.layerName is None]
+    model = VariationModel(
+        [
+            normalizeLocation({"Weight": s.location["Weight"]}, axes)
+            for s in designspace.sources
+            if s.layerName is None
+        ]
+    )
+    index = _instance(designspace, "Medium")
+    location = normalizeLocation(designspace.instances[index].location, axes)
+    for name in ("A", "n", "adieresis"):
+        columns = zip(*(_values(master[name]) for master in masters))
+        expected = [
+            model.interpolateFromMasters(location, list(column)) for column in columns
+        ]
+        assert _values(ufos[index][name]) == pytest.approx(expected)
+    # Rounded by default.
+    (medium,) = interpolate_instances(
+        designspace, include_filenames=[designspace.instances[index].filename]
+    )
+    assert medium["A"].width == round(ufos[index]["A"].width)
+    assert medium.info.xHeight == round(ufos[index].info.xHeight)
+    assert (
+        min(ufo.info.xHeight for ufo in masters[1:])
+        < medium.info.xHeight
+        < max(ufo.info.xHeight for ufo in masters[1:])
+    )
+
+
+def test_brace_layers(datadir):
+    designspace = _designspace(datadir, "BraceTestFont.glyphs")
+    instance = copy.deepcopy(designspace.instances[0])
+    instance.styleName = "Brace"
+    instance.filename = "instance_ufos/NewFont-Brace.ufo"
+    instance.location = {"Width": 75, "Weight": 100}
+    designspace.addInstance(instance)
+
+    ufos = interpolate_instances(designspace)
+
+    light = _master(designspace, "Light")
+    condensed = _master(designspace, "Condensed Light")
+    ufo = ufos[-1]
+    assert _glyph_data(ufo["a"]) == _glyph_data(light.layers["{75}"]["a"])
+    # The glyphs without brace layers are interpolated between the masters.
+    assert ufo["c"].width == round((light["c"].width + condensed["c"].width) / 2)
+
+
+def test_bracket_layers(datadir):
+    designspace = _designspace(datadir, "BracketTestFont.glyphs")
+    ufos = interpolate_instances(designspace)
+
+    bold_master = _master(designspace, "Bold")
+    thin = ufos[_instance(designspace, "Thin")]
+    regular = ufos[_instance(designspace, "Regular")]
+    bold = ufos[_instance(designspace, "Bold")]
+    assert _glyph_data(thin["a"]) == _glyph_data(_master(designspace, "Light")["a"])
+    assert _glyph_data(bold["a"]) == _glyph_data(bold_master["a.BRACKET.300"])
+    assert _glyph_data(bold["x"]) == _glyph_data(bold_master["x.BRACKET.600"])
+    assert _glyph_data(bold["x.BRACKET.600"]) == _glyph_data(bold_master["x"])
+    assert _glyph_data(regular["x"]) != _glyph_data(bold["x"])
+    # The unicodes stay with the glyph names.
+    assert bold["a"].unicodes == bold_master["a"].unicodes
+
+
+def test_save(datadir, tmpdir):
+    masters = glyphsLib.build_masters(
+        str(datadir.join("GlyphsUnitTestSans.glyphs")), str(tmpdir)
+    )
+    designspace = DesignSpaceDocument.fromfile(masters.designspace_path)
+    filename = "instance_ufos/GlyphsUnitTestSans-Bold.ufo"
+
+    ufos = interpolate_instances(designspace, include_filenames=[filename], save=True)
+
+    assert len(ufos) == 1
+    path = str(tmpdir.join(filename))
+    assert os.listdir(str(tmpdir.join("instance_ufos"))) == [os.path.basename(path)]
+    ufo = ufoLib2.Font.open(path)
+    assert ufo.info.styleName == "Bold"
+    assert ufo.info.openTypeOS2WeightClass == 700
+    assert sorted(ufo.keys()) == sorted(ufos[0].keys())
+    assert _glyph_data(ufo["A"]) == _glyph_data(ufos[0]["A"])
+
+
+def test_numpy(datadir):
+    pytest.importorskip("numpy")
+    designspace = _designspace(datadir, "BraceTestFont.glyphs")
+
+    expected = interpolate_instances(designspace, use_numpy=False)
+    ufos = interpolate_instances(designspace, use_numpy=True)
+
+    for ufo, expected_ufo in zip(ufos, expected):
+        assert dict(ufo.kerning) == dict(expected_ufo.kerning)
+        for glyph in expected_ufo:
+            assert _glyph_data(ufo[glyph.name]) == _glyph_data(glyph)
@@ -16,7 +16,11 @@
 
 import os
 import glob
+import shutil
 
+import pytest
+
+import glyphsLib
 import glyphsLib.cli
 import glyphsLib.parser
 
@@ -65,3 +69,106 @@ def test_parser_main(capsys):
     glyphsLib.parser.main([filename])
     out, _err = capsys.readouterr()
     assert expected == out, "The roundtrip should output the .glyphs file unmodified."
+
+
+def test_glyphs2ufo_several_files(tmpdir):
+    filename = os.path.join(os.path.dirname(__file__), "data/GlyphsUnitTestSans.glyphs")
+    sources = []
+    for name in ("Roman", "Italic"):
+        source = tmpdir.join(name + ".glyphs")
+        shutil.copy(filename, str(source))
+        sources.append(str(source))
+    master_dir = tmpdir.join("masters")
+
+    result = glyphsLib.cli.main(
+        ["glyphs2ufo", *sources, "-m", str(master_dir), "--jobs", "2"]
+    )
+
+    assert not result
+    for name in ("Roman", "Italic"):
+        assert master_dir.join(name, name + ".designspace").check(file=1)
+        assert len(master_dir.join(name).listdir("*.ufo")) == 3
+
+
+def test_glyphs2ufo_several_files_failure(tmpdir, capsys):
+    filename = os.path.join(os.path.dirname(__file__), "data/GlyphsUnitTestSans.glyphs")
+    good = tmpdir.join("Good.glyphs")
+    shutil.copy(filename, str(good))
+    broken = tmpdir.join("Broken.glyphs")
+    broken.write("{\nfamilyName = Broken;\nfontMaster = (\n")
+
+    result = glyphsLib.cli.main(["glyphs2ufo", str(broken), str(good), "-j", "1"])
+
+    assert result == 1
+    _, err = capsys.readouterr()
+    assert "Failed to convert 1 file(s):" in err
+    assert str(broken) + ":" in err
+    assert str(good) + ":" not in err
+    assert tmpdir.join("Good.designspace").check(file=1)
+
+
+def test_build_masters_batch_errors(tmpdir):
+    broken = tmpdir.join("Broken.glyphs")
+    broken.write("{\nfamilyName = Broken;\nfontMaster = (\n")
+
+    with pytest.raises(glyphsLib.BatchBuildError) as excinfo:
+        glyphsLib.build_masters_batch([str(broken)], str(tmpdir), jobs=1)
+
+    assert list(excinfo.value.errors) == [str(broken)]
+    assert excinfo.value.designspace_paths == {}
+
+
+def _read_tree(path):
+    files = {}
+    for root, _, names in os.walk(path):
+        for name in names:
+            file_path = os.path.join(root, name)
+            with open(file_path, "rb") as fp:
+                files[os.path.relpath(file_path, path)] = fp.read()
+    return files
+
+
+@pytest.mark.parametrize(
+    "filename, options",
+    [
+        ("GlyphsUnitTestSans.glyphs", {}),
+        ("GlyphsUnitTestSans.glyphs", {"create_background_layers": True}),
+        ("BracketTestFont.glyphs", {"normalize_ufos": True}),
+    ],
+)
+def test_build_masters_pipeline(tmpdir, filename, options):
+    path = os.path.join(os.path.dirname(__file__), "data", filename)
+    expected = glyphsLib.build_masters(path, str(tmpdir.join("expected")), **options)
+    actual = glyphsLib.build_masters(
+        path, str(tmpdir.join("actual")), pipeline=True, **options
+    )
+
+    assert list(actual.ufos) == list(expected.ufos)
+    assert os.path.basename(actual.designspace_path) == os.path.basename(
+        expected.designspace_path
+    )
+    assert _read_tree(str(tmpdir.join("actual"))) == _read_tree(
+        str(tmpdir.join("expected"))
+    )
+
+
+def test_build_masters_computes_groups_once(tmpdir, monkeypatch):
+    from glyphsLib.builder import groups
+
+    calls = []
+    ufo_groups = groups._ufo_groups
+
+    def counted(builder):
+        calls.append(builder)
+        return ufo_groups(builder)
+
+    monkeypatch.setattr(groups, "_ufo_groups", counted)
+    path = os.path.join(os.path.dirname(__file__), "data", "GlyphsUnitTestSans.glyphs")
+    result = glyphsLib.build_masters(path, str(tmpdir))
+
+    assert len(calls) == 1
+    ufos = list(result.ufos.values())
+    assert len(ufos) == 3
+    assert ufos[0].groups
+    for ufo in ufos[1:]:
+        assert dict(ufo.groups) == dict(ufos[0].groups)
@@ -0,0 +1,166 @@
+#
+# Copyright 2020 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import glob
+import os
+
+import pytest
+
+import glyphsLib
+from glyphsLib.normalize import _color_string, _guideline, save_ufo
+
+ufonormalizer = pytest.importorskip("ufonormalizer")
+
+DATA = os.path.join(os.path.dirname(__file__), "data")
+
+
+def _read_tree(path):
+    files = {}
+    for root, _, names in os.walk(path):
+        for name in names:
+            file_path = os.path.join(root, name)
+            with open(file_path, "rb") as fp:
+                files[os.path.relpath(file_path, path)] = fp.read()
+    return files
+
+
+def _assert_normalized(ufo, tmpdir):
+    expected = str(tmpdir.join("expected.ufo"))
+    ufo.save(expected)
+    ufonormalizer.normalizeUFO(expected, writeModTimes=False)
+    actual = str(tmpdir.join("actual.ufo"))
+    save_ufo(ufo, actual)
+
+    expected_files = _read_tree(expected)
+    actual_files = _read_tree(actual)
+    assert sorted(actual_files) == sorted(expected_files)
+    for name, data in expected_files.items():
+        assert actual_files[name] == data, name
+
+
+@pytest.mark.parametrize(
+    "filename",
+    sorted(
+        os.path.basename(path) for path in glob.glob(os.path.join(DATA, "*.glyphs"))
+    ),
+)
+def test_corpus(ufo_module, tmpdir, filename):
+    font = glyphsLib.GSFont(os.path.join(DATA, filename))
+    designspace = glyphsLib.to_designspace(font, ufo_module=ufo_module)
+    ufos = {source.filename: source.font for source in designspace.sources}
+    for i, ufo in enumerate(ufos.values()):
+        _assert_normalized(ufo, tmpdir.mkdir(str(i)))
+
+
+def test_rare_data(ufo_module, tmpdir):
+    ufo = ufo_module.Font()
+    ufo.info.familyName = "Test"
+    ufo.info.italicAngle = -12.0
+    ufo.info.guidelines = [
+        {"x": 100, "name": "vertical"},
+        {"x": 10, "y": 20, "angle": 45.5, "color": "1,0,0.50,1"},
+    ]
+    ufo.lib["public.glyphOrder"] = ["a", "A", "B"]
+    ufo.lib["com.example.data"] = b"\x00\x01" * 100
+    ufo.groups["public.kern1.a"] = ["a", "A"]
+    ufo.kerning["public.kern1.a", "B"] = -10.5
+    ufo.features.text = "feature liga {\n} liga;\n"
+    ufo.data["com.example/file.bin"] = b"data"
+    ufo.images["used.png"] = b"\x89PNG\r\n\x1a\n"
+    ufo.images["unused.png"] = b"\x89PNG\r\n\x1a\n"
+
+    glyph = ufo.newGlyph("a")
+    glyph.width = 500.25
+    glyph.unicodes = [0x61, 0x41, 0x61]
+    glyph.note = "  a note\r\nwith <markup> & lines  "
+    glyph.lib["public.markColor"] = "1,0.0,0,1.000"
+    glyph.lib["com.example.tuple"] = (1, 2.0, True)
+    glyph.appendAnchor({"x": 250, "y": 700, "name": "top", "color": "0,0,1,1"})
+    glyph.appendAnchor({"x": 0.5, "y": -0, "identifier": "anchor1"})
+    glyph.appendGuideline({"y": 300})
+    glyph.appendGuideline({"x": 10, "y": 20, "angle": 90, "name": "g"})
+    glyph.image.fileName = "used.png"
+    glyph.image.transformation = (0.5, 0, 0, 0.5, 10, 20)
+    pen = glyph.getPointPen()
+    pen.beginPath(identifier="contour1")
+    pen.addPoint((0, 0), "line", name="start")
+    pen.addPoint((100.5, 0), "line", smooth=True)
+    pen.addPoint((100, 50))
+    pen.addPoint((50, 100))
+    pen.addPoint((0, 100), "curve", smooth=True, identifier="point1")
+    pen.endPath()
+    pen.beginPath()
+    pen.addPoint((10, 10), "move")
+    pen.addPoint((20, 20), "line")
+    pen.endPath()
+    pen.addComponent("B", (1, 0, 0.2, 1, 30, -5.5), identifier="component1")
+
+    ufo.newGlyph("A").height = 1000
+    ufo.newGlyph("B")
+    background = ufo.newLayer("public.background")
+    background.color = "0.5,0.5,0.5,1"
+    background.lib["com.example"] = {"key": [1.5]}
+    background.newGlyph("a").getPointPen().addComponent("A", (1, 0, 0, 1, 0, 0))
+    ufo.newLayer("Empty layer")
+
+    _assert_normalized(ufo, tmpdir)
+
+
+@pytest.mark.parametrize(
+    "guideline",
+    [
+        {"x": 0, "y": 300},
+        {"x": 300, "y": 0, "name": "g", "identifier": "1"},
+        {"x": 10, "y": 20},
+        {"x": 10, "angle": 45},
+        {"x": "a"},
+        {"angle": 45},
+        {"x": 1, "y": 2, "angle": 3, "color": "1,0,0.50,1"},
+        {"y": 2, "color": "1,0,0,2"},
+    ],
+)
+def test_guideline(guideline):
+    # The rules of ufonormalizer, which are private to it.
+    expected = getattr(ufonormalizer, "_normalizeDictGuideline", None)
+    if expected is None:
+        pytest.skip("ufonormalizer has no _normalizeDictGuideline")
+    assert _guideline(guideline) == expected(guideline)
+
+
+@pytest.mark.parametrize(
+    "color", ["1,0,0.50,1", "1,0,0", "1,0,0,a", "1,0,0,2", "0.25,0.5,.75,1.0"]
+)
+def test_color_string(color):
+    expected = getattr(ufonormalizer, "_normalizeColorString", None)
+    if expected is None:
+        pytest.skip("ufonormalizer has no _normalizeColorString")
+    assert _color_string(color) == expected(color)
+
+
+def test_build_masters(datadir, tmpdir):
+    path = str(datadir.join("GlyphsUnitTestSans.glyphs"))
+    expected = str(tmpdir.join("expected"))
+    glyphsLib.build_masters(path, expected)
+    for name in os.listdir(expected):
+        if name.endswith(".ufo"):
+            ufonormalizer.normalizeUFO(
+                os.path.join(expected, name), writeModTimes=False
+            )
+    actual = str(tmpdir.join("actual"))
+
+    glyphsLib.build_masters(path, actual, normalize_ufos=True)
+
+    assert _read_tree(actual) == _read_tree(expected)
@@ -20,8 +20,8 @@ import unittest
 import datetime
 
 import glyphsLib
-from glyphsLib.parser import Parser
-from glyphsLib.classes import GSGlyph
+from glyphsLib.parser import Parser, _chunk_spans
+from glyphsLib.classes import GSGlyph, LINE, _raw_value
 
 GLYPH_DATA = """\
 (
@@ -115,6 +115,21 @@ class ParserTest(unittest.TestCase):
     def test_parse_float_as_float(self):
         self.run_test(b"{noodleThickness = 106.1;}", [("noodleThickness", 106.1)])
 
+    def test_parse_float_syntax(self):
+        # The unquoted values are numbers when float() accepts them.
+        self.run_test(
+            b"{a = -1.5e3; b = .5; c = 1_000; d = -inf; e = 1e; f = 1__0; g = 1.2.3;}",
+            [
+                ("a", -1500),
+                ("b", 0.5),
+                ("c", 1000),
+                ("d", float("-inf")),
+                ("e", "1e"),
+                ("f", "1__0"),
+                ("g", "1.2.3"),
+            ],
+        )
+
 
 class ParserGlyphTest(unittest.TestCase):
     def test_parse_empty_glyphs(self):
@@ -159,6 +174,20 @@ class ParserGlyphTest(unittest.TestCase):
         self.assertEqual(glyph.rightKerningGroup, "A")
         self.assertEqual(glyph.unicode, "0041")
 
+    def test_parse_unknown_keys(self):
+        parser = Parser(GSGlyph)
+        (glyph,) = parser.parse('({glyphname = A; someFutureKey = "value";})')
+        self.assertEqual(glyph.name, "A")
+        self.assertEqual(glyph.someFutureKey, "value")
+
+    def test_parse_background(self):
+        data = "({glyphname = A; layers = ({layerId = m01; background = {};});})"
+        parser = Parser(GSGlyph)
+        (glyph,) = parser.parse(data)
+        layer = glyph.layers[0]
+        self.assertIs(layer.background.foreground, layer)
+        self.assertIs(layer.background.parent, glyph)
+
     def test_IntFloatCoordinates(self):
         filename = os.path.join(os.path.dirname(__file__), "data/IntegerFloat.glyphs")
         with open(filename) as f:
@@ -180,5 +209,151 @@ class ParserGlyphTest(unittest.TestCase):
         ] == int_points_expected
 
 
+class LazyParseTest(unittest.TestCase):
+    DATA = """\
+{
+glyphname = A;
+color = (1,2,3,1);
+lastChange = "2017-04-30 13:57:04 +0000";
+layers = (
+{
+annotations = (
+{
+position = "{10, 20}";
+type = "1";
+}
+);
+hints = (
+{
+horizontal = 1;
+target = up;
+type = Stem;
+}
+);
+layerId = m01;
+userData = {
+key = (
+1,
+2
+);
+};
+width = 600;
+}
+);
+note = "a \\"note\\"";
+userData = {
+com.example = {
+a = 1;
+};
+};
+}"""
+
+    def test_values(self):
+        eager = Parser(GSGlyph).parse(self.DATA)
+        glyph = Parser(GSGlyph, lazy=True).parse(self.DATA)
+        layer = glyph.layers[0]
+        self.assertEqual(
+            _raw_value(glyph, "lastChange").text, '"2017-04-30 13:57:04 +0000"'
+        )
+        self.assertIsNotNone(_raw_value(layer, "_annotations"))
+
+        self.assertEqual(glyph.lastChange, datetime.datetime(2017, 4, 30, 13, 57, 4))
+        self.assertIsNone(_raw_value(glyph, "lastChange"))
+        self.assertEqual(glyph.color, eager.color)
+        self.assertEqual(glyph.note, 'a "note"')
+        self.assertEqual(dict(glyph.userData), {"com.example": {"a": 1}})
+        self.assertEqual(layer.userData["key"], [1, 2])
+        (annotation,) = layer.annotations
+        self.assertIs(annotation.parent, layer)
+        self.assertEqual(annotation.position, eager.layers[0].annotations[0].position)
+        self.assertEqual(layer.hints[0].target, "up")
+
+    def test_write(self):
+        glyph = Parser(GSGlyph, lazy=True).parse(self.DATA)
+        text = glyphsLib.dumps(glyph)
+        # The values that were not parsed are written as they were.
+        self.assertIn("color = (1,2,3,1);", text)
+        self.assertEqual(
+            text.replace("(1,2,3,1)", "(1, 2, 3, 1)"),
+            glyphsLib.dumps(Parser(GSGlyph).parse(self.DATA)),
+        )
+        self.assertIsNotNone(_raw_value(glyph, "color"))
+
+        glyph.color = 3
+        self.assertIn("color = 3;", glyphsLib.dumps(glyph))
+        glyph.userData["com.example"] = 2
+        self.assertIn("com.example = 2;", glyphsLib.dumps(glyph))
+
+    def test_font(self):
+        filename = os.path.join(
+            os.path.dirname(__file__), "data/GlyphsUnitTestSans.glyphs"
+        )
+        with open(filename, encoding="utf-8") as f:
+            expected = glyphsLib.dumps(glyphsLib.load(f))
+
+        font = glyphsLib.GSFont(filename, lazy=True)
+        glyph = font.glyphs["A"]
+        self.assertIsNotNone(_raw_value(glyph, "lastChange"))
+        self.assertEqual(glyphsLib.dumps(font.clone()), expected)
+        self.assertIsNotNone(_raw_value(glyph, "lastChange"))
+        self.assertEqual(glyphsLib.dumps(font), expected)
+
+
+class InternTest(unittest.TestCase):
+    def test_identifiers_are_shared(self):
+        filename = os.path.join(
+            os.path.dirname(__file__), "data/GlyphsUnitTestSans.glyphs"
+        )
+        font = glyphsLib.GSFont(filename)
+        master = font.masters[0]
+        for glyph in font.glyphs:
+            self.assertIs(glyph.layers[master.id].layerId, master.id)
+        self.assertIs(
+            font.glyphs["Adieresis"].layers[0].components[0].name,
+            font.glyphs["A"].name,
+        )
+        node = font.glyphs["A"].layers[0].paths[0].nodes[0]
+        self.assertIs(node.type, LINE)
+
+    def test_strings(self):
+        strings = {}
+        parser = Parser(GSGlyph, strings=strings)
+        first = parser.parse("({glyphname = A; layers = ({layerId = m01;});})")
+        second = parser.parse("({glyphname = A; layers = ({layerId = m01;});})")
+        self.assertIs(first[0].name, second[0].name)
+        self.assertIs(first[0].layers[0].layerId, second[0].layers[0].layerId)
+        self.assertIs(strings["m01"], first[0].layers[0].layerId)
+
+
+class ParallelParseTest(unittest.TestCase):
+    def test_parse_glyphs_in_processes(self):
+        filename = os.path.join(
+            os.path.dirname(__file__), "data/GlyphsUnitTestSans.glyphs"
+        )
+        with open(filename, encoding="utf-8") as f:
+            expected = glyphsLib.dumps(glyphsLib.load(f))
+
+        font = glyphsLib.GSFont(filename, jobs=2)
+
+        self.assertEqual(glyphsLib.dumps(font), expected)
+        for glyph in font.glyphs:
+            self.assertIs(glyph.parent, font)
+            for layer in glyph.layers:
+                self.assertIs(layer.parent, glyph)
+        self.assertEqual(glyphsLib.dumps(glyphsLib.loads(expected, jobs=3)), expected)
+
+    def test_chunk_spans(self):
+        spans = [(0, 10), (11, 12), (13, 14), (15, 40), (41, 50)]
+        self.assertEqual(
+            _chunk_spans(spans, 2),
+            [[(0, 10), (11, 12), (13, 14), (15, 40)], [(41, 50)]],
+        )
+        self.assertEqual(
+            _chunk_spans(spans, 10),
+            [[(0, 10)], [(11, 12), (13, 14), (15, 40)], [(41, 50)]],
+        )
+        self.assertEqual(_chunk_spans(spans, 1), [spans])
+
+
 if __name__ == "__main__":
     unittest.main()
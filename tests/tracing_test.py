@@ -0,0 +1,126 @@
+#
+# Copyright 2020 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import json
+import os
+import tracemalloc
+
+import glyphsLib
+import glyphsLib.cli
+from glyphsLib import tracing
+
+
+def test_span_is_noop_when_disabled():
+    assert tracing.active_tracer() is None
+    with tracing.span("anything", foo=1) as s:
+        pass
+    assert s is tracing.span("something else")
+
+
+def test_trace_records_nested_spans():
+    with tracing.trace() as tracer:
+        with tracing.span("outer"):
+            with tracing.span("inner", index=3):
+                pass
+    assert tracing.active_tracer() is None
+
+    inner, outer = tracer.events
+    assert inner["name"] == "inner"
+    assert inner["args"] == {"index": 3}
+    assert outer["name"] == "outer"
+    assert outer["ph"] == "X"
+    assert outer["ts"] <= inner["ts"]
+    assert inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+    assert list(tracer.summary()) == ["inner", "outer"]
+
+
+def test_build_masters_stages(datadir, tmpdir):
+    with tracing.trace() as tracer:
+        glyphsLib.build_masters(
+            str(datadir.join("GlyphsUnitTestSans.glyphs")), str(tmpdir)
+        )
+
+    stages = tracer.summary()
+    for name in (
+        "parse",
+        "to_ufo_font_attributes",
+        "glyphs",
+        "propagate_anchors",
+        "features",
+        "groups",
+        "kerning",
+        "to_designspace_axes",
+        "to_designspace_sources",
+        "to_designspace_instances",
+        "save_ufo",
+        "write_designspace",
+    ):
+        assert name in stages
+    saved = [e["args"]["path"] for e in tracer.events if e["name"] == "save_ufo"]
+    assert len(saved) == 3
+
+
+def test_cli_trace(tmpdir):
+    filename = os.path.join(os.path.dirname(__file__), "data/GlyphsUnitTestSans.glyphs")
+    trace_path = str(tmpdir.join("trace.json"))
+
+    glyphsLib.cli.main(
+        ["glyphs2ufo", filename, "-m", str(tmpdir), "--trace", trace_path]
+    )
+
+    with open(trace_path) as fp:
+        trace = json.load(fp)
+    names = {event["name"] for event in trace["traceEvents"]}
+    assert {"parse", "glyphs", "save_ufo"} <= names
+    assert tracing.active_tracer() is None
+
+
+def test_memory_tracer(datadir):
+    tracer = tracing.MemoryTracer()
+    with tracing.trace(tracer=tracer):
+        font = glyphsLib.GSFont(str(datadir.join("GlyphsUnitTestSans.glyphs")))
+        with tracing.span("outer"):
+            with tracing.span("inner"):
+                data = [0] * 100000
+            del data
+    assert not tracemalloc.is_tracing()
+
+    events = {event["name"]: event["args"] for event in tracer.events}
+    assert events["inner"]["peak"] >= 800000
+    assert events["outer"]["peak"] >= events["inner"]["peak"]
+    assert events["outer"]["current"] < events["inner"]["current"]
+
+    counts = tracer.object_counts["parse"]
+    n_nodes = sum(
+        len(path.nodes)
+        for glyph in font.glyphs
+        for layer in glyph.layers
+        for path in layer.paths
+    )
+    assert counts["GSNode"] >= n_nodes
+    assert counts["GSLayer"] >= sum(len(glyph.layers) for glyph in font.glyphs)
+    assert "GSNode" in tracer.report()
+
+
+def test_cli_memory_report(tmpdir, capsys):
+    filename = os.path.join(os.path.dirname(__file__), "data/GlyphsUnitTestSans.glyphs")
+
+    glyphsLib.cli.main(["glyphs2ufo", filename, "-m", str(tmpdir), "--memory-report"])
+
+    _, err = capsys.readouterr()
+    assert "peak (MiB)" in err
+    assert "save_ufo (GlyphsUnitTestSans-Bold.ufo)" in err
+    assert "objects alive after parse:" in err
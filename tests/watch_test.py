@@ -0,0 +1,189 @@
+#
+# Copyright 2020 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import filecmp
+import os
+
+import pytest
+
+import glyphsLib
+import glyphsLib.cli
+from glyphsLib import watch
+from glyphsLib.parser import skim
+
+
+@pytest.fixture
+def glyphs_path(datadir, tmpdir):
+    path = str(tmpdir.join("GlyphsUnitTestSans.glyphs"))
+    datadir.join("GlyphsUnitTestSans.glyphs").copy(
+        tmpdir.join("GlyphsUnitTestSans.glyphs")
+    )
+    return path
+
+
+def _edit(path, old, new):
+    with open(path, encoding="utf-8") as fp:
+        text = fp.read()
+    assert old in text
+    with open(path, "w", encoding="utf-8") as fp:
+        fp.write(text.replace(old, new, 1))
+
+
+def _assert_same_files(left, right):
+    comparison = filecmp.dircmp(left, right)
+    assert comparison.left_only == []
+    assert comparison.right_only == []
+    _, mismatch, errors = filecmp.cmpfiles(
+        left, right, comparison.common_files, shallow=False
+    )
+    assert mismatch == []
+    assert errors == []
+    for name in comparison.common_dirs:
+        _assert_same_files(os.path.join(left, name), os.path.join(right, name))
+
+
+def _assert_same_as_build_masters(build, glyphs_path, tmpdir):
+    master_dir = str(tmpdir.join("expected"))
+    glyphsLib.build_masters(glyphs_path, master_dir)
+    _assert_same_files(build.master_dir, master_dir)
+
+
+def test_skim(datadir):
+    with open(str(datadir.join("GlyphsUnitTestSans.glyphs")), encoding="utf-8") as fp:
+        text = fp.read()
+    font = glyphsLib.loads(text)
+
+    result = skim(text)
+
+    assert list(result.sections)[:3] == [".appVersion", "DisplayStrings", "classes"]
+    start, end = result.sections["familyName"]
+    assert text[start:end] == '"Glyphs Unit Test Sans"'
+    assert len(result.glyphs) == len(font.glyphs)
+    for (start, end), glyph in zip(result.glyphs, font.glyphs):
+        assert text[start] == "{" and text[end - 1] == "}"
+        assert "glyphname = {};".format(glyph.name) in text[start:end]
+
+
+def test_update_glyph(glyphs_path, tmpdir):
+    build = watch.IncrementalBuild(glyphs_path, str(tmpdir.join("masters")))
+    build.build()
+    assert build.update() is None
+
+    # Both A and the composite Adieresis change.
+    _edit(glyphs_path, '"191 700 LINE"', '"195 710 LINE"')
+    update = build.update()
+
+    assert update == watch.Update(False, ["A", "Adieresis"], [])
+    _assert_same_as_build_masters(build, glyphs_path, tmpdir)
+    assert build.update() is None
+
+
+def test_update_smart_component(glyphs_path, tmpdir):
+    build = watch.IncrementalBuild(glyphs_path, str(tmpdir.join("masters")))
+    build.build()
+
+    _edit(glyphs_path, '"117 266 LINE"', '"118 266 LINE"')
+    update = build.update()
+
+    assert not update.full
+    assert sorted(update.glyphs) == ["_part.shoulder", "h", "m", "n"]
+    _assert_same_as_build_masters(build, glyphs_path, tmpdir)
+
+
+def test_update_kerning(glyphs_path, tmpdir):
+    build = watch.IncrementalBuild(glyphs_path, str(tmpdir.join("masters")))
+    build.build()
+
+    _edit(glyphs_path, '"@MMK_R_J" = -30;', '"@MMK_R_J" = -35;')
+    update = build.update()
+
+    assert update == watch.Update(False, [], ["kerning"])
+    assert (
+        build.font.kerning["C4872ECA-A3A9-40AB-960A-1DB2202F16DE"]["@MMK_L_A"][
+            "@MMK_R_J"
+        ]
+        == -35
+    )
+    _assert_same_as_build_masters(build, glyphs_path, tmpdir)
+
+
+def test_full_rebuild(glyphs_path, tmpdir):
+    build = watch.IncrementalBuild(glyphs_path, str(tmpdir.join("masters")))
+    build.build()
+
+    _edit(glyphs_path, "unitsPerEm = 1000;", "unitsPerEm = 2000;")
+    update = build.update()
+
+    assert update == watch.Update(True, [], ["unitsPerEm"])
+    assert build.font.upm == 2000
+    _assert_same_as_build_masters(build, glyphs_path, tmpdir)
+
+    _edit(glyphs_path, "glyphname = adieresis;", "glyphname = adieresis.alt;")
+    assert build.update().full
+    assert "adieresis.alt" in build.font.glyphs
+    _assert_same_as_build_masters(build, glyphs_path, tmpdir)
+
+
+def test_failed_update(glyphs_path, tmpdir):
+    build = watch.IncrementalBuild(glyphs_path, str(tmpdir.join("masters")))
+    build.build()
+
+    _edit(glyphs_path, '"191 700 LINE"', '"191 700 LINE" (')
+    with pytest.raises(ValueError):
+        build.update()
+
+    _edit(glyphs_path, '"191 700 LINE" (', '"191 705 LINE"')
+    assert build.update().full
+    _assert_same_as_build_masters(build, glyphs_path, tmpdir)
+
+
+def test_cli_watch(glyphs_path, tmpdir, monkeypatch):
+    calls = []
+
+    def fake_watch(filename, master_dir, **kwargs):
+        calls.append((filename, master_dir, kwargs))
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(watch, "watch", fake_watch)
+    master_dir = str(tmpdir.join("masters"))
+    glyphsLib.cli.main(["glyphs2ufo", glyphs_path, "-m", master_dir, "--watch"])
+
+    ((filename, output_dir, kwargs),) = calls
+    assert filename == glyphs_path
+    assert output_dir == master_dir
+    assert kwargs["designspace_path"] == os.path.join(
+        master_dir, "GlyphsUnitTestSans.designspace"
+    )
+    assert "cache_dir" not in kwargs
+
+    assert glyphsLib.cli.main(["glyphs2ufo", glyphs_path, glyphs_path, "--watch"]) == 1
+
+
+def test_check_compatibility(glyphs_path, tmpdir):
+    from glyphsLib.compatibility import IncompatibleMastersError
+
+    build = watch.IncrementalBuild(
+        glyphs_path, str(tmpdir.join("masters")), check_compatibility=True
+    )
+    build.build()
+
+    _edit(glyphs_path, '"205 700 LINE",\n', "")
+    with pytest.raises(IncompatibleMastersError, match="glyph 'A', layer 'Bold'"):
+        build.update()
+
+    _edit(glyphs_path, '"555 700 LINE",\n', '"555 700 LINE",\n"205 700 LINE",\n')
+    assert build.update().full
+    _assert_same_as_build_masters(build, glyphs_path, tmpdir)